@@ -0,0 +1,820 @@
+import io
+import os
+import sys
+import time
+import tracemalloc
+import tempfile
+import contextlib
+
+from PArL import * # PArL Basic Structure [TASKS 1-5]
+
+from Lexer import Lexer # TASK-1
+from Parser import Parser # TASK-2
+from Resolver import Resolver # TASK-3
+from Semantic_Analysis import SemanticAnalysis # TASK-3
+from Code_Generation import CodeGenerator # TASK-4
+from Constant_Folding import ConstantFolder # constant folding
+from Dead_Code import DeadCodeEliminator # --dce
+from Peephole import PeepholeOptimizer # -O
+from Virtual_Machine import VirtualMachine # --vm
+from Framebuffer import Framebuffer, NumpyFramebuffer, numpy # --vm
+from Frame_Export import FrameExporter, read_frames # --export
+from Profiler import ProfilingMachine # --profile
+from Interpreter import Interpreter # --run
+from Closure_Compilation import ClosureCompiler # --run-closures
+
+'''
+========================= PROGRAM GENERATOR =========================
+'''
+def generate_program(statements):
+    # Generate a flat PArL program with the given number of top-level statements
+    lines = ['let x0:int = 0;']
+    for i in range(1, statements):
+        if i % 4 == 0:
+            lines.append(f'if (x{i - 1} < {i}) {{ x{i - 1} = x{i - 1} + 1; }} else {{ __print x{i - 1}; }}')
+            lines.append(f'let x{i}:int = x{i - 1};')
+        elif i % 4 == 1:
+            lines.append(f'let x{i}:int = x{i - 1} * 2 + {i};')
+        elif i % 4 == 2:
+            lines.append(f'while (x{i - 1} > {i}) {{ x{i - 1} = x{i - 1} - 1; }}')
+            lines.append(f'let x{i}:int = x{i - 1};')
+        else:
+            lines.append(f'let x{i}:int = (x{i - 1} + {i}) / 2;')
+    return '\n'.join(lines)
+
+def generate_nested_program(depth):
+    # Generate a PArL program whose while/if blocks are nested to the given depth
+    source = '__print 0;'
+    for i in range(depth):
+        if i % 2 == 0:
+            source = f'while (x < {i}) {{ x = x + 1; {source} }}'
+        else:
+            source = f'if (x > {i}) {{ {source} }} else {{ __print {i}; }}'
+    return 'let x:int = 0;\n' + source
+
+def generate_commented_program(statements):
+    # Generate a program where every statement is preceded by line and block comments
+    lines = []
+    for i, line in enumerate(generate_program(statements).split('\n')):
+        lines.append(f'/* statement {i}\n   generated for the comment benchmark */')
+        lines.append(f'// {line}')
+        lines.append(line)
+    return '\n'.join(lines)
+
+def tokenize_quietly(source):
+    # Tokenize the source without the lexer's success message
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Lexer().tokenize(source)
+
+def timed(function, *args):
+    # Run the function once and return the elapsed wall time in seconds
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+'''
+========================= LEXER BENCHMARK [TASK-1] =========================
+'''
+def benchmark_lexer(sizes=(5000, 20000, 80000)):
+    print('\n\033[1mLexer: single-pass DFA scanner throughput\033[0m')
+    print(f"{'statements':>12} {'size (MB)':>10} {'tokens':>10} {'time (s)':>10} {'MB/s':>8}")
+
+    lexer = Lexer()
+    for size in sizes:
+        source = generate_program(size)
+        megabytes = len(source.encode('utf-8')) / 1e6
+
+        start = time.perf_counter()
+        tokens = list(lexer.scan(source))
+        elapsed = time.perf_counter() - start
+
+        print(f'{size:>12} {megabytes:>10.2f} {len(tokens):>10} {elapsed:>10.3f} {megabytes / elapsed:>8.2f}')
+
+def benchmark_comments(sizes=(1000, 4000, 16000)):
+    print('\n\033[1mLexer: comment-heavy sources\033[0m')
+    print(f"{'statements':>12} {'size (MB)':>10} {'tokens':>10} {'time (s)':>10} {'MB/s':>8}")
+
+    lexer = Lexer()
+    for size in sizes:
+        source = generate_commented_program(size)
+        megabytes = len(source.encode('utf-8')) / 1e6
+
+        start = time.perf_counter()
+        tokens = list(lexer.scan(source))
+        elapsed = time.perf_counter() - start
+
+        print(f'{size:>12} {megabytes:>10.2f} {len(tokens):>10} {elapsed:>10.3f} {megabytes / elapsed:>8.2f}')
+
+def peak_memory(function, *args):
+    # Run the function once and return the peak memory it allocated in megabytes
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+def count_streamed_tokens(chunks):
+    # Consume the streamed tokens one at a time without keeping them
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sum(1 for _ in Lexer().iter_tokens(chunks))
+
+def benchmark_streaming(sizes=(5000, 20000, 80000), chunk_size=65536):
+    print('\n\033[1mLexer: whole-source tokenize vs streamed iter_tokens (peak memory)\033[0m')
+    print(f"{'statements':>12} {'size (MB)':>10} {'tokenize (MB)':>14} {'stream (MB)':>12} {'stream (s)':>11}")
+
+    for size in sizes:
+        source = generate_program(size)
+        megabytes = len(source.encode('utf-8')) / 1e6
+        # Pre-split the source so that only the lexer's own allocations are measured
+        chunks = [source[i:i + chunk_size] for i in range(0, len(source), chunk_size)]
+
+        whole = peak_memory(tokenize_quietly, source)
+        streamed = peak_memory(count_streamed_tokens, chunks)
+        elapsed = timed(count_streamed_tokens, chunks)
+
+        print(f'{size:>12} {megabytes:>10.2f} {whole:>14.2f} {streamed:>12.2f} {elapsed:>11.3f}')
+
+class DictToken:
+    # Token reproducing the previous representation: a __dict__ per token, a string tag and its own lexeme
+    def __init__(self, t_type, value, offset):
+        self.t_type = t_type
+        self.value = value
+        self.offset = offset
+
+def retained_memory(function, *args):
+    # Run the function once and return its result with the memory still allocated for it in megabytes
+    tracemalloc.start()
+    result = function(*args)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, current / 1e6
+
+def dict_tokens(tokens):
+    # Rebuild the tokens in the previous representation (copying each lexeme as the previous lexer did)
+    return [DictToken(token.t_type, token.value[:1] + token.value[1:], index) for index, token in enumerate(tokens)]
+
+def benchmark_token_memory(statements=56000):
+    print('\n\033[1mLexer: token memory, __dict__ tokens vs slotted integer-kind tokens\033[0m')
+    print(f"{'tokens':>12} {'dict (MB)':>10} {'slots (MB)':>11} {'dict (MB/1M)':>13} {'slots (MB/1M)':>14}")
+
+    source = generate_program(statements)
+    tokens, slots = retained_memory(tokenize_quietly, source)
+    _, old = retained_memory(dict_tokens, tokens)
+    millions = len(tokens) / 1e6
+
+    print(f'{len(tokens):>12} {old:>10.2f} {slots:>11.2f} {old / millions:>13.2f} {slots / millions:>14.2f}')
+
+'''
+========================= PARSER BENCHMARK [TASK-2] =========================
+'''
+class SlicingTokens(list):
+    # Token list reproducing the previous parser behaviour: every descent copies the remaining tokens
+    position = 0  # Node positions are not tracked in copied lists
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= len(self):
+            return EOF
+        return list.__getitem__(self, index)
+
+    def rest(self, offset):
+        return SlicingTokens(self[offset:])
+
+    def available(self, count):
+        return count <= len(self)
+
+def benchmark_parser(sizes=(250, 500, 1000, 2000)):
+    print('\n\033[1mParser: list slicing vs token stream\033[0m')
+    print(f"{'statements':>12} {'tokens':>10} {'slicing (s)':>14} {'stream (s)':>12} {'speed-up':>10}")
+
+    for size in sizes:
+        tokens = tokenize_quietly(generate_program(size))
+
+        slicing = timed(Parser().program, SlicingTokens(tokens))
+        stream = timed(Parser().program, TokenStream(tokens))
+
+        print(f'{size:>12} {len(tokens):>10} {slicing:>14.4f} {stream:>12.4f} {slicing / stream:>9.1f}x')
+
+class DictNode:
+    # AST node reproducing the previous representation: a __dict__ per node, a string tag and a list of children
+    def __init__(self, t_type, parameters, children, token_count):
+        self.t_type = t_type
+        self.parameters = parameters
+        self.children = children
+        self.token_count = token_count
+
+def dict_tree(node):
+    # Rebuild the tree in the previous representation (operators were stored as {'OP': operator})
+    parameters = {'OP': node.parameters} if node.kind in (RELATIONAL_OP_KIND, ADDITIVE_OP_KIND, MULTIPLICATIVE_OP_KIND) else node.parameters
+    return DictNode(node.t_type, parameters, [dict_tree(child) for child in node.children if child is not None], node.token_count)
+
+def count_nodes(node):
+    # Number of nodes in the tree
+    return 1 + sum(count_nodes(child) for child in node.children if child is not None)
+
+def benchmark_ast_memory(statements=20000):
+    print('\n\033[1mParser: AST memory, __dict__ nodes vs slotted integer-kind nodes\033[0m')
+    print(f"{'nodes':>12} {'dict (MB)':>10} {'slots (MB)':>11} {'dict (B/node)':>14} {'slots (B/node)':>15}")
+
+    tokens = tokenize_quietly(generate_program(statements))
+    ast, slots = retained_memory(Parser().program, TokenStream(tokens))
+    _, old = retained_memory(dict_tree, ast)
+    nodes = count_nodes(ast)
+
+    print(f'{nodes:>12} {old:>10.2f} {slots:>11.2f} {old * 1e6 / nodes:>14.1f} {slots * 1e6 / nodes:>15.1f}')
+
+def generate_long_expression(operands):
+    # Generate a declaration whose expression chains the given number of operands with mixed operators
+    ops = [' + ', ' * ', ' - ', ' / ']
+    terms = [str(i % 9 + 1) for i in range(operands)]
+    return 'let x:int = ' + ''.join(term + ops[i % 4] for i, term in enumerate(terms[:-1])) + terms[-1] + ';'
+
+def benchmark_expressions(sizes=(1000, 10000, 50000)):
+    print('\n\033[1mParser: precedence-climbing expressions vs operand count\033[0m')
+    print(f"{'operands':>12} {'tokens':>10} {'parse (s)':>14} {'us/operand':>12}")
+
+    for size in sizes:
+        tokens = tokenize_quietly(generate_long_expression(size))
+        elapsed = timed(Parser().program, TokenStream(tokens))
+        print(f'{size:>12} {len(tokens):>10} {elapsed:>14.4f} {elapsed * 1e6 / size:>12.2f}')
+
+def benchmark_nesting(depths=(5, 10, 20, 40, 80)):
+    print('\n\033[1mParser: predictive statement dispatch vs nesting depth\033[0m')
+    print(f"{'depth':>12} {'tokens':>10} {'parse (s)':>14}")
+
+    for depth in depths:
+        tokens = tokenize_quietly(generate_nested_program(depth))
+        print(f'{depth:>12} {len(tokens):>10} {timed(Parser().program, TokenStream(tokens)):>14.4f}')
+
+'''
+========================= SEMANTIC ANALYSIS BENCHMARK [TASK-3] =========================
+'''
+def check_quietly(ast):
+    # Resolve names and run the static checker without their success messages
+    with contextlib.redirect_stdout(io.StringIO()):
+        Resolver().program(ast)
+        SemanticAnalysis().program(ast)
+
+def checked(source):
+    # Parse, resolve and check a program quietly, returning its AST
+    ast = Parser().program(TokenStream(tokenize_quietly(source)))
+    check_quietly(ast)
+    return ast
+
+def benchmark_semantic(sizes=(5000, 20000, 80000)):
+    print('\n\033[1mSemantic analysis: name resolution and static checking time vs program size\033[0m')
+    print(f"{'statements':>12} {'nodes':>10} {'check (s)':>14} {'us/node':>10}")
+
+    for size in sizes:
+        ast = Parser().program(TokenStream(tokenize_quietly(generate_program(size))))
+        nodes = count_nodes(ast)
+        elapsed = timed(check_quietly, ast)
+        print(f'{size:>12} {nodes:>10} {elapsed:>14.4f} {elapsed * 1e6 / nodes:>10.2f}')
+
+    # A loop that never terminates is checked once, not executed
+    ast = Parser().program(TokenStream(tokenize_quietly('let x:int = 0; while (True) { x = x + 1; }')))
+    print(f"{'while (True)':>12} {count_nodes(ast):>10} {timed(check_quietly, ast):>14.4f}")
+
+'''
+========================= CODE GENERATION BENCHMARK [TASK-4] =========================
+'''
+class LevelCountingGenerator(CodeGenerator):
+    # Code generator reproducing the previous frame handling: each variable stored its level, and every frame
+    # push and pop updated the level of every variable in every enclosing frame
+    def stack_set(self, node, value):
+        super().stack_set(node, value + [0] if isinstance(value, list) else value)
+
+    def add_stack_frame(self, node):
+        super().add_stack_frame(node)
+        for frame in self.stack[:-1]:
+            for variable in frame:
+                if variable is not None:
+                    variable[-1] += 1
+
+    def remove_stack_frame(self, close=True):
+        for frame in self.stack[:-1]:
+            for variable in frame:
+                if variable is not None:
+                    variable[-1] -= 1
+        super().remove_stack_frame(close)
+
+def generate_scoped_program(depth, variables=20, branches=200):
+    # Generate a program nesting while loops to the given depth, each declaring the given number of variables,
+    # with many sibling if statements (one frame each) in the innermost loop
+    source = ' '.join(f'if (v{depth - 1}_0 > {i}) {{ __print v0_{i % variables}; }}' for i in range(branches))
+    for level in reversed(range(depth)):
+        declarations = ' '.join(f'let v{level}_{j}:int = {j};' for j in range(variables))
+        source = f'{declarations} while (v{level}_0 < 1) {{ {source} v{level}_0 = v{level}_0 + 1; }}'
+    return source
+
+def generate_quietly(generator, ast):
+    # Generate the program's code without the generator's success message
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator().program(ast)
+
+def benchmark_code_generation(depths=(5, 10, 20, 40, 80), variables=20):
+    print('\n\033[1mCode generation: per-variable level updates vs relative levels on frame push/pop\033[0m')
+    print(f"{'depth':>12} {'variables':>10} {'frames':>8} {'updating (s)':>13} {'relative (s)':>13} {'speed-up':>10}")
+
+    for depth in depths:
+        ast = Parser().program(TokenStream(tokenize_quietly(generate_scoped_program(depth, variables))))
+        check_quietly(ast)
+
+        updating = timed(generate_quietly, LevelCountingGenerator, ast)
+        relative = timed(generate_quietly, CodeGenerator, ast)
+
+        print(f'{depth:>12} {depth * variables:>10} {depth + 200:>8} {updating:>13.4f} {relative:>13.4f} {updating / relative:>9.1f}x')
+
+class InsertingGenerator(CodeGenerator):
+    # Code generator reproducing the previous backpatching: a forward jump's target push was inserted into the
+    # code block once the body was generated, shifting every instruction emitted after it
+    def new_label(self):
+        self.sites = getattr(self, 'sites', {})
+        return super().new_label()
+
+    def push_label(self, label):
+        if self.labels[label] is None:
+            self.sites.setdefault(label, []).append(len(self.code_blocks[-1]))
+        else:
+            super().push_label(label)
+
+    def place_label(self, label):
+        block = self.code_blocks[-1]
+        for site in reversed(self.sites.pop(label, [])):
+            block.opcodes.insert(site, PUSH_PC_OPCODE)
+            block.operands.insert(site, (label,))
+            self.labels = [address + 1 if address is not None and address > site else address for address in self.labels]
+            for sites in self.sites.values():
+                sites[:] = [other + 1 if other > site else other for other in sites]
+        super().place_label(label)
+
+def generate_looping_program(depth, statements=200):
+    # Generate a program nesting while loops to the given depth around many statements
+    source = ' '.join(f'__print {i};' for i in range(statements))
+    for level in reversed(range(depth)):
+        source = f'let v{level}:int = 0; while (v{level} < 1) {{ {source} v{level} = v{level} + 1; }}'
+    return source
+
+def benchmark_linking(depths=(10, 40, 160, 320), statements=20000):
+    print('\n\033[1mCode generation: backpatching with list.insert vs symbolic labels resolved by one linking pass\033[0m')
+    print(f"{'depth':>12} {'instructions':>13} {'inserting (s)':>14} {'linking (s)':>13} {'speed-up':>10}")
+
+    for depth in depths:
+        ast = Parser().program(TokenStream(tokenize_quietly(generate_looping_program(depth, statements))))
+        check_quietly(ast)
+
+        inserting = timed(generate_quietly, InsertingGenerator, ast)
+        linking = timed(generate_quietly, CodeGenerator, ast)
+
+        generator = CodeGenerator()
+        generate_quietly(lambda: generator, ast)
+        instructions = sum(len(block) for block in generator.code_blocks)
+
+        print(f'{depth:>12} {instructions:>13} {inserting:>14.4f} {linking:>13.4f} {inserting / linking:>9.1f}x')
+
+def optimize_quietly(code_blocks):
+    # Run the peephole optimizer without its success message and report
+    optimizer = PeepholeOptimizer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.program(code_blocks)
+    return optimizer
+
+def benchmark_peephole(sizes=(1000, 4000, 16000)):
+    print('\n\033[1mPeephole optimization [-O]: generated instructions before and after, and time to reach the fixpoint\033[0m')
+    print(f"{'statements':>12} {'before':>10} {'after':>10} {'removed':>9} {'passes':>7} {'time (s)':>10}")
+
+    for size in sizes:
+        ast = Parser().program(TokenStream(tokenize_quietly(generate_program(size))))
+        check_quietly(ast)
+
+        generator = CodeGenerator()
+        generate_quietly(lambda: generator, ast)
+        start = time.perf_counter()
+        optimizer = optimize_quietly(generator.code_blocks)
+        elapsed = time.perf_counter() - start
+
+        removed = 1 - optimizer.after / optimizer.before
+        print(f'{size:>12} {optimizer.before:>10} {optimizer.after:>10} {removed:>8.1%} {optimizer.passes:>7} {elapsed:>10.4f}')
+
+def generate_drawing_program(statements):
+    # Generate a drawing program: constants declared once and used in the body of a nested for loop
+    lines = ['let size:int = 36;', 'let cell:int = size / 6;', 'let border:int = 1;', 'let red:color = #FF0000;']
+    lines += [f'let offset{i}:int = {i} * cell + border * 2;' for i in range(statements)]
+    body = ' '.join(f'__write_box x * cell + offset{i}, y * cell + border, cell - border * 2, cell - 2 * border, red;' for i in range(statements))
+    lines.append(f'for (let y:int = 0; y < size / cell; y = y + 1) {{ for (let x:int = 0; x < size / cell - 1; x = x + 1) {{ {body} }} }}')
+    return ' '.join(lines)
+
+def fold_quietly(ast):
+    # Fold the program's constants without the folder's success message
+    folder = ConstantFolder()
+    with contextlib.redirect_stdout(io.StringIO()):
+        folder.program(ast)
+    return folder
+
+def benchmark_constant_folding(sizes=(1, 4, 16), programs=500):
+    print('\n\033[1mConstant folding: generated instructions without and with folding and propagation\033[0m')
+    print(f"{'statements':>12} {'unfolded':>10} {'folded':>10} {'removed':>9} {'folds':>7} {'uses':>7}")
+
+    for size in sizes:
+        source = generate_drawing_program(size)
+        counts = []
+        for fold in (False, True):
+            ast = Parser().program(TokenStream(tokenize_quietly(source)))
+            check_quietly(ast)
+            if fold:
+                folder = fold_quietly(ast)
+            generator = CodeGenerator()
+            generate_quietly(lambda: generator, ast)
+            counts.append(sum(len(block) for block in generator.code_blocks))
+
+        unfolded, folded = counts
+        print(f'{size:>12} {unfolded:>10} {folded:>10} {1 - folded / unfolded:>8.1%} {folder.folded:>7} {folder.propagated:>7}')
+
+    # Regression sweep: folded programs must print what the unfolded ones print
+    mismatches = 0
+    for i in range(programs):
+        source = generate_program(20 + i % 40)
+        folded = Parser().program(TokenStream(tokenize_quietly(source)))
+        check_quietly(folded)
+        fold_quietly(folded)
+        mismatches += printed(Interpreter, checked(source)) != printed(Interpreter, folded)
+
+    print(f"{'regression':>12} {programs:>10} programs, {mismatches} mismatches")
+
+def generate_library_program(functions, statements=200):
+    # Generate a program with a prepended helper library: each helper calls the next, returns early and has
+    # statements after its return, and the main program only calls the last few helpers
+    library = [f'fun H{i} (x:int) -> int {{ if (x > {i}) {{ return H{i + 1}(x - 1); }} else {{ return x * {i}; }} __print x; return 0; }}'
+               for i in range(functions - 1)]
+    library.append(f'fun H{functions - 1} (x:int) -> int {{ return x; }}')
+    calls = [f'__print H{functions - 1 - i % 4}({i});' for i in range(statements)]
+    return ' '.join(library + calls)
+
+def benchmark_dead_code(sizes=(50, 200, 800)):
+    print('\n\033[1mDead code elimination [--dce]: generated code for programs with a helper library\033[0m')
+    print(f"{'functions':>12} {'kept':>6} {'instructions':>13} {'with --dce':>11} {'bytes':>9} {'with --dce':>11} {'same output':>12}")
+
+    for size in sizes:
+        source = generate_library_program(size)
+        counts = []
+        for dce in (False, True):
+            ast = Parser().program(TokenStream(tokenize_quietly(source)))
+            check_quietly(ast)
+            if dce:
+                eliminator = DeadCodeEliminator()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    eliminator.program(ast)
+                same = printed(Interpreter, ast) == printed(Interpreter, checked(source))
+            generator = CodeGenerator()
+            generate_quietly(lambda: generator, ast)
+            counts += [sum(len(block) for block in generator.code_blocks), len(generator.code)]
+
+        print(f'{size:>12} {eliminator.reached:>6} {counts[0]:>13} {counts[2]:>11} {counts[1]:>9} {counts[3]:>11} {str(same):>12}')
+
+'''
+========================= INTERPRETER BENCHMARK [--run] =========================
+'''
+class ScopeCopyingEvaluator:
+    # Evaluator reproducing the previous analyse path: tag strings compared in turn per node, children
+    # copied on every visit, [type, value] lists per variable and lookups that copy the outer scopes
+    def __init__(self):
+        self.stack = [{}]
+        self.return_ = None
+
+    def stack_get(self, name):
+        if name in self.stack[-1]:
+            return self.stack[-1][name]
+        for frame in reversed(self.stack[:-1]):
+            if name in frame:
+                return frame[name]
+        return False
+
+    def analyse(self, node):
+        tag = node.t_type
+        if tag == VARIABLE_DECLARATION_TOKEN:
+            value = self.evaluate(node.children[2])
+            if node.children[0].parameters in self.stack[-1]:
+                raise ValueError(f"Variable '{node.children[0].parameters}' already declared in the current scope")
+            self.stack[-1][node.children[0].parameters] = [node.children[1].parameters, value]
+        elif tag == ASSIGNMENT_TOKEN:
+            value = self.evaluate(node.children[1])
+            if not self.stack_get(node.children[0].parameters):
+                raise ValueError(f"Variable '{node.children[0].parameters}' does not exist")
+            entry = self.stack_get(node.children[0].parameters)
+            if entry[0] == 'int' and type(value) != int:
+                raise ValueError(f"Type mismatch: expected int, got {type(value)}")
+            entry[1] = value
+        elif tag == PRINT_STATEMENT_TOKEN:
+            print(self.evaluate(node.children[0]))
+        elif tag == IF_STATEMENT_TOKEN:
+            if self.evaluate(node.children[0]):
+                self.analyse(node.children[1])
+            elif len(node.children) == 3:
+                self.analyse(node.children[2])
+        elif tag == FOR_STATEMENT_TOKEN:
+            self.stack.append({})
+            if node.children[0]:
+                self.analyse(node.children[0])
+            while self.evaluate(node.children[1]):
+                for statement in node.children[3].children:
+                    self.analyse(statement)
+                self.analyse(node.children[2])
+            self.stack.pop()
+        elif tag == WHILE_STATEMENT_TOKEN:
+            self.stack.append({})
+            while self.evaluate(node.children[0]):
+                for statement in node.children[1].children:
+                    self.analyse(statement)
+            self.stack.pop()
+        elif tag == RETURN_STATEMENT_TOKEN:
+            self.return_ = self.evaluate(node.children[0])
+        elif tag == FUNCTION_DECLARATION_TOKEN:
+            self.stack[-1][node.children[0].parameters] = ['function', node.children[1], node.children[-1]]
+        else:
+            for child in list(node.children):
+                self.analyse(child)
+
+    def evaluate(self, node):
+        if node.t_type == FUNCTION_CALL_TOKEN:
+            function = self.stack_get(node.children[0].parameters)
+            self.stack.append({})
+            for parameter, argument in zip(function[1].children, node.children[1].children):
+                self.stack[-1][parameter.children[0].parameters] = [parameter.children[1].parameters, self.evaluate(argument)]
+            for statement in function[2].children:
+                self.analyse(statement)
+            self.stack.pop()
+            return self.return_
+        elif node.t_type == IDENTIFIER_TOKEN:
+            variable = self.stack_get(node.parameters)
+            if not variable:
+                raise ValueError(f"Variable '{node.parameters}' does not exist")
+            return variable[1]
+        elif node.t_type == INTEGER_LITERAL_TOKEN:
+            return int(node.parameters)
+        elif node.t_type == ADDITIVE_OP_TOKEN:
+            left = self.evaluate(node.children[0])
+            right = self.evaluate(node.children[1])
+            if node.parameters == '+':
+                return left + right
+            elif node.parameters == '-':
+                return left - right
+        elif node.t_type == MULTIPLICATIVE_OP_TOKEN:
+            left = self.evaluate(node.children[0])
+            right = self.evaluate(node.children[1])
+            if node.parameters == '*':
+                return left * right
+            elif node.parameters == '/':
+                return left // right
+        elif node.t_type == RELATIONAL_OP_TOKEN:
+            left = self.evaluate(node.children[0])
+            right = self.evaluate(node.children[1])
+            if node.parameters == '<':
+                return left < right
+            elif node.parameters == '>':
+                return left > right
+            elif node.parameters == '==':
+                return left == right
+        else:
+            return self.evaluate(node.children[0])
+
+def generate_loop_programs(iterations):
+    # Loop-heavy PArL programs: nested for loops, a while loop calling a function, and branches around a call
+    return {
+        'nested for': f'let s:int = 0; for (let i:int = 0; i < {iterations // 100}; i = i + 1) {{ '
+                      f'for (let j:int = 0; j < 100; j = j + 1) {{ s = s + i * j - j; }} }} __print s;',
+        'while + call': f'fun Sq (x:int) -> int {{ return x * x / 2; }} let s:int = 0; let i:int = 0; '
+                        f'while (i < {iterations}) {{ if (i > 3) {{ s = s + Sq(i); }} i = i + 1; }} __print s;',
+        'branches': f'fun Max (a:int, b:int) -> int {{ let m:int = a; if (b > m) {{ m = b; }} return m; }} let s:int = 0; '
+                    f'for (let i:int = 0; i < {iterations}; i = i + 1) {{ if (i / 2 * 2 == i) {{ s = Max(s, i); }} else {{ s = s - 1; }} }} __print s;',
+    }
+
+def run_quietly(runner, ast):
+    # Execute the program without printing its output
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner(ast)
+
+def benchmark_interpreter(iterations=200000):
+    print('\n\033[1mInterpreter: previous evaluating analyser vs pre-resolved tree-walking interpreter\033[0m')
+    print(f"{'program':>14} {'iterations':>11} {'analyser (s)':>13} {'run (s)':>10} {'speed-up':>10}")
+
+    for name, source in generate_loop_programs(iterations).items():
+        ast = checked(source)
+
+        analyser = timed(run_quietly, ScopeCopyingEvaluator().analyse, ast)
+        run = timed(run_quietly, Interpreter().run, ast)
+
+        print(f'{name:>14} {iterations:>11} {analyser:>13.3f} {run:>10.3f} {analyser / run:>9.1f}x')
+
+'''
+========================= CLOSURE COMPILER BENCHMARK [--run-closures] =========================
+'''
+def printed(runner, ast):
+    # Execute the program and return the values of its __print statements
+    values = []
+    runner(output=values.append).run(ast)
+    return values
+
+def benchmark_closures(iterations=200000, programs=2000):
+    print('\n\033[1mClosure compiler: tree-walking interpreter vs compiled closures\033[0m')
+    print(f"{'program':>14} {'iterations':>11} {'interpret (s)':>14} {'closures (s)':>13} {'speed-up':>10}")
+
+    for name, source in generate_loop_programs(iterations).items():
+        ast = checked(source)
+
+        interpret = timed(printed, Interpreter, ast)
+        closures = timed(printed, ClosureCompiler, ast)
+
+        print(f'{name:>14} {iterations:>11} {interpret:>14.3f} {closures:>13.3f} {interpret / closures:>9.1f}x')
+
+    # Regression sweep: compile and run many small programs, checking their output against the interpreter
+    asts = [checked(generate_program(20 + i % 40)) for i in range(programs)]
+    start = time.perf_counter()
+    outputs = [printed(ClosureCompiler, ast) for ast in asts]
+    elapsed = time.perf_counter() - start
+    mismatches = sum(output != printed(Interpreter, ast) for ast, output in zip(asts, outputs))
+
+    print(f"{'regression':>14} {programs:>11} programs in {elapsed:.3f} s ({programs / elapsed:.0f} programs/s), {mismatches} mismatches")
+
+'''
+========================= VIRTUAL MACHINE BENCHMARK [--vm] =========================
+'''
+def compile_quietly(source, fold=False, optimize=False):
+    # Generate the program's PArIR text, with constant folding and the peephole optimizer if asked
+    ast = Parser().program(TokenStream(tokenize_quietly(source)))
+    check_quietly(ast)
+    generator = CodeGenerator()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if fold:
+            ConstantFolder().program(ast)
+        generator.program(ast)
+        if optimize:
+            PeepholeOptimizer().program(generator.code_blocks)
+            generator.serialize()
+    return generator.code
+
+def executed(code):
+    # Load and run PArIR on the virtual machine, returning the machine and the values it printed
+    values = []
+    machine = VirtualMachine(output=values.append)
+    machine.load(code)
+    machine.run()
+    return machine, values
+
+def interpreted(source):
+    # Values printed by the interpreter
+    return printed(Interpreter, checked(source))
+
+def benchmark_virtual_machine(iterations=20000, programs=500):
+    print('\n\033[1mVirtual machine [--vm]: instructions executed by generated PArIR, without and with folding and -O\033[0m')
+    print(f"{'program':>14} {'code':>10} {'executed':>10} {'time (s)':>9} {'instructions/s':>15} {'same output':>12}")
+
+    for name, source in generate_loop_programs(iterations).items():
+        expected = interpreted(source)
+        for code, fold, optimize in (('plain', False, False), ('folded -O', True, True)):
+            machine, values = executed(compile_quietly(source, fold, optimize))
+            print(f'{name:>14} {code:>10} {machine.steps:>10} {machine.elapsed:>9.3f} {machine.steps / machine.elapsed:>15,.0f} {str(values == expected):>12}')
+
+    # Differential sweep: generated programs must print on the virtual machine what they print when interpreted
+    mismatches = 0
+    for i in range(programs):
+        source = generate_program(20 + i % 40)
+        mismatches += executed(compile_quietly(source, True, True))[1] != interpreted(source)
+    print(f"{'differential':>14} {programs:>10} programs, {mismatches} mismatches")
+
+class PerPixelMachine(VirtualMachine):
+    # Virtual machine reproducing the previous pad: one flat list, boxes filled one pixel at a time
+    def __init__(self, width=PAD_WIDTH, height=PAD_HEIGHT, output=print):
+        super().__init__(width, height, output)
+        self.pixels = [0] * (width * height)
+
+    def write_box(self, operand):
+        stack = self.stack
+        x, y, w, h, colour = stack.pop(), stack.pop(), stack.pop(), stack.pop(), stack.pop()
+        for row in range(max(y, 0), min(y + h, self.height)):
+            for column in range(max(x, 0), min(x + w, self.width)):
+                self.pixels[row * self.width + column] = colour
+
+    def clear(self, operand):
+        self.pixels = [self.stack.pop()] * (self.width * self.height)
+
+def generate_box_program(frames):
+    # A drawing program: every frame repaints the pad and draws a box moving across it
+    return (f'for (let i:int = 0; i < {frames}; i = i + 1) {{ __write_box 0, 0, __width, __height, #000000; '
+            f'__write_box i * 4, i * 2, __width / 2, __height / 3, #FF0000; __write i, i, #00FF00; }}')
+
+def benchmark_framebuffer(sizes=(64, 256, 1024), frames=8):
+    # Every framebuffer is timed: NumPy's only where NumPy is installed, so no speed-up is assumed for it
+    backends = [Framebuffer] + ([NumpyFramebuffer] if numpy is not None else [])
+    print(f'\n\033[1mFramebuffer [--vm]: drawing {frames} frames, per-pixel writes vs each framebuffer\033[0m')
+    print(f"{'pad':>12} {'per pixel (s)':>14}" + ''.join(f" {backend.backend + ' (s)':>12} {'speed-up':>10}" for backend in backends))
+
+    code = compile_quietly(generate_box_program(frames))
+    for size in sizes:
+        machine = PerPixelMachine(size, size)
+        machine.load(code)
+        per_pixel = timed(machine.run)
+        line = f"{f'{size}x{size}':>12} {per_pixel:>14.3f}"
+        for backend in backends:
+            machine = VirtualMachine(size, size)
+            machine.display = backend(size, size)
+            machine.load(code)
+            elapsed = timed(machine.run)
+            line += f' {elapsed:>12.4f} {per_pixel / elapsed:>9.1f}x'
+        print(line)
+    if numpy is None:
+        print(f"{'numpy':>12} not installed, not measured")
+
+def generate_animation_program(frames, delay=16):
+    # An animation: every frame repaints the pad, draws a box moving across it and waits for the next frame
+    return (f'for (let i:int = 0; i < {frames}; i = i + 1) {{ __write_box 0, 0, __width, __height, #000000; '
+            f'__write_box i / 4, i / 8, 6, 6, #FF0000; __delay {delay}; }}')
+
+def benchmark_virtual_clock(frames=3600, delay=16):
+    print('\n\033[1mVirtual clock [--vm]: an animation of 16 ms frames rendered in batch, with a snapshot per frame\033[0m')
+    print(f"{'frames':>8} {'animation (s)':>14} {'batch (s)':>10} {'snapshots':>10} {'identical runs':>15}")
+
+    code = compile_quietly(generate_animation_program(frames, delay))
+    runs = []
+    for _ in range(2):
+        snapshots = []
+        machine = VirtualMachine(snapshot=lambda clock, display: snapshots.append((clock, display.rows())))
+        machine.load(code)
+        elapsed = timed(machine.run)
+        runs.append(snapshots)
+
+    print(f'{frames:>8} {machine.clock / 1000:>14.1f} {elapsed:>10.3f} {len(runs[0]):>10} {str(runs[0] == runs[1]):>15}')
+
+class FullFrameExporter(FrameExporter):
+    # Exporter reproducing whole-frame encoding: every frame re-encodes the whole pad
+    def changed(self, display, dirty):
+        return 0, self.height, 0, self.width
+
+def benchmark_frame_export(frames=1000, size=256):
+    print(f'\n\033[1mFrame export [--export]: {frames} frames of a {size}x{size} animation, whole frames vs changed rectangles\033[0m')
+    print(f"{'exporter':>12} {'written':>8} {'log bytes':>11} {'export (s)':>11} {'replayed':>9}")
+
+    # Every frame moves a box along the diagonal, except every fourth frame, which draws nothing new
+    source = (f'for (let i:int = 0; i < {frames}; i = i + 1) {{ let x:int = i - i / {size - 8} * {size - 8}; '
+              f'if (i / 4 * 4 != i) {{ __write_box x, x, 8, 8, #FF0000; }} __delay 16; }}')
+    code = compile_quietly(source)
+
+    for name, exporter_class in (('whole', FullFrameExporter), ('changed', FrameExporter)):
+        with tempfile.TemporaryDirectory() as directory:
+            snapshots = []
+            exporter = exporter_class(directory, size, size)
+            elapsed = [0.0]  # Time spent exporting
+            def snapshot(clock, display):
+                snapshots.append(display.rows())
+                elapsed[0] += timed(exporter.frame, clock, display)
+            machine = VirtualMachine(size, size, snapshot=snapshot)
+            machine.load(code)
+            machine.run()
+            elapsed[0] += timed(exporter.close, machine.clock, machine.display)
+            snapshots.append(machine.display.rows())
+
+            # Replaying the log must give back every frame that differs from the one before it
+            distinct = [rows for i, rows in enumerate(snapshots) if i == 0 or rows != snapshots[i - 1]]
+            replayed = [rows for _, rows in read_frames(os.path.join(directory, 'frames.log'))]
+            if name == 'whole':
+                replayed = [rows for i, rows in enumerate(replayed) if i == 0 or rows != replayed[i - 1]]
+            size_ = os.path.getsize(os.path.join(directory, 'frames.log'))
+
+        print(f'{name:>12} {exporter.written:>8} {size_:>11} {elapsed[0]:>11.3f} {str(replayed == distinct):>9}')
+
+def benchmark_profiler(iterations=20000):
+    print('\n\033[1mProfiler [--profile]: profiling overhead, and the cost of the push 0; eq; cjmp condition test\033[0m')
+    print(f"{'program':>14} {'code':>6} {'executed':>10} {'vm (s)':>8} {'profiled (s)':>13} {'overhead':>9} {'conditions':>11}")
+
+    for name, source in generate_loop_programs(iterations).items():
+        for code, optimize in (('plain', False), ('-O', True)):
+            text = compile_quietly(source, optimize=optimize)
+            machines = []
+            for machine in (VirtualMachine(output=lambda value: None), ProfilingMachine(output=lambda value: None)):
+                machine.load(text)
+                machine.run()
+                machines.append(machine)
+            plain, profiled = machines
+            share = 4 * profiled.conditions() / profiled.steps
+            print(f'{name:>14} {code:>6} {profiled.steps:>10} {plain.elapsed:>8.3f} {profiled.elapsed:>13.3f} {profiled.elapsed / plain.elapsed:>8.1f}x {share:>10.1%}')
+
+if __name__ == '__main__':
+    benchmark_lexer()
+    benchmark_comments()
+    benchmark_streaming()
+    benchmark_token_memory()
+    benchmark_parser()
+    benchmark_ast_memory()
+    benchmark_expressions()
+    benchmark_nesting()
+    benchmark_semantic()
+    benchmark_code_generation()
+    benchmark_linking()
+    benchmark_peephole()
+    benchmark_constant_folding()
+    benchmark_dead_code()
+    benchmark_interpreter()
+    benchmark_closures()
+    benchmark_virtual_machine()
+    benchmark_framebuffer()
+    benchmark_virtual_clock()
+    benchmark_frame_export()
+    benchmark_profiler()
@@ -0,0 +1,225 @@
+import operator
+
+from PArL import *
+
+from Interpreter import Interpreter
+
+'''
+========================= Closure Compiler ========================= 
+'''
+class ClosureCompiler(Interpreter):
+    # Compiles the interpreter's resolved tree once into nested Python closures, so executing a
+    # loop body calls the closures directly instead of dispatching on every node
+    def __init__(self, width=PAD_WIDTH, height=PAD_HEIGHT, output=print):
+        super().__init__(width, height, output)
+
+        # Closure builders indexed by the execute method of the resolved node
+        self.compilers = {
+            self.execute_block: self.compile_block,
+            self.execute_store: self.compile_store,
+            self.execute_program_store: self.compile_program_store,
+            self.execute_print: self.compile_print,
+            self.execute_delay: self.compile_delay,
+            self.execute_write: self.compile_write,
+            self.execute_write_box: self.compile_write,
+            self.execute_if: self.compile_if,
+            self.execute_while: self.compile_while,
+            self.execute_return: self.compile_return,
+            self.execute_call: self.compile_call,
+            self.execute_binary: self.compile_binary,
+            self.execute_binary_constant: self.compile_binary_constant,
+            self.execute_chain: self.compile_chain,
+            self.execute_unary: self.compile_unary,
+            self.execute_variable: self.compile_variable,
+            self.execute_program_variable: self.compile_program_variable,
+            self.execute_constant: self.compile_constant,
+        }
+
+        # Operators inlined into their closures (any other operator is called through its callable)
+        self.inlined = {
+            operator.add: (lambda l, r: lambda: l() + r(), lambda l, c: lambda: l() + c),
+            operator.sub: (lambda l, r: lambda: l() - r(), lambda l, c: lambda: l() - c),
+            operator.mul: (lambda l, r: lambda: l() * r(), lambda l, c: lambda: l() * c),
+            operator.lt: (lambda l, r: lambda: l() < r(), lambda l, c: lambda: l() < c),
+            operator.gt: (lambda l, r: lambda: l() > r(), lambda l, c: lambda: l() > c),
+            operator.le: (lambda l, r: lambda: l() <= r(), lambda l, c: lambda: l() <= c),
+            operator.ge: (lambda l, r: lambda: l() >= r(), lambda l, c: lambda: l() >= c),
+            operator.eq: (lambda l, r: lambda: l() == r(), lambda l, c: lambda: l() == c),
+            operator.ne: (lambda l, r: lambda: l() != r(), lambda l, c: lambda: l() != c),
+        }
+
+        # Chains of binary operations up to this length are compiled into nested closures, longer ones into a loop
+        # (calling a closure nested once per operation would overflow the Python stack on long chains)
+        self.nesting = 32
+
+        # Compiled function bodies, filled in once per function (a list cell, so that recursive calls can refer to it)
+        self.bodies = {}
+
+    '''
+    ========================= run() ========================= 
+    '''
+    def run(self, program_node):
+        # Resolve and compile the whole program once, then call the compiled program
+        program = self.compile(self.resolve(program_node))
+        program()
+
+    def compile(self, node):
+        return self.compilers[node[0]](node)
+
+    '''
+    ========================= STATEMENTS ========================= 
+    '''
+    # Compiled statements return None, or a 1-tuple holding the value of an executed return statement.
+
+    def compile_block(self, node):
+        statements = tuple(self.compile(statement) for statement in node[1])
+
+        def block():
+            for statement in statements:
+                result = statement()
+                if result is not None:
+                    return result
+        return block
+
+    def compile_store(self, node):
+        display, depth, index, value = self.display, node[1], node[2], self.compile(node[3])
+
+        def store():
+            display[depth][index] = value()
+        return store
+
+    def compile_program_store(self, node):
+        frame, index, value = node[1], node[2], self.compile(node[3])
+
+        def store():
+            frame[index] = value()
+        return store
+
+    def compile_print(self, node):
+        output, value = self.output, self.compile(node[1])
+
+        def print_():
+            output(value())
+        return print_
+
+    def compile_delay(self, node):
+        # Delays only evaluate their operand
+        value = self.compile(node[1])
+
+        def delay():
+            value()
+        return delay
+
+    def compile_write(self, node):
+        # The pad statements are rare enough to be executed by the interpreter on the compiled operands
+        execute, arguments = node[0], tuple((self.execute_compiled, self.compile(argument)) for argument in node[1])
+        resolved = (execute, arguments)
+        return lambda: execute(resolved)
+
+    def execute_compiled(self, node):
+        return node[1]()
+
+    def compile_if(self, node):
+        condition, then_block = self.compile(node[1]), self.compile(node[2])
+        if node[3] is None:
+            def if_():
+                if condition():
+                    return then_block()
+            return if_
+
+        else_block = self.compile(node[3])
+
+        def if_else():
+            if condition():
+                return then_block()
+            return else_block()
+        return if_else
+
+    def compile_while(self, node):
+        condition, body = self.compile(node[1]), tuple(self.compile(statement) for statement in node[2])
+
+        def while_():
+            while condition():
+                for statement in body:
+                    result = statement()
+                    if result is not None:
+                        return result
+        return while_
+
+    def compile_return(self, node):
+        value = self.compile(node[1])
+        return lambda: (value(),)
+
+    '''
+    ========================= EXPRESSIONS ========================= 
+    '''
+    def compile_call(self, node):
+        function, arguments = node[1], tuple(self.compile(argument) for argument in node[2])
+        display, depth, size = self.display, function.depth, function.size
+
+        # Compile the body on the first call site only; recursive call sites find the cell already present
+        body = self.bodies.get(function)
+        if body is None:
+            body = self.bodies[function] = [None]
+            body[0] = self.compile(function.body)
+
+        def call():
+            frame = [None] * size
+            for index, argument in enumerate(arguments):
+                frame[index] = argument()
+            outer = display[depth]
+            display[depth] = frame
+            result = body[0]()
+            display[depth] = outer
+            return result[0]
+        return call
+
+    def compile_binary(self, node):
+        return self.binary_closure(node[1], self.compile(node[2]), node[3])
+
+    def compile_binary_constant(self, node):
+        return self.binary_closure(node[1], self.compile(node[2]), (self.execute_constant, node[3]))
+
+    def compile_chain(self, node):
+        left = self.compile(node[1])
+        if len(node[2]) <= self.nesting:
+            # Nest the closures of the operations from the innermost operation outwards
+            for function, right in node[2]:
+                left = self.binary_closure(function, left, right)
+            return left
+
+        operations = tuple((function, self.compile(right)) for function, right in node[2])
+        def chain():
+            value = left()
+            for function, right in operations:
+                value = function(value, right())
+            return value
+        return chain
+
+    def binary_closure(self, function, left, right):
+        # The closure applying an operator to a compiled left operand and a resolved right operand
+        if right[0] == self.execute_constant:
+            constant = right[1]
+            if function in self.inlined:
+                return self.inlined[function][1](left, constant)
+            return lambda: function(left(), constant)
+        right = self.compile(right)
+        if function in self.inlined:
+            return self.inlined[function][0](left, right)
+        return lambda: function(left(), right())
+
+    def compile_unary(self, node):
+        function, value = node[1], self.compile(node[2])
+        return lambda: function(value())
+
+    def compile_variable(self, node):
+        display, depth, index = self.display, node[1], node[2]
+        return lambda: display[depth][index]
+
+    def compile_program_variable(self, node):
+        frame, index = node[1], node[2]
+        return lambda: frame[index]
+
+    def compile_constant(self, node):
+        value = node[1]
+        return lambda: value
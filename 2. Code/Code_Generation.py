@@ -5,21 +5,52 @@ from PArL import *
 '''
 class CodeGenerator:
     def __init__(self):
-        # Initialize stack, return value, frame index, and stack level
-        self.stack = [{}]
-        self.return_ = None
-
-        self.frame_index = 0  
-        self.stack_level = 0  # for SoF 
+        # Initialize stack (one list of variable entries per open frame, indexed by the Resolver's
+        # (depth, index) bindings) and stack level
+        self.stack = []
+        self.return_type = None  # Return type of the function being generated (None in main)
+        self.function = None  # Declaration of the function being generated (None in main)
+        self.names = {}  # id() of a function declaration -> name of its code block
+        self.types = {}  # id() of a variable's binding -> its type
+
+        # A function cannot reach the frames it is declared in with PArIR levels, as it is called with any number of
+        # frames open below its own. The variables declared outside a function that it, or a function it calls,
+        # uses are passed to it as hidden arguments after its parameters, and the ones assigned are pushed after
+        # the return value and stored back by the caller. id() of a function declaration -> bindings of:
+        self.outer = {}  # Its hidden parameters, in order
+        self.copied = {}  # The hidden parameters copied back after a call, in order
+        self.hidden = {}  # (binding of a hidden parameter -> its index in the function's frame)
+
+        self.stack_level = 0  # Depth of the current frame in the SoF (0 for main)
 
         self.code_blocks = []
         self.code = ''
-
-        self.padheight = 8
-        self.padwidth = 8
-        self.padrandi = 2
-
-        self.add_code = True  # Flag to control code addition
+        self.labels = []  # Addresses of the current code block's labels (None until placed)
+
+        # Statement generators indexed by node kind
+        self.statements = {
+            VARIABLE_DECLARATION_KIND: self.variable_decl,
+            ASSIGNMENT_KIND: self.assignment,
+            PRINT_STATEMENT_KIND: self.print_statement,
+            DELAY_STATEMENT_KIND: self.delay_statement,
+            IF_STATEMENT_KIND: self.if_statement,
+            FOR_STATEMENT_KIND: self.for_statement,
+            WHILE_STATEMENT_KIND: self.while_statement,
+            RETURN_STATEMENT_KIND: self.return_statement,
+            FUNCTION_DECLARATION_KIND: self.function_decl,
+            WRITE_KIND: self.write_statement,
+            WRITE_BOX_KIND: self.write_box_statement,
+            BLOCK_KIND: self.block,
+        }
+
+        # (opcode, operands) of the instructions of each operator, emitted after its operands
+        self.operators = {
+            '+': [(ADD_OPCODE, ())], '-': [(SUB_OPCODE, ())], '*': [(MUL_OPCODE, ())], '/': [(DIV_OPCODE, ())],
+            'and': [(AND_OPCODE, ())], 'or': [(OR_OPCODE, ())],
+            '<': [(LT_OPCODE, ())], '>': [(GT_OPCODE, ())], '<=': [(LE_OPCODE, ())], '>=': [(GE_OPCODE, ())],
+            '==': [(EQ_OPCODE, ())], '!=': [(EQ_OPCODE, ()), (NOT_OPCODE, ())],
+        }
+        self.binary_kinds = {RELATIONAL_OP_KIND, ADDITIVE_OP_KIND, MULTIPLICATIVE_OP_KIND}
 
     '''
     ========================= program() ========================= 
@@ -31,138 +62,186 @@ class CodeGenerator:
         # Separate main and function declarations
         for node in program.children:
             if isinstance(node, AST_Node):
-                if node.t_type != 'FUNCTION_DECLARATION':
+                node = node.unwrap()
+                if node.kind != FUNCTION_DECLARATION_KIND:
                     main.append(node)
                 else:
                     other.append(node)
 
+        # Open the main frame (functions are generated inside it)
+        self.stack = [[None] * program.binding[1]]
+        self.declarations(program)
+
         # Generate code for function declarations
         for node in other:
-            self.add_code = True
             self.generate(node)
 
         # Generate code for main function
-        self.add_code = True
-        self.code_blocks.append([])
-        self.code_blocks[-1].append('.main\n')
+        self.code_blocks.append(Instructions('main'))
 
-        # Count number of variable declarations (always declare at least 1)
-        var_declarations = 1
-        for node in main:
-            if node.t_type == 'VARIABLE_DECLARATION':
-                var_declarations += 1
+        # Size of the main frame (always declare at least 1)
+        var_declarations = max(program.binding[1], 1)
 
         # Allocate space for variables
         if var_declarations > 0:
-            self.add_command(PAR_PUSH, var_declarations)
-            self.add_command(PAR_OFRAME)
-        self.add_command(PAR_PUSH, '#ffffff')
-        self.add_command(PAR_CLEAR)
+            self.add_command(PUSH_OPCODE, var_declarations)
+            self.add_command(OFRAME_OPCODE)
+        self.add_command(PUSH_OPCODE, '#ffffff')
+        self.add_command(CLEAR_OPCODE)
 
-        # Initialize stack level and frame index
+        # Initialize stack level
         self.stack_level = 0
-        self.frame_index = 0
 
         # Generate code for main block
         for node in main:
-            self.add_code = True
             self.generate(node)
 
-        # Add HALT command
-        self.add_code = True
-        self.add_command(PAR_HALT)
+        # Add HALT command and resolve the labels of main
+        self.add_command(HALT_OPCODE)
+        self.link()
 
-        # Join all code blocks into a single string
-        self.code = ''.join([''.join(block) for block in self.code_blocks])
+        self.serialize()
         print("\033[92m\033[1mCode Generation successful! - Check 'output.txt'\033[0m")
 
+    '''
+    ========================= declarations() ========================= 
+    '''
+    def declarations(self, program):
+        # Name every function's code block, record the type of every variable, and find the hidden parameters
+        # of every function, before any code is generated (functions are generated before the program)
+        used = {'main'}
+        functions = []
+        uses = {}  # id() of a function declaration -> {binding: binding} of the outer variables it uses
+        assigns = {}  # ... and of those it assigns
+        calls = {}  # id() of a function declaration -> the declarations of the functions it calls
+
+        pending = [(program, None)]
+        while pending:
+            node, function = pending.pop()
+            kind = node.kind
+            if function is not None and kind in (IDENTIFIER_KIND, ASSIGNMENT_KIND):
+                binding = node.binding if kind == IDENTIFIER_KIND else node.children[0].binding
+                if binding[0] < function.binding[0]:
+                    uses[id(function)][binding] = binding
+                    if kind == ASSIGNMENT_KIND:
+                        assigns[id(function)][binding] = binding
+
+            if kind == FUNCTION_DECLARATION_KIND:
+                # Functions of the same name may be declared in different blocks, names differing only in case
+                # are lowercased alike, and .main is the program's
+                name = node.children[0].parameters.lower()
+                unique = name
+                count = 2
+                while unique in used:
+                    unique = f'{name}_{count}'
+                    count += 1
+                used.add(unique)
+                self.names[id(node)] = unique
+
+                functions.append(node)
+                uses[id(node)], assigns[id(node)], calls[id(node)] = {}, {}, []
+                for parameter in self.parameters(node):
+                    self.types[id(parameter.children[0].binding)] = parameter.children[1].parameters
+                pending.append((node.children[-1], node))
+            elif kind == VARIABLE_DECLARATION_KIND:
+                self.types[id(node.children[0].binding)] = node.children[1].parameters
+                pending.append((node.children[2], function))
+            elif kind == ASSIGNMENT_KIND:
+                pending.append((node.children[1], function))
+            elif kind == FUNCTION_CALL_KIND:
+                if function is not None:
+                    calls[id(function)].append(node.children[0].binding)
+                if len(node.children) == 2:
+                    pending.extend((argument, function) for argument in reversed(node.children[1].children))
+            else:
+                pending.extend((child, function) for child in reversed(node.children) if isinstance(child, AST_Node))
+
+        # A function also needs the outer variables of the functions it calls, until no function needs more
+        changed = True
+        while changed:
+            changed = False
+            for function in functions:
+                depth = function.binding[0]
+                for callee in calls[id(function)]:
+                    for table in (uses, assigns):
+                        variables = table[id(function)]
+                        for binding in table[id(callee)]:
+                            if binding[0] < depth and binding not in variables:
+                                variables[binding] = binding
+                                changed = True
+
+        for function in functions:
+            self.outer[id(function)] = sorted(uses[id(function)].values())
+            self.copied[id(function)] = sorted(assigns[id(function)].values())
+            first = len(self.parameters(function))
+            self.hidden[id(function)] = {binding: first + slot for slot, binding in enumerate(self.outer[id(function)])}
+
+    def parameters(self, node):
+        # Formal parameters of a function declaration
+        return node.children[1].children if len(node.children) == 4 else ()
+
+    '''
+    ========================= serialize() ========================= 
+    '''
+    def serialize(self):
+        # Serialize all code blocks into a single string
+        self.code = ''.join([block.text() for block in self.code_blocks])
+
     '''
     ========================= generate() ========================= 
     '''
     def generate(self, node):
         if isinstance(node, AST_Node):
-            if node.t_type == 'VARIABLE_DECLARATION':
-                self.variable_decl(node)
-            elif node.t_type == 'ASSIGNMENT':
-                self.assignment(node)
-            elif node.t_type == 'PRINT_STATEMENT':
-                self.print_statement(node)
-            elif node.t_type == 'DELAY_STATEMENT':
-                self.delay_statement(node)
-            elif node.t_type == 'IF_STATEMENT':
-                self.if_statement(node)
-            elif node.t_type == 'FOR_STATEMENT':
-                self.for_statement(node)
-            elif node.t_type == 'WHILE_STATEMENT':
-                self.while_statement(node)
-            elif node.t_type == 'RETURN_STATEMENT':
-                self.return_statement(node)
-            elif node.t_type == 'FUNCTION_DECLARATION':
-                self.function_decl(node)
-            elif node.t_type == 'WRITE_TOKEN':
-                self.write_statement(node)
-            elif node.t_type == 'WRITE_BOX_TOKEN':
-                self.write_box_statement(node)
-
-    default = {
-        'int': 1,
-        'float': 1.0,
-        'bool': True,
-        'color': '#FFFFFF',
-    }
+            # Identify the statement kind and call the appropriate method
+            node = node.unwrap()
+            statement = self.statements.get(node.kind)
+            if statement is not None:
+                statement(node)
 
     '''
     ========================= stack_get() ========================= 
     '''
     def stack_get(self, node):
-        # Retrieve a variable from the stack
-        for frame in reversed(self.stack):
-            if node.text in frame:
-                return frame[node.parameters]
-        return False
+        # Retrieve a variable from its frame slot
+        depth, index = node.binding
+        return self.stack[depth][index]
+
+    '''
+    ========================= location() ========================= 
+    '''
+    def location(self, binding):
+        # Frame index and level of a variable: its frame is (current depth - declaration depth) frames down
+        depth, index = binding
+        function = self.function
+        if function is not None:
+            top = function.binding[0]
+            if depth < top:
+                # Declared outside the function: its hidden parameter in the function's frame
+                return (self.hidden[id(function)][binding], self.stack_level - top)
+            if depth == top and index >= len(self.parameters(function)):
+                # The function's locals follow its parameters and hidden parameters
+                index += len(self.outer[id(function)])
+        return (index, self.stack_level - depth)
 
     '''
     ========================= stack_set() ========================= 
     '''
     def stack_set(self, node, value):
-        # Set a variable in the stack
-        for frame in self.stack:
-            if node.parameters in frame:
-                if isinstance(value, list):
-                    frame[node.parameters] = value
-                else:
-                    frame[node.parameters][1] = value
-                return True
-
+        # Set a variable (or just its value) in its frame slot
+        depth, index = node.binding
         if isinstance(value, list):
-            self.stack[-1][node.parameters] = value
+            self.stack[depth][index] = value
         else:
-            type_ = type(value).__name__
-            self.stack[-1][node.parameters] = [type_, value]
+            self.stack[depth][index][1] = value
 
     '''
     ========================= add_command() ========================= 
     '''
-    def add_command(self, operator, operand=None):
-        # Add a command to the current code block
-        if self.add_code and operator is not None:
-            if operand is not None:
-                if isinstance(operand, list):
-                    if operator == PAR_PUSH_STACK:
-                        self.code_blocks[-1].append(f"{operator}[{operand[0]}:{operand[1]}]\n")
-                else:
-                    operand = str(operand)
-                    if operator == PAR_OFRAME:
-                        pass
-                    if operator == PAR_PUSH_DOT:
-                        operand = operand.lower()
-                        self.code_blocks[-1].append(f"{operator}{operand}\n")
-                    elif operator == PAR_PUSH_STACK:
-                        self.code_blocks[-1].append(f"{operator}[{operand}]\n")
-                    else:
-                        self.code_blocks[-1].append(f"{operator} {operand}\n")
-            else:
-                self.code_blocks[-1].append(f"{operator}\n")
+    def add_command(self, opcode, *operands):
+        # Add an instruction to the current code block (serialized only once the program is generated)
+        block = self.code_blocks[-1]
+        block.opcodes.append(opcode)
+        block.operands.append(operands)
 
     '''
     ========================= variable_decl() ========================= 
@@ -171,17 +250,13 @@ class CodeGenerator:
         identifier = node.children[0]
         type_ = node.children[1]
         expr = node.children[2]
-        val = self.code_evaluate(expr)
-        self.stack_set(identifier, [type_.parameters, val, self.frame_index, self.stack_level])
+        self.code_evaluate(expr)
+        self.widen(expr, type_.parameters)
 
-        # Push the value onto the stack
-        if val is not None and val not in ['__height', '__width', '__randi']:
-            self.add_command(PAR_PUSH, val)
-        self.add_command(PAR_PUSH, self.frame_index)
-        self.add_command(PAR_PUSH, self.stack_level)
-        self.add_command(PAR_ST)
-
-        self.frame_index += 1
+        # Store the value (variables are declared in the current frame, level 0)
+        self.add_command(PUSH_OPCODE, self.location(identifier.binding)[0])
+        self.add_command(PUSH_OPCODE, 0)
+        self.add_command(ST_OPCODE)
 
     '''
     ========================= assignment() ========================= 
@@ -189,56 +264,38 @@ class CodeGenerator:
     def assignment(self, node):
         identifier = node.children[0]
         expr = node.children[1]
-        val = self.code_evaluate(expr)
-        mem_loc = self.stack_get(identifier)
+        self.code_evaluate(expr)
+        self.widen(expr, self.types[id(identifier.binding)])
+        mem_loc = self.location(identifier.binding)
 
-        # Push the value and memory location onto the stack
-        self.add_command(PAR_PUSH, val)
-        self.add_command(PAR_PUSH, mem_loc[2])  # frame index
-        self.add_command(PAR_PUSH, mem_loc[3])  # level in SoF
-        self.add_command(PAR_ST)
-        self.stack_set(identifier, val)
+        # Store the value at its memory location
+        self.add_command(PUSH_OPCODE, mem_loc[0])  # frame index
+        self.add_command(PUSH_OPCODE, mem_loc[1])  # level in SoF
+        self.add_command(ST_OPCODE)
 
     '''
     ========================= print_statement() ========================= 
     '''
     def print_statement(self, node):
-        expr = node.children[0]
-        val = self.code_evaluate(expr)
-
-        # Push the value and print
-        if val:
-            self.add_command(PAR_PUSH, val)
-        self.add_command(PAR_PRINT)
+        self.code_evaluate(node.children[0])
+        self.add_command(PRINT_OPCODE)
 
     '''
     ========================= delay_statement() ========================= 
     '''
     def delay_statement(self, node):
-        expr = node.children[0]
-        val = self.code_evaluate(expr)
-
-        # Push the value and delay
-        if val:
-            self.add_command(PAR_PUSH, val)
-        self.add_command(PAR_DELAY)
+        self.code_evaluate(node.children[0])
+        self.add_command(DELAY_OPCODE)
 
     '''
     ========================= if_statement() ========================= 
     '''
     def if_statement(self, node):
-        start_index = len(self.code_blocks[-1])
-
-        self.add_stack_frame()
-
-        # Count number of variable declarations
-        num_declarations = 0
-        for statement in node.children[1].children:
-            if isinstance(statement, AST_Node) and statement.t_type == 'VARIABLE_DECLARATION':
-                num_declarations += 1
+        self.add_stack_frame(node)
 
-        self.add_command(PAR_PUSH, num_declarations)
-        self.add_command(PAR_OFRAME)
+        # One frame holds the variables of both branches
+        self.add_command(PUSH_OPCODE, node.binding[1])
+        self.add_command(OFRAME_OPCODE)
 
         condition = node.children[0]
         block = node.children[1]
@@ -247,81 +304,105 @@ class CodeGenerator:
         if len(node.children) > 2:
             else_ = node.children[2]
 
-        # Evaluate condition and add conditional jump
+        else_label = self.new_label()
+        end_label = self.new_label()
+
+        # Evaluate condition and jump to the else branch (or the end) if it is false
         self.code_evaluate(condition)
-        self.add_command(PAR_PUSH, 0)
-        self.add_command(PAR_EQ)
-        self.add_command(PAR_CJMP)
+        self.add_command(PUSH_OPCODE, 0)
+        self.add_command(EQ_OPCODE)
+        self.push_label(else_label if else_ else end_label)
+        self.add_command(CJMP_OPCODE)
 
-        original_frame_index = self.frame_index
         for statement in block.children:
             self.generate(statement)
 
-        if_end_index = len(self.code_blocks[-1])
-
-        self.frame_index = original_frame_index
-
         if else_:
-            else_start_index = len(self.code_blocks[-1])
+            # Skip the else branch after the if branch
+            self.push_label(end_label)
+            self.add_command(JMP_OPCODE)
+            self.place_label(else_label)
             for statement in else_.children:
                 self.generate(statement)
-            else_end_index = len(self.code_blocks[-1])
 
-        # Insert jump commands
-        if else_:
-            self.code_blocks[-1].insert(start_index, f"push #PC+{else_start_index - start_index + 3}\n")
-        else:
-            self.code_blocks[-1].insert(start_index, f"push #PC+{if_end_index - start_index + 2}\n")
+        self.place_label(end_label)
+        self.remove_stack_frame()
 
-        if else_:
-            self.code_blocks[-1].insert(if_end_index + 1, f"push #PC+{else_end_index + 1 - else_start_index + 1}\n")
-            self.code_blocks[-1].insert(if_end_index + 2, PAR_JMP + "\n")
+    '''
+    ========================= new_label() ========================= 
+    '''
+    def new_label(self):
+        # Create a label of the current code block, placed later with place_label()
+        self.labels.append(None)
+        return len(self.labels) - 1
 
-        self.remove_stack_frame()
+    '''
+    ========================= place_label() ========================= 
+    '''
+    def place_label(self, label):
+        # Bind the label to the address of the next instruction
+        self.labels[label] = len(self.code_blocks[-1])
 
     '''
-    ========================= add_stack_frame() ========================= 
+    ========================= push_label() ========================= 
     '''
-    def add_stack_frame(self):
-        # Add a new stack frame
-        self.stack.append({})
-        self.stack_level = 0
-        self.frame_index = 0
+    def push_label(self, label):
+        # Push the address of a label: the label itself is the operand until link() resolves it
+        self.add_command(PUSH_PC_OPCODE, label)
 
-        for frame in self.stack[:-1]:
-            for variable in frame:
-                frame[variable][-1] += 1
+    '''
+    ========================= link() ========================= 
+    '''
+    def link(self):
+        # Replace the labels pushed in the current code block by PC-relative offsets, finding the label pushes
+        # with a search of the block's opcode bytes, then start new labels
+        block = self.code_blocks[-1]
+        opcodes = block.opcodes.tobytes()
+        address = opcodes.find(PUSH_PC_OPCODE)
+        while address != -1:
+            block.operands[address] = (self.labels[block.operands[address][0]] - address,)
+            address = opcodes.find(PUSH_PC_OPCODE, address + 1)
+        self.labels = []
 
     '''
-    ========================= remove_stack_frame() ========================= 
+    ========================= add_stack_frame() ========================= 
     '''
-    def remove_stack_frame(self):
-        # Remove the current stack frame
-        for frame in self.stack[:-1]:
-            for variable in frame:
-                frame[variable][-1] -= 1
+    def add_stack_frame(self, node):
+        # Add a new stack frame with the depth and size the Resolver recorded on the node; levels are
+        # computed relative to the current depth when emitted, so no stored variable needs updating
+        self.stack.append([None] * node.binding[1])
+        self.stack_level = node.binding[0]
 
+    '''
+    ========================= remove_stack_frame() ========================= 
+    '''
+    def remove_stack_frame(self, close=True):
+        # Remove the current stack frame (function frames are closed by 'ret' rather than 'cframe')
         self.stack.pop()
         self.stack_level -= 1
-        self.return_ = None
-        self.add_command(PAR_CFRAME)
+        if close:
+            self.add_command(CFRAME_OPCODE)
 
     '''
-    ========================= for_statement() ========================= 
+    ========================= block() ========================= 
     '''
-    def for_statement(self, node):
-        self.add_stack_frame()
+    def block(self, node):
+        self.add_stack_frame(node)
+        self.add_command(PUSH_OPCODE, node.binding[1])
+        self.add_command(OFRAME_OPCODE)
 
-        # Count number of variable declarations
-        variable_decl_count = 0
-        for statement in node.children[3].children:
-            if isinstance(statement, AST_Node) and statement.t_type == 'VARIABLE_DECLARATION':
-                variable_decl_count += 1
+        for statement in node.children:
+            self.generate(statement)
 
-        self.add_command(PAR_PUSH, 1 + variable_decl_count)
-        self.add_command(PAR_OFRAME)
+        self.remove_stack_frame()
 
-        for_start_index = len(self.code_blocks[-1])
+    '''
+    ========================= for_statement() ========================= 
+    '''
+    def for_statement(self, node):
+        self.add_stack_frame(node)
+        self.add_command(PUSH_OPCODE, node.binding[1])
+        self.add_command(OFRAME_OPCODE)
 
         variable_decl_ = node.children[0]
         if variable_decl_:
@@ -331,311 +412,247 @@ class CodeGenerator:
         assignment = node.children[2]
         block = node.children[3]
 
-        # Evaluate condition and add loop commands
+        condition_label = self.new_label()
+        end_label = self.new_label()
+
+        # Evaluate condition and leave the loop if it is false
+        self.place_label(condition_label)
         self.code_evaluate(condition)
-        self.add_command(PAR_PUSH, 0)
-        self.add_command(PAR_EQ)
-        self.add_command(PAR_CJMP)
-        for_condition_index = len(self.code_blocks[-1]) - 1
+        self.add_command(PUSH_OPCODE, 0)
+        self.add_command(EQ_OPCODE)
+        self.push_label(end_label)
+        self.add_command(CJMP_OPCODE)
+
         for statement in block.children:
             self.generate(statement)
 
+        # Update and jump back to the condition
         self.generate(assignment)
-        self.add_command(PAR_JMP)
-
-        for_end_index = len(self.code_blocks[-1]) - 1
+        self.push_label(condition_label)
+        self.add_command(JMP_OPCODE)
 
-        # Insert jump commands
-        self.code_blocks[-1].insert(for_condition_index, f"push #PC+{for_end_index - for_condition_index + 3}\n")
-        for_end_index += 1
-        self.code_blocks[-1].insert(for_end_index, f"push #PC-{for_end_index - for_condition_index + 5}\n")
+        self.place_label(end_label)
         self.remove_stack_frame()
 
     '''
     ========================= while_statement() ========================= 
     '''
     def while_statement(self, node):
-        self.add_stack_frame()
-
-        # Count number of variable declarations
-        variable_decl_count = 0
-        for statement in node.children[1].children:
-            if isinstance(statement, AST_Node) and statement.t_type == 'VARIABLE_DECLARATION':
-                variable_decl_count += 1
-        self.add_command(PAR_PUSH, 1 + variable_decl_count)
-        self.add_command(PAR_OFRAME)
-
-        while_start_index = len(self.code_blocks[-1])
+        self.add_stack_frame(node)
+        self.add_command(PUSH_OPCODE, node.binding[1])
+        self.add_command(OFRAME_OPCODE)
 
         condition = node.children[0]
         block = node.children[1]
 
-        # Evaluate condition and add loop commands
+        condition_label = self.new_label()
+        end_label = self.new_label()
+
+        # Evaluate condition and leave the loop if it is false
+        self.place_label(condition_label)
         self.code_evaluate(condition)
-        self.add_command(PAR_PUSH, 0)
-        self.add_command(PAR_EQ)
-        self.add_command(PAR_CJMP)
-        while_condition_index = len(self.code_blocks[-1]) - 1
+        self.add_command(PUSH_OPCODE, 0)
+        self.add_command(EQ_OPCODE)
+        self.push_label(end_label)
+        self.add_command(CJMP_OPCODE)
 
         for statement in block.children:
             self.generate(statement)
 
-        self.add_command(PAR_JMP)
-
-        while_end_index = len(self.code_blocks[-1]) - 1
-
-        # Insert jump commands
-        self.code_blocks[-1].insert(while_condition_index, f"push #PC+{while_end_index - while_condition_index + 3}\n")
-        while_end_index += 1
-        self.code_blocks[-1].insert(while_end_index, f"push #PC-{while_end_index - while_condition_index + 5}\n")
+        # Jump back to the condition
+        self.push_label(condition_label)
+        self.add_command(JMP_OPCODE)
 
+        self.place_label(end_label)
         self.remove_stack_frame()
 
     '''
     ========================= return_statement() ========================= 
     '''
     def return_statement(self, node):
-        expr = node.children[0]
-        ret = self.code_evaluate(expr)
+        self.code_evaluate(node.children[0])
+        self.widen(node.children[0], self.return_type)
 
-        # Add return commands
-        if ret:
-            self.add_command(PAR_PUSH, ret)
-        self.add_command(PAR_RET)
+        # Push the outer variables the function assigned after the return value, for the caller to store back
+        for binding in self.copied[id(self.function)]:
+            self.add_command(PUSH_FRAME_OPCODE, *self.location(binding))
+
+        # ret only closes the function's frame: close the frames opened inside it first
+        for _ in range(self.stack_level - self.function.binding[0]):
+            self.add_command(CFRAME_OPCODE)
+        self.add_command(RET_OPCODE)
 
     '''
     ========================= function_decl() ========================= 
     '''
     def function_decl(self, node):
-        self.add_stack_frame()
-
-        self.code_blocks.append([])
-
-        identifier = node.children[0]
-        if len(node.children) == 4:
-            parameters = node.children[1].children
-            type_ = node.children[2]
-            block = node.children[3]
-        else:
-            parameters = []
-            type_ = node.children[1]
-            block = node.children[2]
-
-        self.code_blocks[-1].append(f".{identifier.parameters.lower()}\n")
-
-        # Count number of variable declarations
-        variable_decl_count = 0
-        for statement in block.children:
-            if isinstance(statement, AST_Node) and statement.t_type == 'VARIABLE_DECLARATION':
-                variable_decl_count += 1
-
-        self.add_command(PAR_PUSH, len(parameters) + variable_decl_count)
-        self.add_command(PAR_ALLOC)
-
-        # Check if the function already exists
-        if self.stack_get(identifier):
-            print(f"Function {identifier.parameters} already exists")
-        else:
-            for parameter in parameters:
-                param_identifier = parameter.children[0]
-                param_type_ = parameter.children[1]
-                self.stack_set(param_identifier, [
-                               param_type_.parameters, self.default[param_type_.parameters], self.frame_index, self.stack_level])
-                self.frame_index += 1
+        self.add_stack_frame(node)
+
+        parameters = self.parameters(node)
+        type_ = node.children[-2]
+        block = node.children[-1]
+
+        # A function declared inside another block gets its own code block and labels until it is generated
+        outer_labels = self.labels
+        self.labels = []
+        outer_return_type = self.return_type
+        self.return_type = type_.parameters
+        outer_function = self.function
+        self.function = node
+        self.code_blocks.append(Instructions(self.names[id(node)]))
+
+        # The function frame holds the parameters and hidden parameters followed by the body's variables: call
+        # opens it with the arguments, so only the body's variables are allocated
+        locals_ = node.binding[1] - len(parameters)
+        if locals_ > 0:
+            self.add_command(PUSH_OPCODE, locals_)
+            self.add_command(ALLOC_OPCODE)
 
         for statement in block.children:
             self.generate(statement)
 
-        self.stack_set(
-            identifier, [type_.parameters, parameters, block, self.frame_index, self.stack_level])
-
-    '''
-    ========================= function_call() ========================= 
-    '''
-    def function_call(self, node):
-        identifier = node.children[0]
-        if len(node.children) == 2:
-            arguments = node.children[1].children
-        else:
-            arguments = []
+        self.remove_stack_frame(False)
+        self.link()
 
-        # Push arguments onto the stack
-        if len(arguments) > 0:
-            for argument in reversed(arguments):
-                argument = self.code_evaluate(argument)
-                if argument:
-                    self.add_command(PAR_PUSH, argument)
-            self.add_command(PAR_PUSH, len(arguments))
-        self.add_command(PAR_PUSH_DOT, identifier.parameters)
-        self.add_command(PAR_CALL)
+        self.labels = outer_labels
+        self.return_type = outer_return_type
+        self.function = outer_function
+        if node.binding[0] > 1:
+            # Keep generating the enclosing block after the nested function
+            self.code_blocks.insert(-1, self.code_blocks.pop())
 
     '''
     ========================= write_statement() ========================= 
     '''
     def write_statement(self, node):
-        # Handle __write statement
-        for child in node.children:
-            val = self.code_evaluate(child)
-            if val:
-                self.add_command(PAR_PUSH, val)
-        self.add_command(PAR_WRITE)
+        # Handle __write statement: write pops x, y and the colour, so the operands are pushed last first
+        for child in reversed(node.children):
+            self.code_evaluate(child)
+        self.add_command(WRITE_OPCODE)
 
     '''
     ========================= write_box_statement() ========================= 
     '''
     def write_box_statement(self, node):
-        # Handle __write_box statement
-        for child in node.children:
-            val = self.code_evaluate(child)
-            if val:
-                self.add_command(PAR_PUSH, val)
-        self.add_command(PAR_WRITE_BOX)
+        # Handle __write_box statement: write_box pops x, y, w, h and the colour
+        for child in reversed(node.children):
+            self.code_evaluate(child)
+        self.add_command(WRITE_BOX_OPCODE)
 
     '''
     ========================= code_evaluate() ========================= 
     '''
-    def code_evaluate(self, node, iden=True):
-        if isinstance(node, AST_Node):
-            if node.t_type == 'IDENTIFIER':
-                if iden:
-                    self.add_command(PAR_PUSH_STACK, self.stack_get(node)[2:4])
-                return self.stack_get(node)
-            if node.t_type == 'PAD_HEIGHT':
-                self.add_command(PAR_HEIGHT)
-                return '__height'
-            elif node.t_type == 'PAD_WIDTH':
-                self.add_command(PAR_WIDTH)
-                return '__width'
-            elif node.t_type == 'PAD_RANDI':
-                val = self.code_evaluate(node.children[0])
-                if isinstance(val, int):
-                    self.add_command(PAR_PUSH, node.children[0].parameters)
-                self.add_command(PAR_IRND)
-            elif node.t_type == 'INTEGER_LITERAL':
-                return int(node.parameters)
-            elif node.t_type == 'FLOAT_LITERAL':
-                return float(node.parameters)
-            elif node.t_type == 'BOOLEAN_LITERAL':
-                return True if node.parameters == 'true' else False
-            elif node.t_type == 'COLOR_LITERAL':
-                return node.parameters
-            elif node.t_type == 'FUNCTION_CALL':
-                self.function_call(node)
-            else:
-                right = self.code_evaluate(node.children[1], False)
-                left = self.code_evaluate(node.children[0], False)
-
-                l_command = PAR_PUSH
-                r_command = PAR_PUSH
-
-                if left == '__height':
-                    l_command = PAR_HEIGHT
-                    left = None
-                    self.code_blocks[-1].pop()
-                elif left == '__width':
-                    l_command = PAR_WIDTH
-                    left = None
-                    self.code_blocks[-1].pop()
-                elif left == '__randi':
-                    l_command = None
-                    left = None
-
-                if right == '__height':
-                    r_command = PAR_HEIGHT
-                    right = None
-                    self.code_blocks[-1].pop()
-                elif right == '__width':
-                    r_command = PAR_WIDTH
-                    right = None
-                    self.code_blocks[-1].pop()
-                elif right == '__randi':
-                    r_command = None
-                    right = None
-
-                l_iden = left
-                r_iden = right
-
-                if node.children[0].t_type == 'IDENTIFIER':
-                    l_iden = self.stack_get(node.children[0])[2:4]
-                    l_command = PAR_PUSH_STACK
-                if node.children[1].t_type == 'IDENTIFIER':
-                    r_iden = self.stack_get(node.children[1])[2:4]
-                    r_command = PAR_PUSH_STACK
-
-                if node.t_type == 'RELATIONAL_OP':
-                    if node.parameters == '<':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_LT)
-                    elif node.parameters == '>':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_GT)
-                    elif node.parameters == '==':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_EQ)
-                    elif node.parameters == '!=':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_EQ)
-                    elif node.parameters == '<=':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_LE)
-                    elif node.parameters == '>=':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_GE)
-                elif node.t_type == 'ADDITIVE_OP':
-                    if node.parameters == '+':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_ADD)
-                    elif node.parameters == '-':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_SUB)
-                elif node.t_type == 'MULTIPLICATIVE_OP':
-                    if node.parameters == '*':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_MUL)
-                    elif node.parameters == '/':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_DIV)
-                    elif node.parameters == 'and':
-                        pass
-
-    '''
-    ========================= evaluate() ========================= 
-    '''
-    def evaluate(self, node):
-        if isinstance(node, AST_Node):
-            if node.t_type == 'FUNCTION_CALL':
-                self.function_call(node)
-                return self.return_
-            elif node.t_type == 'PAD_HEIGHT':
-                return '__height'
-            elif node.t_type == 'PAD_WIDTH':
-                return '__width'
-            elif node.t_type == 'IDENTIFIER':
-                if not self.stack_get(node):
-                    raise Exception(f"Variable {node.parameters} does not exist")
+    def code_evaluate(self, node):
+        # Emit the instructions leaving the value of an expression on the stack. Operands are emitted right to left,
+        # so the left operand ends on top; the explicit stack holds nodes still to emit and the (opcode, operands)
+        # that follow their operands, so long operator chains do not recurse
+        block = self.code_blocks[-1]
+        opcode, operands = block.opcodes.append, block.operands.append
+
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, tuple):
+                opcode(node[0])
+                operands(node[1])
+                continue
+
+            node = node.unwrap()
+            kind = node.kind
+            if kind in self.binary_kinds:
+                pending.extend(reversed(self.operators[node.parameters]))
+                pending.append(node.children[0])
+                pending.append(node.children[1])
+                continue
+
+            if kind == IDENTIFIER_KIND:
+                opcode(PUSH_FRAME_OPCODE)
+                operands(self.location(node.binding))
+            elif kind == INTEGER_LITERAL_KIND:
+                opcode(PUSH_OPCODE)
+                operands((int(node.parameters),))
+            elif kind == FLOAT_LITERAL_KIND:
+                opcode(PUSH_OPCODE)
+                operands((float(node.parameters),))
+            elif kind == BOOLEAN_LITERAL_KIND:
+                opcode(PUSH_OPCODE)
+                operands((1 if node.parameters == 'True' else 0,))
+            elif kind == COLOR_LITERAL_KIND:
+                opcode(PUSH_OPCODE)
+                operands((node.parameters,))
+            elif kind == PAD_WIDTH_KIND:
+                opcode(WIDTH_OPCODE)
+                operands(())
+            elif kind == PAD_HEIGHT_KIND:
+                opcode(HEIGHT_OPCODE)
+                operands(())
+            elif kind == PAD_RANDI_KIND and node.children:
+                pending.append((IRND_OPCODE, ()))
+                pending.append(node.children[0])
+            elif kind in (PAD_RANDI_KIND, PAD_READ_KIND):
+                raise ValueError(unsupported_pad_operation(node))
+            elif kind == FUNCTION_CALL_KIND:
+                arguments = node.children[1].children if len(node.children) == 2 else ()
+                declaration = node.children[0].binding
+                outer = self.outer[id(declaration)]
+
+                # Store back the outer variables the function assigned, pushed above its return value
+                for binding in self.copied[id(declaration)]:
+                    index, level = self.location(binding)
+                    pending.append((ST_OPCODE, ()))
+                    pending.append((PUSH_OPCODE, (level,)))
+                    pending.append((PUSH_OPCODE, (index,)))
+
+                pending.append((CALL_OPCODE, ()))
+                pending.append((PUSH_FUNCTION_OPCODE, (self.names[id(declaration)],)))
+                pending.append((PUSH_OPCODE, (len(arguments) + len(outer),)))
+                for argument, parameter in zip(arguments, self.parameters(declaration)):
+                    # An int argument of a float parameter is converted after it is evaluated
+                    if parameter.children[1].parameters == 'float' and not self.is_float(argument):
+                        pending.append((MUL_OPCODE, ()))
+                        pending.append((PUSH_OPCODE, (1.0,)))
+                    pending.append(argument)
+                for binding in outer:
+                    pending.append((PUSH_FRAME_OPCODE, self.location(binding)))
+            elif kind == UNARY_OPERATION_KIND:
+                # Negate the operand (0 - x) or invert it
+                if node.children[0].parameters == '-':
+                    pending.append((SUB_OPCODE, ()))
+                    pending.append((PUSH_OPCODE, (0,)))
                 else:
-                    iden = self.stack_get(node)
-                    return iden[1]
-            elif node.t_type == 'pad_randi':
-                return '__randi'
-            elif node.t_type == 'INTEGER_LITERAL':
-                return int(node.parameters)
-            elif node.t_type == 'FLOAT_LITERAL':
-                return float(node.parameters)
-            elif node.t_type == 'BOOLEAN_LITERAL':
-                return True if node.parameters == 'true' else False
-            elif node.t_type == 'COLOR_LITERAL':
-                return node.parameters
+                    pending.append((NOT_OPCODE, ()))
+                pending.append(node.children[1])
+
+    '''
+    ========================= widen() ========================= 
+    '''
+    def widen(self, node, type_):
+        # PArIR values carry no type, and div divides two ints as integers: an int expression stored, passed or
+        # returned as a float is multiplied by 1.0 so that the float slot really holds a float
+        if type_ == 'float' and not self.is_float(node):
+            self.add_command(PUSH_OPCODE, 1.0)
+            self.add_command(MUL_OPCODE)
+
+    def is_float(self, node):
+        # The semantic analysis only lets int and float expressions into float slots, and arithmetic on ints gives
+        # an int, so an expression is a float if an operand reached through its arithmetic is one
+        pending = [node]
+        while pending:
+            node = pending.pop().unwrap()
+            kind = node.kind
+            if kind in self.binary_kinds:
+                pending.extend(node.children)
+            elif kind == UNARY_OPERATION_KIND:
+                pending.append(node.children[1])
+            elif kind == FLOAT_LITERAL_KIND:
+                return True
+            elif kind == IDENTIFIER_KIND and self.types[id(node.binding)] == 'float':
+                return True
+            elif kind == FUNCTION_CALL_KIND:
+                declaration = node.children[0].binding
+                if declaration.children[-2].parameters == 'float':
+                    return True
+        return False
 
 
 '''
@@ -644,6 +661,12 @@ class CodeGenerator:
 class ArrayCodeGenerator(CodeGenerator):
     def __init__(self):
         super().__init__()
+        self.frame_index = 0  # Next free slot of the current frame, where the next array is laid out
+
+        # Array statements extend the statement generators
+        self.statements[ARRAY_DECLARATION_KIND] = self.array_decl
+        self.statements[ARRAY_ASSIGNMENT_KIND] = self.array_assignment
+        self.statements[ARRAY_ACCESS_KIND] = self.array_access
 
     '''
     ========================= program() ========================= 
@@ -654,33 +677,32 @@ class ArrayCodeGenerator(CodeGenerator):
 
         for node in program.children:
             if isinstance(node, AST_Node):
-                if node.t_type != 'FUNCTION_DECLARATION':
+                node = node.unwrap()
+                if node.kind != FUNCTION_DECLARATION_KIND:
                     main.append(node)
                 else:
                     other.append(node)
 
+        # Open the main frame (functions are generated inside it)
+        self.stack = [[None] * program.binding[1]]
+        self.declarations(program)
+
         # Generate code for function declarations
         for node in other:
-            self.add_code = True
             self.generate(node)
 
         # Generate code for main function
-        self.add_code = True
-        self.code_blocks.append([])
-        self.code_blocks[-1].append('.main\n')
+        self.code_blocks.append(Instructions('main'))
 
-        # Count number of variable declarations (always declare at least 1)
-        var_declarations = 1
-        for node in main:
-            if node.t_type == 'VARIABLE_DECLARATION':
-                var_declarations += 1
+        # Size of the main frame (always declare at least 1)
+        var_declarations = max(program.binding[1], 1)
 
         # Allocate space for variables
         if var_declarations > 0:
-            self.add_command(PAR_PUSH, var_declarations)
-            self.add_command(PAR_OFRAME)
-        self.add_command(PAR_PUSH, '#ffffff')
-        self.add_command(PAR_CLEAR)
+            self.add_command(PUSH_OPCODE, var_declarations)
+            self.add_command(OFRAME_OPCODE)
+        self.add_command(PUSH_OPCODE, '#ffffff')
+        self.add_command(CLEAR_OPCODE)
 
         # Initialize stack level and frame index
         self.stack_level = 0
@@ -688,30 +710,50 @@ class ArrayCodeGenerator(CodeGenerator):
 
         # Generate code for main block
         for node in main:
-            self.add_code = True
             self.generate(node)
 
-        # Add HALT command
-        self.add_code = True
-        self.add_command(PAR_HALT)
+        # Add HALT command and resolve the labels of main
+        self.add_command(HALT_OPCODE)
+        self.link()
 
-        # Join all code blocks into a single string
-        self.code = ''.join([''.join(block) for block in self.code_blocks])
+        self.serialize()
         print("\033[92m\033[1mCode Generation [Array] successful! - Check 'output2.txt'\033[0m")
 
     '''
-    ========================= generate() ========================= 
+    ========================= add_stack_frame() ========================= 
     '''
-    def generate(self, node):
+    def add_stack_frame(self, node):
+        # Arrays of a new frame are laid out from its first slot
+        super().add_stack_frame(node)
+        self.frame_index = 0
+
+    '''
+    ========================= evaluate() ========================= 
+    '''
+    def evaluate(self, node):
+        # Value of an array size or index known at compile time
         if isinstance(node, AST_Node):
-            if node.t_type == 'ARRAY_DECLARATION':
-                self.array_decl(node)
-            elif node.t_type == 'ARRAY_ASSIGNMENT':
-                self.array_assignment(node)
-            elif node.t_type == 'ARRAY_ACCESS':
-                self.array_access(node)
-            else:
-                super().generate(node)
+            node = node.unwrap()
+            if node.kind == PAD_HEIGHT_KIND:
+                return '__height'
+            elif node.kind == PAD_WIDTH_KIND:
+                return '__width'
+            elif node.kind == IDENTIFIER_KIND:
+                if not self.stack_get(node):
+                    raise Exception(f"Variable {node.parameters} does not exist")
+                else:
+                    iden = self.stack_get(node)
+                    return iden[1]
+            elif node.kind == PAD_RANDI_KIND:
+                return '__randi'
+            elif node.kind == INTEGER_LITERAL_KIND:
+                return int(node.parameters)
+            elif node.kind == FLOAT_LITERAL_KIND:
+                return float(node.parameters)
+            elif node.kind == BOOLEAN_LITERAL_KIND:
+                return True if node.parameters == 'true' else False
+            elif node.kind == COLOR_LITERAL_KIND:
+                return node.parameters
 
     '''
     ========================= array_decl() ========================= 
@@ -719,12 +761,12 @@ class ArrayCodeGenerator(CodeGenerator):
     def array_decl(self, node):
         identifier = node.children[0]
         size_expr = node.children[1]
-        size = self.code_evaluate(size_expr)
+        size = self.evaluate(size_expr)
 
         # Allocate space for array
         self.stack_set(identifier, [size, self.frame_index, self.stack_level])
-        self.add_command(PAR_PUSH, size)
-        self.add_command(PAR_DUPA)
+        self.add_command(PUSH_OPCODE, size)
+        self.add_command(DUPA_OPCODE)
 
         self.frame_index += size
 
@@ -736,15 +778,14 @@ class ArrayCodeGenerator(CodeGenerator):
         index_expr = node.children[1]
         value_expr = node.children[2]
         
-        index = self.code_evaluate(index_expr)
-        value = self.code_evaluate(value_expr)
+        index = self.evaluate(index_expr)
+        self.code_evaluate(value_expr)
         array_info = self.stack_get(identifier)
 
         # Calculate memory location and assign value
-        self.add_command(PAR_PUSH, value)
-        self.add_command(PAR_PUSH, array_info[1] + index)
-        self.add_command(PAR_PUSH, array_info[2])
-        self.add_command(PAR_STA)
+        self.add_command(PUSH_OPCODE, array_info[1] + index)
+        self.add_command(PUSH_OPCODE, array_info[2])
+        self.add_command(STA_OPCODE)
 
     '''
     ========================= array_access() ========================= 
@@ -753,151 +794,9 @@ class ArrayCodeGenerator(CodeGenerator):
         identifier = node.children[0]
         index_expr = node.children[1]
 
-        index = self.code_evaluate(index_expr)
+        index = self.evaluate(index_expr)
         array_info = self.stack_get(identifier)
 
         # Calculate memory location and access value
-        self.add_command(PAR_PUSH, array_info[1] + index)
-        self.add_command(PAR_PUSH, array_info[2])
-        self.add_command(PAR_PUSHA)
-
-    '''
-    ========================= add_command() ========================= 
-    '''
-    def add_command(self, operator, operand=None):
-        if self.add_code and operator is not None:
-            if operand is not None:
-                if isinstance(operand, list):
-                    if operator == PAR_PUSH_STACK:
-                        self.code_blocks[-1].append(f"{operator}[{operand[0]}:{operand[1]}]\n")
-                else:
-                    operand = str(operand)
-                    if operator == PAR_OFRAME:
-                        pass
-                    if operator == PAR_PUSH_DOT:
-                        operand = operand.lower()
-                        self.code_blocks[-1].append(f"{operator}{operand}\n")
-                    elif operator == PAR_PUSH_STACK:
-                        self.code_blocks[-1].append(f"{operator}[{operand}]\n")
-                    else:
-                        self.code_blocks[-1].append(f"{operator} {operand}\n")
-            else:
-                self.code_blocks[-1].append(f"{operator}\n")
-                
-    '''
-    ========================= code_evaluate() - [FOR ARRAYS] ========================= 
-    '''
-    def code_evaluate(self, node, iden=True):
-        if isinstance(node, AST_Node):
-            if node.t_type == 'IDENTIFIER':
-                if iden:
-                    self.add_command(PAR_PUSH_STACK, self.stack_get(node)[2:4])
-                return self.stack_get(node)
-            if node.t_type == 'PAD_HEIGHT':
-                self.add_command(PAR_HEIGHT)
-                return '__height'
-            elif node.t_type == 'PAD_WIDTH':
-                self.add_command(PAR_WIDTH)
-                return '__width'
-            elif node.t_type == 'PAD_RANDI':
-                val = self.code_evaluate(node.children[0])
-                if isinstance(val, int):
-                    self.add_command(PAR_PUSH, node.children[0].parameters)
-                self.add_command(PAR_IRND)
-            elif node.t_type == 'INTEGER_LITERAL':
-                return int(node.parameters)
-            elif node.t_type == 'FLOAT_LITERAL':
-                return float(node.parameters)
-            elif node.t_type == 'BOOLEAN_LITERAL':
-                return True if node.parameters == 'true' else False
-            elif node.t_type == 'COLOR_LITERAL':
-                return node.parameters
-            elif node.t_type == 'FUNCTION_CALL':
-                self.function_call(node)
-            else:
-                right = self.code_evaluate(node.children[1], False)
-                left = self.code_evaluate(node.children[0], False)
-
-                l_command = PAR_PUSH
-                r_command = PAR_PUSH
-
-                if left == '__height':
-                    l_command = PAR_HEIGHT
-                    left = None
-                    self.code_blocks[-1].pop()
-                elif left == '__width':
-                    l_command = PAR_WIDTH
-                    left = None
-                    self.code_blocks[-1].pop()
-                elif left == '__randi':
-                    l_command = None
-                    left = None
-
-                if right == '__height':
-                    r_command = PAR_HEIGHT
-                    right = None
-                    self.code_blocks[-1].pop()
-                elif right == '__width':
-                    r_command = PAR_WIDTH
-                    right = None
-                    self.code_blocks[-1].pop()
-                elif right == '__randi':
-                    r_command = None
-                    right = None
-
-                l_iden = left
-                r_iden = right
-
-                if node.children[0].t_type == 'IDENTIFIER':
-                    l_iden = self.stack_get(node.children[0])[2:4]
-                    l_command = PAR_PUSH_STACK
-                if node.children[1].t_type == 'IDENTIFIER':
-                    r_iden = self.stack_get(node.children[1])[2:4]
-                    r_command = PAR_PUSH_STACK
-
-                # Add commands for relational, additive, and multiplicative operations
-                if node.t_type == 'RELATIONAL_OP':
-                    if node.parameters == '<':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_LT)
-                    elif node.parameters == '>':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_GT)
-                    elif node.parameters == '==':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_EQ)
-                    elif node.parameters == '!=':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_EQ)
-                    elif node.parameters == '<=':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_LE)
-                    elif node.parameters == '>=':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_GE)
-                elif node.t_type == 'ADDITIVE_OP':
-                    if node.parameters == '+':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_ADD)
-                    elif node.parameters == '-':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_SUB)
-                elif node.t_type == 'MULTIPLICATIVE_OP':
-                    if node.parameters == '*':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_MUL)
-                    elif node.parameters == '/':
-                        self.add_command(r_command, r_iden)
-                        self.add_command(l_command, l_iden)
-                        self.add_command(PAR_DIV)
-                    elif node.parameters == 'and':
-                        pass
\ No newline at end of file
+        self.add_command(PUSH_OPCODE, array_info[0])
+        self.add_command(PUSHA_OPCODE, array_info[1] + index, array_info[2])
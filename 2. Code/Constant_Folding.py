@@ -0,0 +1,198 @@
+import math
+import operator
+
+from PArL import *
+
+'''
+========================= Constant Folder ========================= 
+'''
+class ConstantFolder:
+    # Replaces constant expressions by literals before code generation: operators applied to literals, and
+    # variables that are never assigned after a declaration giving them a constant value.
+    # A declaration is identified by its binding: the Resolver gives every use the declaration's own (depth, index)
+    # tuple, so two declarations sharing a slot in sibling scopes still have distinct bindings.
+    def __init__(self):
+        self.constants = {}  # id() of a constant variable's binding -> (kind, parameters) of its literal
+        self.assigned = set()  # id() of the bindings of assigned variables
+        self.folded = 0
+        self.propagated = 0
+
+        # Statement folders indexed by node kind
+        self.statements = {
+            VARIABLE_DECLARATION_KIND: self.variable_decl,
+            ASSIGNMENT_KIND: self.assignment,
+            PRINT_STATEMENT_KIND: self.expressions,
+            DELAY_STATEMENT_KIND: self.expressions,
+            WRITE_KIND: self.expressions,
+            WRITE_BOX_KIND: self.expressions,
+            RETURN_STATEMENT_KIND: self.expressions,
+            IF_STATEMENT_KIND: self.if_statement,
+            FOR_STATEMENT_KIND: self.for_statement,
+            WHILE_STATEMENT_KIND: self.while_statement,
+            FUNCTION_DECLARATION_KIND: self.function_decl,
+            BLOCK_KIND: self.block,
+        }
+
+        # Operators applied to constant operands (integer operands use integer division, as at run time)
+        self.operators = {
+            '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+            'and': lambda a, b: a and b, 'or': lambda a, b: a or b,
+            '<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+            '==': operator.eq, '!=': operator.ne,
+        }
+        self.binary_kinds = {RELATIONAL_OP_KIND, ADDITIVE_OP_KIND, MULTIPLICATIVE_OP_KIND}
+
+        # Kinds of the literals that can be folded, and how to read their value
+        self.literals = {
+            INTEGER_LITERAL_KIND: int,
+            FLOAT_LITERAL_KIND: float,
+            BOOLEAN_LITERAL_KIND: lambda text: text == 'True',
+        }
+
+    '''
+    ========================= program() ========================= 
+    '''
+    def program(self, program_node):
+        # Find the assigned variables first, so a declaration knows whether its value can be propagated
+        self.find_assignments(program_node)
+        self.statement_list(program_node.children)
+
+        # Print success message
+        print("\033[1;32mConstant Folding successful!\033[0m")
+
+    def find_assignments(self, node):
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if node.kind == ASSIGNMENT_KIND:
+                self.assigned.add(id(node.children[0].binding))
+            pending.extend(child for child in node.children if isinstance(child, AST_Node))
+
+    '''
+    ========================= STATEMENTS ========================= 
+    '''
+    def statement_list(self, statements):
+        for statement in statements:
+            statement = statement.unwrap()
+            fold = self.statements.get(statement.kind)
+            if fold is not None:
+                fold(statement)
+
+    def variable_decl(self, node):
+        identifier, type_, expr = node.children
+        expr = self.expression(expr)
+        node.children = (identifier, type_, expr)
+
+        # A variable never assigned keeps the literal of its declaration (widened to a float variable's type)
+        if id(identifier.binding) in self.assigned:
+            return
+        if expr.kind == INTEGER_LITERAL_KIND and type_.parameters == 'float':
+            self.constants[id(identifier.binding)] = (FLOAT_LITERAL_KIND, repr(float(expr.parameters)))
+        elif expr.kind in self.literals or expr.kind == COLOR_LITERAL_KIND:
+            self.constants[id(identifier.binding)] = (expr.kind, expr.parameters)
+
+    def assignment(self, node):
+        node.children = (node.children[0], self.expression(node.children[1]))
+
+    def expressions(self, node):
+        # print, delay, write, write_box and return only use expressions
+        node.children = tuple(self.expression(child) for child in node.children)
+
+    def if_statement(self, node):
+        node.children = (self.expression(node.children[0]),) + node.children[1:]
+        for block in node.children[1:]:
+            self.statement_list(block.children)
+
+    def for_statement(self, node):
+        variable_decl_, condition, assignment, block = node.children
+        if variable_decl_:
+            self.variable_decl(variable_decl_)
+        node.children = (variable_decl_, self.expression(condition), assignment, block)
+        self.statement_list(block.children)
+        if assignment:
+            self.assignment(assignment)
+
+    def while_statement(self, node):
+        node.children = (self.expression(node.children[0]), node.children[1])
+        self.statement_list(node.children[1].children)
+
+    def block(self, node):
+        self.statement_list(node.children)
+
+    def function_decl(self, node):
+        self.statement_list(node.children[-1].children)
+
+    '''
+    ========================= expression() ========================= 
+    '''
+    def expression(self, node):
+        # Fold an expression bottom-up with an explicit stack, so long operator chains do not recurse, and
+        # return the node replacing it. Each pending node is visited before and after its operands
+        folded = []
+        pending = [(node.unwrap(), False)]
+        while pending:
+            node, visited = pending.pop()
+            operands = self.operands(node)
+            if not visited:
+                pending.append((node, True))
+                pending.extend((operand.unwrap(), False) for operand in reversed(operands))
+            else:
+                values = folded[len(folded) - len(operands):]
+                del folded[len(folded) - len(operands):]
+                folded.append(self.fold(node, values))
+        return folded[0]
+
+    def operands(self, node):
+        # Children of an expression node that are expressions themselves
+        if node.kind in self.binary_kinds:
+            return node.children
+        elif node.kind == UNARY_OPERATION_KIND:
+            return node.children[1:]
+        elif node.kind == FUNCTION_CALL_KIND and len(node.children) == 2:
+            return node.children[1].children
+        elif node.kind == PAD_RANDI_KIND:
+            return node.children
+        return ()
+
+    def fold(self, node, operands):
+        # Give a node its folded operands, and replace it by a literal if its value is known
+        if node.kind in self.binary_kinds:
+            node.children = tuple(operands)
+            left, right = operands
+            if left.kind in self.literals and right.kind in self.literals:
+                left = self.literals[left.kind](left.parameters)
+                right = self.literals[right.kind](right.parameters)
+                function = self.operators[node.parameters]
+                if node.parameters == '/':
+                    if right == 0:
+                        return node  # Left to fail at run time
+                    if type(left) == type(right) == int:
+                        function = integer_division
+                return self.literal(node, function(left, right))
+        elif node.kind == UNARY_OPERATION_KIND:
+            node.children = (node.children[0],) + tuple(operands)
+            operand = operands[0]
+            if operand.kind in self.literals:
+                value = self.literals[operand.kind](operand.parameters)
+                return self.literal(node, -value if node.children[0].parameters == '-' else not value)
+        elif node.kind == IDENTIFIER_KIND:
+            constant = self.constants.get(id(node.binding))
+            if constant is not None:
+                self.propagated += 1
+                return AST_Node(constant[0], constant[1], (), node.token_count, node.position)
+        elif node.kind == FUNCTION_CALL_KIND and operands:
+            node.children[1].children = tuple(operands)
+        elif node.kind == PAD_RANDI_KIND:
+            node.children = tuple(operands)
+        return node
+
+    def literal(self, node, value):
+        # Literal node with the value of a folded node, spanning the tokens of the node it replaces
+        if isinstance(value, float) and not math.isfinite(value):
+            return node  # No literal for it: left to be computed at run time
+        self.folded += 1
+        if isinstance(value, bool):
+            return AST_Node(BOOLEAN_LITERAL_KIND, str(value), (), node.token_count, node.position)
+        elif isinstance(value, int):
+            return AST_Node(INTEGER_LITERAL_KIND, str(value), (), node.token_count, node.position)
+        return AST_Node(FLOAT_LITERAL_KIND, repr(value), (), node.token_count, node.position)
@@ -0,0 +1,113 @@
+from PArL import *
+
+'''
+========================= Dead Code Eliminator ========================= 
+'''
+class DeadCodeEliminator:
+    # Removes code that can never run before it is generated: statements following a return (or an if whose
+    # branches both return) in the same block, then the functions that cannot be reached through calls from
+    # the main program. Frame sizes are left as resolved, so the slots of removed variables stay allocated.
+    def __init__(self):
+        self.statements = 0  # Unreachable statements removed
+        self.declared = 0  # Function declarations before removal
+        self.reached = 0  # Function declarations reachable from the main program
+
+    '''
+    ========================= program() ========================= 
+    '''
+    def program(self, program_node):
+        # Statements first, so a call only made by an unreachable statement does not keep its function
+        program_node.children = self.statement_list(program_node.children)[0]
+
+        reachable = self.reachable(program_node)
+        program_node.children = self.remove_functions(program_node.children, reachable)
+
+        # Print success message and what was removed
+        print("\033[1;32mDead Code Elimination successful!\033[0m")
+        self.report()
+
+    def report(self):
+        print(f"  {self.declared} -> {self.reached} functions, {self.statements} unreachable statements removed")
+
+    '''
+    ========================= UNREACHABLE STATEMENTS ========================= 
+    '''
+    def statement_list(self, statements):
+        # Return the statements that can run and whether the list always returns. Function declarations after a
+        # return are kept: they do not run where they are written and may be called from before it
+        kept = []
+        returns = False
+        for statement in statements:
+            node = statement.unwrap()
+            if node.kind == FUNCTION_DECLARATION_KIND:
+                self.body(node.children[-1])
+                kept.append(statement)
+            elif returns:
+                self.statements += 1
+            else:
+                returns = self.statement(node)
+                kept.append(statement)
+        return tuple(kept), returns
+
+    def body(self, block):
+        # Remove the unreachable statements of a block, returning whether it always returns
+        block.children, returns = self.statement_list(block.children)
+        return returns
+
+    def statement(self, node):
+        # Remove the unreachable statements nested in a statement, returning whether it always returns
+        if node.kind == RETURN_STATEMENT_KIND:
+            return True
+        elif node.kind == IF_STATEMENT_KIND:
+            # Only an if with an else can return on every path
+            branches = [self.body(block) for block in node.children[1:]]
+            return len(branches) == 2 and all(branches)
+        elif node.kind == BLOCK_KIND:
+            return self.body(node)
+        elif node.kind in (FOR_STATEMENT_KIND, WHILE_STATEMENT_KIND):
+            # A loop body may not run at all
+            self.body(node.children[-1])
+        return False
+
+    '''
+    ========================= UNUSED FUNCTIONS ========================= 
+    '''
+    def reachable(self, program_node):
+        # Build the call graph (the declarations each function calls, None standing for the main program) and
+        # return the ids of the declarations reachable from the main program
+        calls = {None: []}
+        pending = [(child, None) for child in program_node.children]
+        while pending:
+            node, caller = pending.pop()
+            if not isinstance(node, AST_Node):
+                continue
+            if node.kind == FUNCTION_DECLARATION_KIND:
+                self.declared += 1
+                caller = node
+                calls.setdefault(id(node), [])
+            elif node.kind == FUNCTION_CALL_KIND:
+                calls[None if caller is None else id(caller)].append(node.children[0].binding)
+            pending.extend((child, caller) for child in node.children)
+
+        reachable = set()
+        pending = list(calls[None])
+        while pending:
+            function = pending.pop()
+            if id(function) not in reachable:
+                reachable.add(id(function))
+                pending.extend(calls[id(function)])
+        self.reached = len(reachable)
+        return reachable
+
+    def remove_functions(self, statements, reachable):
+        # Drop the unreachable function declarations of a statement list and of the blocks nested in it
+        kept = []
+        for statement in statements:
+            node = statement.unwrap()
+            if node.kind == FUNCTION_DECLARATION_KIND and id(node) not in reachable:
+                continue
+            for block in (node,) if node.kind == BLOCK_KIND else node.children:
+                if isinstance(block, AST_Node) and block.kind == BLOCK_KIND:
+                    block.children = self.remove_functions(block.children, reachable)
+            kept.append(statement)
+        return tuple(kept)
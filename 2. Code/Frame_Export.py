@@ -0,0 +1,151 @@
+import os
+import sys
+import zlib
+import struct
+from array import array
+
+'''
+========================= Frame Exporter ========================= 
+'''
+class FrameExporter:
+    # Writes the frames of a virtual machine run to a frame log, and optionally each frame as a PPM or PNG still.
+    # Used as the machine's snapshot function, it is given the pad at every delay; close() adds the final pad.
+    # Only the rectangle that changed since the previous frame is encoded, and a frame identical to the previous
+    # one is skipped (the previous frame simply stays on screen until the next frame's clock).
+    #
+    # Frame log: b'PArF', then the pad's width and height (2 unsigned shorts), then for each frame its clock in
+    # milliseconds, x, y, w and h (1 unsigned int and 4 unsigned shorts) followed by the w x h colours of the
+    # changed rectangle, row by row, as little-endian 0xRRGGBB unsigned ints
+    def __init__(self, directory, width, height, stills=None):
+        self.directory = directory
+        self.width = width
+        self.height = height
+        self.stills = stills  # None, 'ppm' or 'png'
+        os.makedirs(directory, exist_ok=True)
+
+        self.log = open(os.path.join(directory, 'frames.log'), 'wb')
+        self.log.write(b'PArF' + struct.pack('<HH', width, height))
+
+        # The last frame written, row by row (the pad starts black)
+        self.previous = [[0] * width for _ in range(height)]
+
+        self.frames = 0  # Frames given
+        self.written = 0  # Frames written to the log
+        self.pixels = 0  # Pixels written to the log
+
+    '''
+    ========================= frame() ========================= 
+    '''
+    def __call__(self, clock, display):
+        self.frame(clock, display)
+
+    def frame(self, clock, display):
+        self.frames += 1
+        rectangle = self.changed(display, display.take_dirty())
+        if rectangle is None:
+            return
+
+        # Encode the changed rectangle, and keep it as the new previous frame
+        top, bottom, left, right = rectangle
+        region = display.region(top, bottom, left, right)
+        self.log.write(struct.pack('<IHHHH', int(clock), left, top, right - left, bottom - top))
+        for y, row in zip(range(top, bottom), region):
+            self.log.write(little_endian(array('I', row)).tobytes())
+            self.previous[y][left:right] = row
+        self.written += 1
+        self.pixels += (right - left) * (bottom - top)
+
+        if self.stills:
+            self.still(os.path.join(self.directory, f'frame{self.frames:05d}.{self.stills}'))
+
+    def changed(self, display, dirty):
+        # Shrink the rectangle written since the last frame to the pixels that differ from it (None if none do)
+        if dirty is None:
+            return None
+        top, bottom, left, right = dirty
+        region = display.region(top, bottom, left, right)
+        rows = [y for y, row in zip(range(top, bottom), region) if row != self.previous[y][left:right]]
+        if not rows:
+            return None
+
+        # Columns: the first and last that differ in any changed row
+        first, last = right, left
+        for y in rows:
+            row, previous = region[y - top], self.previous[y]
+            column = left
+            while column < first and row[column - left] == previous[column]:
+                column += 1
+            first = min(first, column)
+            column = right - 1
+            while column >= last and row[column - left] == previous[column]:
+                column -= 1
+            last = max(last, column + 1)
+        return rows[0], rows[-1] + 1, first, last
+
+    def close(self, clock, display):
+        # Add the final pad as the last frame and close the log
+        self.frame(clock, display)
+        self.log.close()
+
+    def report(self):
+        print(f"\033[1;32mFrame Export successful! - Check '{self.directory}'\033[0m")
+        full = self.frames * self.width * self.height
+        print(f"  {self.frames} frames, {self.written} written, {self.pixels} pixels encoded ({self.pixels / max(full, 1):.1%} of full frames)")
+
+    '''
+    ========================= STILLS ========================= 
+    '''
+    def rgb(self):
+        # The previous frame as RGB bytes, row by row
+        rgb = bytearray()
+        for row in self.previous:
+            raw = little_endian(array('I', row)).tobytes()
+            pixels = bytearray(len(row) * 3)
+            pixels[0::3], pixels[1::3], pixels[2::3] = raw[2::4], raw[1::4], raw[0::4]
+            rgb += pixels
+        return bytes(rgb)
+
+    def still(self, path):
+        rgb = self.rgb()
+        with open(path, 'wb') as f:
+            if self.stills == 'ppm':
+                f.write(b'P6\n%d %d\n255\n' % (self.width, self.height) + rgb)
+            else:
+                f.write(png(self.width, self.height, rgb))
+
+def little_endian(pixels):
+    # Convert an array of colours between the host's byte order and little-endian (in place, and only on
+    # big-endian hosts), as the frame log stores them and rgb() slices them
+    if sys.byteorder == 'big':
+        pixels.byteswap()
+    return pixels
+
+def png(width, height, rgb):
+    # An 8-bit RGB PNG image: every row prefixed by filter type 0 (none), then deflated
+    stride = width * 3
+    raw = b''.join(b'\x00' + rgb[y * stride:(y + 1) * stride] for y in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
+
+'''
+========================= read_frames() ========================= 
+'''
+def read_frames(path):
+    # Replay a frame log: yield the clock and the whole pad (rows of colours) of every frame written
+    with open(path, 'rb') as f:
+        if f.read(4) != b'PArF':
+            raise ValueError(f"'{path}' is not a frame log")
+        width, height = struct.unpack('<HH', f.read(4))
+        pixels = [[0] * width for _ in range(height)]
+        while True:
+            header = f.read(12)
+            if not header:
+                return
+            clock, x, y, w, h = struct.unpack('<IHHHH', header)
+            for row in range(y, y + h):
+                pixels[row][x:x + w] = little_endian(array('I', f.read(w * 4))).tolist()
+            yield clock, [list(row) for row in pixels]
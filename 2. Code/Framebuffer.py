@@ -0,0 +1,107 @@
+try:
+    import numpy
+except ImportError:  # Optional: without NumPy the pad is kept in Python lists
+    numpy = None
+
+'''
+========================= Framebuffer ========================= 
+'''
+class Framebuffer:
+    # The pad of the virtual machine: one 0xRRGGBB colour per pixel, stored as a list per row so that a box is one
+    # slice assignment per row rather than a Python loop per pixel. Writes outside the pad are clipped.
+    # The rectangle covering every write since it was last taken is kept as dirty (top, bottom, left, right)
+    backend = 'lists'
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = [[0] * width for _ in range(height)]
+        self.dirty = None
+
+    def clip(self, x, y, w, h):
+        # Rows and columns of a box that fall on the pad (empty ranges if none do)
+        return max(y, 0), min(y + h, self.height), max(x, 0), min(x + w, self.width)
+
+    def touch(self, top, bottom, left, right):
+        # Grow the dirty rectangle to cover a written one
+        if self.dirty is None:
+            self.dirty = (top, bottom, left, right)
+        else:
+            dirty = self.dirty
+            self.dirty = (min(dirty[0], top), max(dirty[1], bottom), min(dirty[2], left), max(dirty[3], right))
+
+    def take_dirty(self):
+        # The dirty rectangle (None if nothing was written), which starts again empty
+        dirty, self.dirty = self.dirty, None
+        return dirty
+
+    def write(self, x, y, colour):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y][x] = colour
+            self.touch(y, y + 1, x, x + 1)
+
+    def write_box(self, x, y, w, h, colour):
+        top, bottom, left, right = self.clip(x, y, w, h)
+        if left < right and top < bottom:
+            row = [colour] * (right - left)
+            for y in range(top, bottom):
+                self.pixels[y][left:right] = row
+            self.touch(top, bottom, left, right)
+
+    def clear(self, colour):
+        self.pixels = [[colour] * self.width for _ in range(self.height)]
+        self.dirty = (0, self.height, 0, self.width)
+
+    def pixel(self, x, y):
+        return self.pixels[y][x]
+
+    def rows(self):
+        # The pad as a list of rows of colours
+        return [list(row) for row in self.pixels]
+
+    def region(self, top, bottom, left, right):
+        # The colours of a rectangle of the pad, row by row
+        return [row[left:right] for row in self.pixels[top:bottom]]
+
+'''
+========================= NumPy Framebuffer ========================= 
+'''
+class NumpyFramebuffer(Framebuffer):
+    # The pad as a height x width uint32 array: a box is a single slice assignment and clear a fill
+    backend = 'numpy'
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = numpy.zeros((height, width), dtype=numpy.uint32)
+        self.dirty = None
+
+    def write(self, x, y, colour):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y, x] = colour
+            self.touch(y, y + 1, x, x + 1)
+
+    def write_box(self, x, y, w, h, colour):
+        top, bottom, left, right = self.clip(x, y, w, h)
+        if left < right and top < bottom:
+            self.pixels[top:bottom, left:right] = colour
+            self.touch(top, bottom, left, right)
+
+    def clear(self, colour):
+        self.pixels.fill(colour)
+        self.dirty = (0, self.height, 0, self.width)
+
+    def pixel(self, x, y):
+        return int(self.pixels[y, x])
+
+    def rows(self):
+        return self.pixels.tolist()
+
+    def region(self, top, bottom, left, right):
+        return self.pixels[top:bottom, left:right].tolist()
+
+def framebuffer(width, height):
+    # NumPy's framebuffer if NumPy is installed, otherwise the list one (Benchmark.py times both)
+    if numpy is not None:
+        return NumpyFramebuffer(width, height)
+    return Framebuffer(width, height)
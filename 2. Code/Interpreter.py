@@ -0,0 +1,404 @@
+import random
+import operator
+
+from PArL import *
+
+'''
+========================= Function ========================= 
+'''
+class Function:
+    # A resolved function: the static depth of its frame, the frame size and the resolved body
+    __slots__ = ('depth', 'size', 'body')
+
+    def __init__(self):
+        self.depth = 0
+        self.size = 0
+        self.body = None
+
+'''
+========================= Interpreter ========================= 
+'''
+class Interpreter:
+    def __init__(self, width=PAD_WIDTH, height=PAD_HEIGHT, output=print):
+        # Function called with the value of every __print statement
+        self.output = output
+
+        # Pad (display) state used by __width, __height, __write and __write_box, white as generated programs
+        # clear it before their first statement
+        self.width = width
+        self.height = height
+        self.pixels = [0xFFFFFF] * (width * height)
+
+        # Resolution state, from the Resolver's bindings. Run-time frames are only opened by the program and by
+        # function calls: the frames the Resolver gives if, for, while and block statements are laid out in the
+        # frame of their function (or of the program), after the slots of the frames enclosing them
+        self.frames = []  # (depth of the run-time frame, first slot in it, size) of every Resolver frame being resolved
+        self.sizes = []  # Size of every run-time frame being resolved
+        self.max_depth = 0
+        self.types = {}  # id() of a variable's binding -> its type
+        self.functions = {}  # id() of a function declaration -> its Function
+
+        # Execution state: the program frame, and the current frame of every static depth (a display)
+        self.program_frame = []
+        self.display = []
+
+        # Statement resolvers indexed by node kind
+        self.statements = {
+            VARIABLE_DECLARATION_KIND: self.resolve_store,
+            ASSIGNMENT_KIND: self.resolve_store,
+            PRINT_STATEMENT_KIND: self.resolve_print,
+            DELAY_STATEMENT_KIND: self.resolve_delay,
+            WRITE_KIND: self.resolve_write,
+            WRITE_BOX_KIND: self.resolve_write,
+            IF_STATEMENT_KIND: self.resolve_if,
+            FOR_STATEMENT_KIND: self.resolve_for,
+            WHILE_STATEMENT_KIND: self.resolve_while,
+            RETURN_STATEMENT_KIND: self.resolve_return,
+            FUNCTION_DECLARATION_KIND: self.resolve_function,
+            BLOCK_KIND: self.resolve_block,
+        }
+
+        # Operators bound to the callables that implement them
+        self.operators = {
+            '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+            'and': lambda a, b: a and b, 'or': lambda a, b: a or b,
+            '<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+            '==': operator.eq, '!=': operator.ne,
+        }
+
+    '''
+    ========================= run() ========================= 
+    '''
+    def run(self, program_node):
+        # Resolve the whole program once, then execute the resolved tree
+        program = self.resolve(program_node)
+        self.execute_block(program)
+
+    def resolve(self, program_node):
+        # Resolve the program into a block and allocate the frames it runs in
+        self.sizes.append(0)
+        self.enter_frame(program_node, 0)
+        statements = self.resolve_statements(program_node.children)
+        self.exit_frame()
+        self.program_frame.extend([None] * self.sizes.pop())
+        self.display = [None] * (self.max_depth + 1)
+        self.display[0] = self.program_frame
+        return (self.execute_block, statements)
+
+    '''
+    ========================= RESOLUTION ========================= 
+    '''
+    def enter_frame(self, node, depth=None):
+        # Lay out the frame the Resolver recorded on a node: a function's starts a run-time frame of the given depth,
+        # any other follows the slots of the frame enclosing it
+        if depth is None:
+            depth, first, size = self.frames[-1]
+            first += size
+        else:
+            first = 0
+        self.frames.append((depth, first, node.binding[1]))
+        self.sizes[-1] = max(self.sizes[-1], first + node.binding[1])
+
+    def exit_frame(self):
+        self.frames.pop()
+
+    def slot(self, identifier):
+        # Run-time frame depth and index of a variable's slot
+        depth, first, _ = self.frames[identifier.binding[0]]
+        return depth, first + identifier.binding[1]
+
+    def resolve_statements(self, statements):
+        resolved = []
+        for statement in statements:
+            statement = statement.unwrap()
+            node = self.statements[statement.kind](statement)
+            if node is not None:
+                resolved.append(node)
+        return tuple(resolved)
+
+    def resolve_store(self, node):
+        # Declarations and assignments both store the value of an expression into a slot
+        if node.kind == VARIABLE_DECLARATION_KIND:
+            identifier, type_, expr = node.children
+            self.types[id(identifier.binding)] = type_.parameters
+        else:
+            identifier, expr = node.children
+        value = self.resolve_value(expr, self.types[id(identifier.binding)])
+        depth, index = self.slot(identifier)
+        if depth == 0:
+            # The program frame never changes, so its slots are bound directly
+            return (self.execute_program_store, self.program_frame, index, value)
+        return (self.execute_store, depth, index, value)
+
+    def resolve_value(self, node, type_):
+        # Resolve an expression stored as the given type (int values widen to float)
+        value, value_type = self.resolve_expression(node)
+        if type_ == 'float' and value_type == 'int':
+            return (self.execute_unary, float, value)
+        return value
+
+    def resolve_print(self, node):
+        value, type_ = self.resolve_expression(node.children[0])
+        # Values are printed as the virtual machine prints them: booleans as 1 and 0, colours as integers
+        if type_ == 'bool':
+            return (self.execute_print, (self.execute_unary, int, value))
+        return (self.execute_print, value)
+
+    def resolve_delay(self, node):
+        return (self.execute_delay, self.resolve_expression(node.children[0])[0])
+
+    def resolve_write(self, node):
+        arguments = tuple(self.resolve_expression(child)[0] for child in node.children)
+        if node.kind == WRITE_KIND:
+            return (self.execute_write, arguments)
+        return (self.execute_write_box, arguments)
+
+    def resolve_if(self, node):
+        # Both branches are laid out in the if statement's frame
+        self.enter_frame(node)
+        condition = self.resolve_expression(node.children[0])[0]
+        then_block = (self.execute_block, self.resolve_statements(node.children[1].children))
+        else_block = None
+        if len(node.children) == 3:
+            else_block = (self.execute_block, self.resolve_statements(node.children[2].children))
+        self.exit_frame()
+        return (self.execute_if, condition, then_block, else_block)
+
+    def resolve_for(self, node):
+        # A for loop is its initialiser followed by a while loop whose body ends with the update
+        self.enter_frame(node)
+        variable_decl_, condition, assignment, block = node.children
+        initialiser = self.resolve_store(variable_decl_) if variable_decl_ else None
+        condition = self.resolve_expression(condition)[0]
+        body = self.resolve_statements(block.children)
+        if assignment:
+            body += (self.resolve_store(assignment),)
+        self.exit_frame()
+
+        loop = (self.execute_while, condition, body)
+        if initialiser is None:
+            return loop
+        return (self.execute_block, (initialiser, loop))
+
+    def resolve_while(self, node):
+        self.enter_frame(node)
+        condition = self.resolve_expression(node.children[0])[0]
+        body = self.resolve_statements(node.children[1].children)
+        self.exit_frame()
+        return (self.execute_while, condition, body)
+
+    def resolve_block(self, node):
+        self.enter_frame(node)
+        statements = self.resolve_statements(node.children)
+        self.exit_frame()
+        return (self.execute_block, statements)
+
+    def resolve_return(self, node):
+        return (self.execute_return, self.resolve_expression(node.children[0])[0])
+
+    def function_parts(self, node):
+        # Split a function declaration into identifier, formal parameters, return type and block
+        if len(node.children) == 4:
+            identifier, parameters, type_, block = node.children
+            return identifier, parameters.children, type_, block
+        identifier, type_, block = node.children
+        return identifier, (), type_, block
+
+    def function(self, node):
+        # The Function of a declaration (created by its first call if that comes before the declaration)
+        function = self.functions.get(id(node))
+        if function is None:
+            function = self.functions[id(node)] = Function()
+        return function
+
+    def resolve_function(self, node):
+        identifier, parameters, type_, block = self.function_parts(node)
+        function = self.function(node)
+
+        # The function body runs in a frame of its own one deeper than the enclosing function's, starting with
+        # the parameters
+        function.depth = self.frames[-1][0] + 1
+        self.max_depth = max(self.max_depth, function.depth)
+        self.sizes.append(0)
+        self.enter_frame(node, function.depth)
+        for parameter in parameters:
+            self.types[id(parameter.children[0].binding)] = parameter.children[1].parameters
+        function.body = (self.execute_block, self.resolve_statements(block.children))
+        self.exit_frame()
+        function.size = self.sizes.pop()
+
+        # Declarations produce no run-time statement
+        return None
+
+    def binary_operator(self, node, left_type, right_type):
+        # The operator of a binary operation on the given operand types, and the type of its result
+        function = self.operators[node.parameters]
+        if node.kind == RELATIONAL_OP_KIND or node.parameters in ('and', 'or'):
+            return function, 'bool'
+        elif left_type == right_type:
+            if node.parameters == '/' and left_type != 'float':
+                return integer_division, left_type  # Integer operands use integer division
+            return function, left_type
+        return function, 'float'
+
+    def resolve_expression(self, node):
+        # Resolve an expression into an executable tuple and its type
+        node = node.unwrap()
+        if node.kind in (RELATIONAL_OP_KIND, ADDITIVE_OP_KIND, MULTIPLICATIVE_OP_KIND):
+            # Walk down the left spine of a chain of binary operations, so long chains do not recurse
+            chain = []
+            while node.kind in (RELATIONAL_OP_KIND, ADDITIVE_OP_KIND, MULTIPLICATIVE_OP_KIND):
+                chain.append(node)
+                node = node.children[0].unwrap()
+            left, type_ = self.resolve_expression(node)
+
+            # Resolve the right operands from the innermost operation outwards
+            operations = []
+            for node in reversed(chain):
+                right, right_type = self.resolve_expression(node.children[1])
+                function, type_ = self.binary_operator(node, type_, right_type)
+                operations.append((function, right))
+
+            if len(operations) > 1:
+                return (self.execute_chain, left, tuple(operations)), type_
+            function, right = operations[0]
+            if right[0] == self.execute_constant:
+                return (self.execute_binary_constant, function, left, right[1]), type_
+            return (self.execute_binary, function, left, right), type_
+        elif node.kind == IDENTIFIER_KIND:
+            depth, index = self.slot(node)
+            type_ = self.types[id(node.binding)]
+            if depth == 0:
+                return (self.execute_program_variable, self.program_frame, index), type_
+            return (self.execute_variable, depth, index), type_
+        elif node.kind == INTEGER_LITERAL_KIND:
+            return (self.execute_constant, int(node.parameters)), 'int'
+        elif node.kind == FLOAT_LITERAL_KIND:
+            return (self.execute_constant, float(node.parameters)), 'float'
+        elif node.kind == BOOLEAN_LITERAL_KIND:
+            return (self.execute_constant, node.parameters == 'True'), 'bool'
+        elif node.kind == COLOR_LITERAL_KIND:
+            return (self.execute_constant, int(node.parameters[1:], 16)), 'color'
+        elif node.kind == FUNCTION_CALL_KIND:
+            declaration = node.children[0].binding
+            _, parameters, type_, _ = self.function_parts(declaration)
+            arguments = node.children[1].children if len(node.children) == 2 else ()
+            arguments = tuple(self.resolve_value(argument, parameter.children[1].parameters) for argument, parameter in zip(arguments, parameters))
+            return (self.execute_call, self.function(declaration), arguments), type_.parameters
+        elif node.kind == UNARY_OPERATION_KIND:
+            operand, type_ = self.resolve_expression(node.children[1])
+            function = operator.neg if node.children[0].parameters == '-' else operator.not_
+            return (self.execute_unary, function, operand), type_
+        elif node.kind == PAD_WIDTH_KIND:
+            return (self.execute_constant, self.width), 'int'
+        elif node.kind == PAD_HEIGHT_KIND:
+            return (self.execute_constant, self.height), 'int'
+        elif node.kind == PAD_RANDI_KIND and node.children:
+            return (self.execute_unary, random.randrange, self.resolve_expression(node.children[0])[0]), 'int'
+        elif node.kind in (PAD_RANDI_KIND, PAD_READ_KIND):
+            raise ValueError(unsupported_pad_operation(node))
+        else:
+            raise ValueError(f"Unexpected t_type: {node.t_type}")
+
+    '''
+    ========================= EXECUTION ========================= 
+    '''
+    # Every resolved node is a tuple whose first item is the method that executes it.
+    # Statements return None, or a 1-tuple holding the value of an executed return statement.
+
+    def execute_block(self, node):
+        for statement in node[1]:
+            result = statement[0](statement)
+            if result is not None:
+                return result
+
+    def execute_store(self, node):
+        value = node[3]
+        self.display[node[1]][node[2]] = value[0](value)
+
+    def execute_program_store(self, node):
+        value = node[3]
+        node[1][node[2]] = value[0](value)
+
+    def execute_print(self, node):
+        value = node[1]
+        self.output(value[0](value))
+
+    def execute_delay(self, node):
+        # The interpreter runs as fast as possible; delays only evaluate their operand
+        value = node[1]
+        value[0](value)
+
+    def execute_write(self, node):
+        x, y, colour = [value[0](value) for value in node[1]]
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y * self.width + x] = colour
+
+    def execute_write_box(self, node):
+        x, y, w, h, colour = [value[0](value) for value in node[1]]
+        for row in range(max(y, 0), min(y + h, self.height)):
+            for column in range(max(x, 0), min(x + w, self.width)):
+                self.pixels[row * self.width + column] = colour
+
+    def execute_if(self, node):
+        condition = node[1]
+        if condition[0](condition):
+            return self.execute_block(node[2])
+        elif node[3] is not None:
+            return self.execute_block(node[3])
+
+    def execute_while(self, node):
+        condition, body = node[1], node[2]
+        while condition[0](condition):
+            for statement in body:
+                result = statement[0](statement)
+                if result is not None:
+                    return result
+
+    def execute_return(self, node):
+        value = node[1]
+        return (value[0](value),)
+
+    def execute_call(self, node):
+        function = node[1]
+
+        # Evaluate the arguments into the new frame's parameter slots, then make it the current frame of its depth
+        frame = [None] * function.size
+        for index, argument in enumerate(node[2]):
+            frame[index] = argument[0](argument)
+
+        display = self.display
+        outer = display[function.depth]
+        display[function.depth] = frame
+        result = self.execute_block(function.body)
+        display[function.depth] = outer
+        return result[0]
+
+    def execute_binary(self, node):
+        left, right = node[2], node[3]
+        return node[1](left[0](left), right[0](right))
+
+    def execute_binary_constant(self, node):
+        left = node[2]
+        return node[1](left[0](left), node[3])
+
+    def execute_chain(self, node):
+        # A left-associative chain of binary operations, applied one after the other
+        value = node[1]
+        value = value[0](value)
+        for function, right in node[2]:
+            value = function(value, right[0](right))
+        return value
+
+    def execute_unary(self, node):
+        value = node[2]
+        return node[1](value[0](value))
+
+    def execute_variable(self, node):
+        return self.display[node[1]][node[2]]
+
+    def execute_program_variable(self, node):
+        return node[1][node[2]]
+
+    def execute_constant(self, node):
+        return node[1]
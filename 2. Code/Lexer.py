@@ -1,3 +1,5 @@
+import sys
+
 from PArL import *
 
 '''
@@ -50,165 +52,218 @@ transition_table = {
     ],
 }
 
+'''
+========================= DFA (COMPILED TRANSITION TABLE) ========================= 
+'''
+def compile_transition_table(table):
+    # Group characters into classes: characters with identical transitions in every state share a class
+    characters = sorted({char for transitions in table.values() for key in transitions for char in key})
+    signatures = {}
+    char_classes = {}
+    for char in characters:
+        signature = tuple(key.get(char) for state in sorted(table) for key in table[state])
+        char_classes[char] = signatures.setdefault(signature, len(signatures))
+    representatives = {char_class: char for char, char_class in char_classes.items()}
+
+    # Subset construction: every DFA state is the ordered tuple of NFA states that are still valid
+    # (the empty tuple is the dead state, which loops on every character class)
+    dfa_states = [(START,)]
+    dfa_index = {(START,): 0}
+    dfa = []
+    for nfa_states in dfa_states:
+        row = []
+        for char_class in range(len(signatures)):
+            char = representatives[char_class]
+            new_states = []
+            for state in nfa_states:
+                for key in table.get(state, []):
+                    if char in key and key[char] not in new_states:
+                        new_states.append(key[char])
+            new_states = tuple(new_states)
+            if new_states not in dfa_index:
+                dfa_index[new_states] = len(dfa_states)
+                dfa_states.append(new_states)
+            row.append(dfa_index[new_states])
+        dfa.append(row)
+
+    # A DFA state accepts with the token kind of its first valid NFA state (as the NFA simulation did)
+    accepting = [tag_kinds[state_convertor[nfa_states[0]]] if nfa_states and nfa_states != (START,) else None for nfa_states in dfa_states]
+
+    return char_classes, dfa, accepting
+
+char_classes, dfa, accepting = compile_transition_table(transition_table)
+
+# Terminal symbols made of punctuation rather than word characters (e.g. '(', '->', '<=')
+punctuation = {symbol for symbol in terminal_table if symbol[0] not in char_classes}
+
 '''
 ========================= LEXER CLASS ========================= 
 '''
 class Lexer():
     def __init__(self):
-        # Initialize the list of valid states as an empty list
-        self.valid_states = []
+        # Expand the compiled DFA into one dictionary per state mapping a character to the next state,
+        # so that the scanner needs a single lookup per character
+        self.rows = [{char: row[char_class] for char, char_class in char_classes.items()} for row in dfa]
+        self.accepting = accepting
+        self.whitespace = set(whitespace)
 
-    table = transition_table  # Transition table for state transitions
+        # Characters that may start a two-character punctuation symbol (e.g. '<' in '<=')
+        self.prefixes = {symbol[0] for symbol in punctuation if len(symbol) == 2}
 
-    def match(self, symbol, terminal):
-        new_states = []
+    table = transition_table  # Transition table for state transitions
 
+    def match(self, symbol, terminal=True):
         if terminal:
-            # Check if the symbol matches a terminal type and return the corresponding token
-            if symbol in types:
-                return Token(TYPE_TOKEN, symbol)
-            elif symbol in boolean_literals:
-                return Token(BOOLEAN_LITERAL_TOKEN, symbol)
-            elif symbol in pad_width:
-                return Token(PAD_WIDTH_TOKEN, symbol)
-            elif symbol in pad_height:
-                return Token(PAD_HEIGHT_TOKEN, symbol)
-            elif symbol in pad_read:
-                return Token(PAD_READ_TOKEN, symbol)
-            elif symbol in pad_randi:
-                return Token(PAD_RANDI_TOKEN, symbol)
-            elif symbol in multiplicative_ops:
-                return Token(MULTIPLICATIVE_OP_TOKEN, symbol)
-            elif symbol in additive_ops:
-                return Token(ADDITIVE_OP_TOKEN, symbol)
-            elif symbol in relational_ops:
-                return Token(RELATIONAL_OP_TOKEN, symbol)
-            elif symbol in unary_ops:
-                new_states.append(UNARY_OPERATION)
-                return Token(UNARY_OPERATION_TOKEN, symbol)
-            elif symbol in lparen:
-                return Token(LPAREN_TOKEN, symbol)
-            elif symbol in rparen:
-                return Token(RPAREN_TOKEN, symbol)
-            elif symbol in lbrace:
-                return Token(LBRACE_TOKEN, symbol)
-            elif symbol in rbrace:
-                return Token(RBRACE_TOKEN, symbol)
-            elif symbol in equals:
-                return Token(EQUALS_TOKEN, symbol)
-            elif symbol in comma:
-                return Token(COMMA_TOKEN, symbol)
-            elif symbol in period:
-                return Token(PERIOD_TOKEN, symbol)
-            elif symbol in semicolon:
-                return Token(SEMICOLON_TOKEN, symbol)
-            elif symbol in colon:
-                return Token(COLON_TOKEN, symbol)
-            elif symbol in hash_:
-                return Token(HASH_TOKEN, symbol)
-            elif symbol in rarrow:
-                return Token(RARROW_TOKEN, symbol)
-            elif symbol in return_:
-                return Token(RETURN_TOKEN, symbol)
-            elif symbol in if_:
-                return Token(IF_TOKEN, symbol)
-            elif symbol in else_:
-                return Token(ELSE_TOKEN, symbol)
-            elif symbol in for_:
-                return Token(FOR_TOKEN, symbol)
-            elif symbol in while_:
-                return Token(WHILE_TOKEN, symbol)
-            elif symbol in fun:
-                return Token(FUN_TOKEN, symbol)
-            elif symbol in let:
-                return Token(LET_TOKEN, symbol)
-            elif symbol in print_:
-                return Token(PRINT_TOKEN, symbol)
-            elif symbol in delay:
-                return Token(DELAY_TOKEN, symbol)
-            elif symbol in write:
-                return Token(WRITE_TOKEN, symbol)
-            elif symbol in write_box:
-                return Token(WRITE_BOX_TOKEN, symbol)
+            # Look the symbol up in the terminal table and return the corresponding token
+            kind = terminal_table.get(symbol)
+            if kind is not None:
+                return Token(kind, symbol)
         else:
-            # If the symbol is not terminal, check state transitions
-            for state in self.valid_states:
-                for key in self.table[state]:
-                    if symbol in key:
-                        # Append the new state based on the symbol
-                        new_states.append(key[symbol])
-
-            # Update the valid states with the new states
-            self.valid_states = new_states
-
-            # Return False as no terminal token was matched
+            # If the symbol is not terminal, run it through the compiled DFA
+            state = 0
+            for char in symbol:
+                state = self.rows[state].get(char)
+                if state is None:
+                    return False
+            kind = self.accept(symbol, state)
+            if kind is not None:
+                return Token(kind, symbol)
             return False
 
+    def accept(self, symbol, state):
+        # Return the token kind accepted by the DFA state, or None if the state does not accept
+        COLOR_LITERAL_LIMIT = 6  # Define a limit for color literals
+        kind = self.accepting[state]
+        if kind == COLOR_LITERAL_KIND and len(symbol) - 1 != COLOR_LITERAL_LIMIT:
+            return None
+        return kind
+
     '''
-    ========================= TOKENIZE() ========================= 
+    ========================= SCAN() ========================= 
     '''
-    def tokenize(self, string):
-        # Convert the input string into a single string without any modification initially
-        string = ''.join([i for i in string])
-        # Define a list of punctuation characters to be tokenized
-        punctuation = ['(', ')', '{', '}', ',', '+', '==', '!=', '>=', '<=', ':', ';', '//', '/*', '*/', '\n']
-        # Replace each punctuation character in the string with itself surrounded by spaces
-        for char in punctuation:
-            string = string.replace(char, ' {} '.format(char))
-        # Replace newline characters with a special <NEWLINE> token
-        string = string.replace('\n', ' <NEWLINE> ')
-        # Split the modified string into individual words/tokens
-        words = string.split()
-        
-        # Process the list of words to handle comments
-        for i in range(len(words)):
-            if words[i] == '//':  # Handle single-line comments
-                for j in range(i, len(words)):
-                    if words[j] == '<NEWLINE>':
-                        for k in range(i, j + 1):
-                            words[k] = '<COMMENT>'
-                        break
+    def scan(self, string, final=True, base=0, line=1, line_start=0):
+        # Scan the source in a single pass, yielding tokens with their line and column (counted from 1).
+        # 'base', 'line' and 'line_start' locate the string within a larger source (its source offset, the
+        # line it starts on and the source offset of that line). If 'final' is False the string is only a
+        # prefix of the source, so scanning stops before any token or comment that might continue past its
+        # end. Returns the offset where scanning stopped together with the line and line start reached.
+        rows = self.rows
+        start_row = rows[0]
+        whitespace = self.whitespace
+        terminals = terminal_table
+        prefixes = self.prefixes
+        intern = sys.intern
+        length = len(string)
+        position = 0
 
-            if words[i] == '/*':  # Handle multi-line comments
-                for j in range(i, len(words)):
-                    if words[j] == '*/':
-                        for k in range(i, j + 1):
-                            words[k] = '<COMMENT>'
+        while position < length:
+            char = string[position]
+
+            # Words (identifiers, keywords and literals) run through the DFA one character at a time
+            state = start_row.get(char)
+            if state is not None:
+                end = position + 1
+                while end < length:
+                    next_state = rows[state].get(string[end])
+                    if next_state is None:
                         break
+                    state = next_state
+                    end += 1
+
+                if end == length and not final:
+                    return position, line, line_start
 
-        # Remove <NEWLINE> and <COMMENT> tokens from the list of words
-        words = [i for i in words if i not in ['<NEWLINE>', '<COMMENT>']]
+                # Keywords and other terminals take precedence over identifiers
+                word = string[position:end]
+                kind = terminals.get(word)
+                if kind is None:
+                    kind = self.accept(word, state)
+                    if kind is None:
+                        raise Exception('\033[1;31mInvalid token: "{}" at line {}, column {}\033[0m'.format(word, line, base + position - line_start + 1))
+                yield Token(kind, intern(word), line, base + position - line_start + 1)
+                position = end
 
-        tokens = []  # List to store tokens
-        commands = []  # List to store final commands
+            # Skip whitespace between tokens, counting lines
+            elif char in whitespace:
+                position += 1
+                if char == '\n':
+                    line += 1
+                    line_start = base + position
 
-        for token in words:
-            COLOR_LITERAL_LIMIT = 6  # Define a limit for color literals
-            self.valid_states = [START]  # Initialize valid states with START state
-            # Match terminal symbols
-            terminal = self.match(token, terminal=True)
-            if terminal:
-                tokens.append(terminal)
+            # A trailing prefix character may begin a two-character symbol or a comment
+            elif position + 1 == length and not final and (char in prefixes or char == '/'):
+                return position, line, line_start
+
+            # Skip single-line comments up to (and including) the end of the line
+            elif char == '/' and string.startswith('//', position):
+                end = string.find('\n', position)
+                if end == -1:
+                    if not final:
+                        return position, line, line_start
+                    end = length
+                position = end + 1
+                line += 1
+                line_start = base + position
+
+            # Skip multi-line comments up to the closing '*/', counting the lines they span
+            elif char == '/' and string.startswith('/*', position):
+                end = string.find('*/', position + 2)
+                if end == -1:
+                    if not final:
+                        return position, line, line_start
+                    raise Exception('\033[1;31mUnterminated comment "/*" at line {}, column {}\033[0m'.format(line, base + position - line_start + 1))
+                newlines = string.count('\n', position, end)
+                if newlines:
+                    line += newlines
+                    line_start = base + string.rfind('\n', position, end) + 1
+                position = end + 2
+
+            # Punctuation, preferring two-character symbols (e.g. '<=' over '<')
             else:
-                # Process each character in the token
-                for char in token:
-                    self.match(char, terminal=False)
-
-                    # Check if the token is a color literal and has the correct length
-                    if COLOR_LITERAL in self.valid_states:
-                        if len(token) - 1 != COLOR_LITERAL_LIMIT:
-                            self.valid_states.remove(COLOR_LITERAL)
-                # If no valid states are left, raise an exception for an invalid token
-                if len(self.valid_states) == 0:
-                    raise Exception('\033[1;31mInvalid token: "{}"\033[0m'.format(token))
-                else:
-                    # If valid states are present, append the token to the tokens list
-                    tokens.append(Token(state_convertor[self.valid_states[0]], token))
-
-            # Add the processed tokens to the commands list
-            commands += tokens
-            tokens = []
+                symbol = string[position:position + 2] if char in prefixes else char
+                if symbol not in terminals:
+                    symbol = char
+                    if symbol not in terminals:
+                        raise Exception('\033[1;31mInvalid token: "{}" at line {}, column {}\033[0m'.format(char, line, base + position - line_start + 1))
+
+                yield Token(terminals[symbol], intern(symbol), line, base + position - line_start + 1)
+                position += len(symbol)
+
+        return length, line, line_start
+
+    '''
+    ========================= ITER_TOKENS() ========================= 
+    '''
+    def iter_tokens(self, source, chunk_size=65536):
+        # Read the source in chunks (from a file object, or any iterable of strings) and yield tokens as
+        # soon as they are scanned. Only the unscanned tail of the buffer (a token or comment split across
+        # chunks) is carried over, so memory is bounded by the chunk size and the longest token or comment.
+        chunks = iter(lambda: source.read(chunk_size), '') if hasattr(source, 'read') else source
+        buffer = ''
+        base = 0  # Source offset of the start of the buffer
+        line = 1  # Line reached by the scanner
+        line_start = 0  # Source offset of the start of that line
+
+        for chunk in chunks:
+            buffer += chunk
+            position, line, line_start = yield from self.scan(buffer, False, base, line, line_start)
+
+            # Drop the scanned part of the buffer
+            buffer = buffer[position:]
+            base += position
+
+        yield from self.scan(buffer, True, base, line, line_start)
+
+        # Print a success message once the whole source has been scanned
+        print("\033[1;32mTokenizer (& Lexer) successful!\033[0m")
+
+    '''
+    ========================= TOKENIZE() ========================= 
+    '''
+    def tokenize(self, string):
+        # Scan the whole source into a list of tokens
+        commands = list(self.scan(string))
         # Print a success message
         print("\033[1;32mTokenizer (& Lexer) successful!\033[0m")
         # Return the list of commands
-        return commands
\ No newline at end of file
+        return commands
@@ -6,44 +6,76 @@ from PArL import * # PArL Basic Structure [TASKS 1-5]
 # Import the required classes from the modules
 from Lexer import Lexer # TASK-1
 from Parser import Parser # TASK-2
+from Resolver import Resolver # TASK-3
 from Semantic_Analysis import SemanticAnalysis # TASK-3
 from Code_Generation import CodeGenerator, ArrayCodeGenerator # TASK-4 & 5
+from Interpreter import Interpreter # --run
+from Closure_Compilation import ClosureCompiler # --run-closures
+from Constant_Folding import ConstantFolder # constant folding
+from Dead_Code import DeadCodeEliminator # --dce
+from Peephole import PeepholeOptimizer # -O
+from Virtual_Machine import VirtualMachine # --vm
+from Frame_Export import FrameExporter # --export
+from Profiler import ProfilingMachine # --profile
 
 def main():
     # Check if the correct number of command-line arguments is provided
-    if len(sys.argv) != 2:
+    if len(sys.argv) < 2 or any(option not in ('--run', '--run-closures', '-O', '--dce', '--vm', '--realtime', '--export', '--profile') for option in sys.argv[2:]):
         # Print the usage message in bold and red if incorrect arguments are provided
         
         # Example: python3 ./Assignment/Main.py ./Assignment/source.txt  
-        print("\n\033[1;31mUsage: python3 Main.py /path/to/source.txt\033[0m\n")
+        print("\n\033[1;31mUsage: python3 Main.py /path/to/source.txt [--run | --run-closures | -O | --dce | --vm [--realtime] [--export] [--profile]]\033[0m\n")
         sys.exit(1)
     # Retrieve the path to the source file from the command-line arguments
     source_file_path = sys.argv[1]
+    options = sys.argv[2:]
 
     try:
-        # Open the source file and read its contents
-        with open(source_file_path, 'r', encoding='utf-8') as source_file:
-            source_code = source_file.read()
-
-        # Create a Lexer object and tokenize the source code
+        # Create a Lexer object and a Parser object
         lexer = Lexer()
-        tokens = lexer.tokenize(source_code)
-
-        # Create a Parser object and parse the tokens
         parser = Parser() 
-        parser.parse(tokens)
+
+        # Open the source file and parse the tokens as the lexer streams them from the file
+        with open(source_file_path, 'r', encoding='utf-8') as source_file:
+            parser.parse(TokenStream(lexer.iter_tokens(source_file)))
 
         # Set the AST root node to the program node
         ast_root = parser.program_node
 
+        # Bind every identifier to its declaration's frame slot
+        resolver = Resolver()
+        resolver.program(ast_root)
+
         # Create a SemanticAnalysis object and perform semantic analysis
         semantic_analysis = SemanticAnalysis()
         semantic_analysis.program(ast_root)
 
+        # With --run, execute the checked program on the host instead of generating code
+        if '--run' in options:
+            Interpreter().run(ast_root)
+            return
+
+        # With --run-closures, compile the checked program to Python closures and execute them
+        if '--run-closures' in options:
+            ClosureCompiler().run(ast_root)
+            return
+
+        # Replace constant expressions and constant variables by literals before generating code
+        ConstantFolder().program(ast_root)
+
+        # With --dce, remove unreachable statements and the functions never called from the main program
+        if '--dce' in options:
+            DeadCodeEliminator().program(ast_root)
+
         # Create a CodeGenerator object and generate code
         code_generator = CodeGenerator()
         code_generator.program(ast_root)
 
+        # With -O, rewrite the generated code with the peephole optimizer
+        if '-O' in options:
+            PeepholeOptimizer().program(code_generator.code_blocks)
+            code_generator.serialize()
+
         # Create a ArrayCodeGenerator object and generate code
         code_generatorARRAY = ArrayCodeGenerator()
         code_generatorARRAY.program(ast_root)
@@ -55,13 +87,34 @@ def main():
 
         # Write the generated code to the output file
         with open(output_file_path, 'w', encoding='utf-8') as f:
-            for code_block in code_generator.code_blocks:
-                f.write(''.join(code_block))
+            f.write(code_generator.code)
 
         # Write the generated code to the output2 [ARRAY] file
         with open(output_file_path2, 'w', encoding='utf-8') as f:
-            for code_block in code_generatorARRAY.code_blocks:
-                f.write(''.join(code_block))
+            f.write(code_generatorARRAY.code)
+
+        # With --vm, load the generated PArIR and execute it on the host (delays only sleep with --realtime)
+        if '--vm' in options or '--export' in options or '--profile' in options:
+            machine = ProfilingMachine if '--profile' in options else VirtualMachine
+            virtual_machine = machine(realtime='--realtime' in options)
+
+            # With --export, write the frame shown at every delay (and the final one) to the 'frames' folder
+            if '--export' in options:
+                exporter = FrameExporter(os.path.join(current_directory, 'frames'), virtual_machine.width, virtual_machine.height, 'png')
+                virtual_machine.snapshot = exporter
+
+            virtual_machine.load(code_generator.code)
+            virtual_machine.run()
+            virtual_machine.report()
+
+            # With --profile, also write the instructions run under every call stack for flame graph tools
+            if '--profile' in options:
+                virtual_machine.write_collapsed(os.path.join(current_directory, 'profile.folded'))
+                print("\033[1;32mProfile written! - Check 'profile.folded'\033[0m")
+
+            if '--export' in options:
+                exporter.close(virtual_machine.clock, virtual_machine.display)
+                exporter.report()
 
     except FileNotFoundError:
         # Handle the case where the source file is not found
@@ -89,12 +89,17 @@ VARIABLE_DECLARATION_TOKEN = '<variable_declaration>'       # Token for variable
 FORMAL_PARAMETER_TOKEN = '<formal_parameter>'               # Token for formal parameter (Singular)
 FORMAL_PARAMETERS_TOKEN = '<formal_parameters>'             # Token for formal parameters (Plural)
 
+ARRAY_DECLARATION_TOKEN = '<array_declaration>'             # Token for array declarations
+ARRAY_ASSIGNMENT_TOKEN = '<array_assignment>'               # Token for array assignments
+ARRAY_ACCESS_TOKEN = '<array_access>'                       # Token for array accesses
+
 '''
 ========================= STATE_CONVERTOR ========================= 
 '''
 state_convertor = {
     INTEGER_LITERAL: INTEGER_LITERAL_TOKEN,                 # Token for integer literals
     FLOAT_LITERAL: FLOAT_LITERAL_TOKEN,                     # Token for float literals
+    FINAL_FLOAT_LITERAL: FLOAT_LITERAL_TOKEN,               # Token for float literals (digits after '.')
     COLOR_LITERAL: COLOR_LITERAL_TOKEN,                     # Token for color literals
     LITERAL: LITERAL_TOKEN,                                 # Token for literals
     IDENTIFIER: IDENTIFIER_TOKEN,                           # Token for identifiers
@@ -169,6 +174,149 @@ WRITE_BOX_TOKEN = '<write_box>'                             # Token for write bo
 NONE_TOKEN = '<none>'                                       # Token for none keyword
 EOF_TOKEN = '<eof>'                                         # Token for end of file
 
+'''
+========================= KINDS ========================= 
+'''
+INVALID_KIND = 0                                            # Kind for invalid tokens
+FUNCTION_DECLARATION_KIND = 1                               # Kind for function declarations
+STATEMENT_KIND = 2                                          # Kind for statements
+PROGRAM_KIND = 3                                            # Kind for programs
+BLOCK_KIND = 4                                              # Kind for blocks
+WRITE_KIND = 5                                              # Kind for write
+WRITE_BOX_KIND = 6                                          # Kind for write box
+PRINT_STATEMENT_KIND = 7                                    # Kind for print statements
+DELAY_STATEMENT_KIND = 8                                    # Kind for delay statements
+RETURN_STATEMENT_KIND = 9                                   # Kind for return statements
+IF_STATEMENT_KIND = 10                                      # Kind for if statements
+FOR_STATEMENT_KIND = 11                                     # Kind for for statements
+WHILE_STATEMENT_KIND = 12                                   # Kind for while statements
+INTEGER_LITERAL_KIND = 13                                   # Kind for integer literals
+FLOAT_LITERAL_KIND = 14                                     # Kind for float literals
+COLOR_LITERAL_KIND = 15                                     # Kind for color literals
+LITERAL_KIND = 16                                           # Kind for literals
+IDENTIFIER_KIND = 17                                        # Kind for identifiers
+ACTUAL_PARAMETERS_KIND = 18                                 # Kind for actual parameters
+FUNCTION_CALL_KIND = 19                                     # Kind for function calls
+UNARY_OPERATION_KIND = 20                                   # Kind for unary operations
+SUB_EXPRESSION_KIND = 21                                    # Kind for sub-expressions
+FACTOR_KIND = 22                                            # Kind for factors
+TERM_KIND = 23                                              # Kind for terms
+SIMPLE_EXPRESSION_KIND = 24                                 # Kind for simple expressions
+EXPRESSION_KIND = 25                                        # Kind for expressions
+ASSIGNMENT_KIND = 26                                        # Kind for assignments
+VARIABLE_DECLARATION_KIND = 27                              # Kind for variable declarations
+FORMAL_PARAMETER_KIND = 28                                  # Kind for formal parameter (Singular)
+FORMAL_PARAMETERS_KIND = 29                                 # Kind for formal parameters (Plural)
+LETTER_KIND = 30                                            # Kind for letters
+DIGIT_KIND = 31                                             # Kind for digits
+TYPE_KIND = 32                                              # Kind for types
+BOOLEAN_LITERAL_KIND = 33                                   # Kind for boolean literals
+PAD_WIDTH_KIND = 34                                         # Kind for pad width
+PAD_HEIGHT_KIND = 35                                        # Kind for pad height
+PAD_READ_KIND = 36                                          # Kind for pad read
+PAD_RANDI_KIND = 37                                         # Kind for pad randi
+MULTIPLICATIVE_OP_KIND = 38                                 # Kind for multiplicative operators
+ADDITIVE_OP_KIND = 39                                       # Kind for additive operators
+RELATIONAL_OP_KIND = 40                                     # Kind for relational operators
+UNARY_KIND = 41                                             # Kind for unary operators
+LPAREN_KIND = 42                                            # Kind for left parenthesis
+RPAREN_KIND = 43                                            # Kind for right parenthesis
+LBRACE_KIND = 44                                            # Kind for left brace
+RBRACE_KIND = 45                                            # Kind for right brace
+EQUALS_KIND = 46                                            # Kind for equals sign
+COMMA_KIND = 47                                             # Kind for comma
+PERIOD_KIND = 48                                            # Kind for period
+SEMICOLON_KIND = 49                                         # Kind for semicolon
+COLON_KIND = 50                                             # Kind for colon
+HASH_KIND = 51                                              # Kind for hash symbol
+RARROW_KIND = 52                                            # Kind for right arrow (->)
+RETURN_KIND = 53                                            # Kind for return keyword
+IF_KIND = 54                                                # Kind for if keyword
+ELSE_KIND = 55                                              # Kind for else keyword
+FOR_KIND = 56                                               # Kind for for keyword
+WHILE_KIND = 57                                             # Kind for while keyword
+FUN_KIND = 58                                               # Kind for fun keyword
+LET_KIND = 59                                               # Kind for let keyword
+PRINT_KIND = 60                                             # Kind for print keyword
+DELAY_KIND = 61                                             # Kind for delay keyword
+NONE_KIND = 62                                              # Kind for none keyword
+EOF_KIND = 63                                               # Kind for end of file
+ARRAY_DECLARATION_KIND = 64                                 # Kind for array declarations
+ARRAY_ASSIGNMENT_KIND = 65                                  # Kind for array assignments
+ARRAY_ACCESS_KIND = 66                                      # Kind for array accesses
+
+# Kind -> tag (e.g. IDENTIFIER_KIND -> '<identifier>') and tag -> kind
+kind_tags = [
+    INVALID_TOKEN,
+    FUNCTION_DECLARATION_TOKEN,
+    STATEMENT_TOKEN,
+    PROGRAM_TOKEN,
+    BLOCK_TOKEN,
+    WRITE_TOKEN,
+    WRITE_BOX_TOKEN,
+    PRINT_STATEMENT_TOKEN,
+    DELAY_STATEMENT_TOKEN,
+    RETURN_STATEMENT_TOKEN,
+    IF_STATEMENT_TOKEN,
+    FOR_STATEMENT_TOKEN,
+    WHILE_STATEMENT_TOKEN,
+    INTEGER_LITERAL_TOKEN,
+    FLOAT_LITERAL_TOKEN,
+    COLOR_LITERAL_TOKEN,
+    LITERAL_TOKEN,
+    IDENTIFIER_TOKEN,
+    ACTUAL_PARAMETERS_TOKEN,
+    FUNCTION_CALL_TOKEN,
+    UNARY_OPERATION_TOKEN,
+    SUB_EXPRESSION_TOKEN,
+    FACTOR_TOKEN,
+    TERM_TOKEN,
+    SIMPLE_EXPRESSION_TOKEN,
+    EXPRESSION_TOKEN,
+    ASSIGNMENT_TOKEN,
+    VARIABLE_DECLARATION_TOKEN,
+    FORMAL_PARAMETER_TOKEN,
+    FORMAL_PARAMETERS_TOKEN,
+    LETTER_TOKEN,
+    DIGIT_TOKEN,
+    TYPE_TOKEN,
+    BOOLEAN_LITERAL_TOKEN,
+    PAD_WIDTH_TOKEN,
+    PAD_HEIGHT_TOKEN,
+    PAD_READ_TOKEN,
+    PAD_RANDI_TOKEN,
+    MULTIPLICATIVE_OP_TOKEN,
+    ADDITIVE_OP_TOKEN,
+    RELATIONAL_OP_TOKEN,
+    UNARY_TOKEN,
+    LPAREN_TOKEN,
+    RPAREN_TOKEN,
+    LBRACE_TOKEN,
+    RBRACE_TOKEN,
+    EQUALS_TOKEN,
+    COMMA_TOKEN,
+    PERIOD_TOKEN,
+    SEMICOLON_TOKEN,
+    COLON_TOKEN,
+    HASH_TOKEN,
+    RARROW_TOKEN,
+    RETURN_TOKEN,
+    IF_TOKEN,
+    ELSE_TOKEN,
+    FOR_TOKEN,
+    WHILE_TOKEN,
+    FUN_TOKEN,
+    LET_TOKEN,
+    PRINT_TOKEN,
+    DELAY_TOKEN,
+    NONE_TOKEN,
+    EOF_TOKEN,
+    ARRAY_DECLARATION_TOKEN,
+    ARRAY_ASSIGNMENT_TOKEN,
+    ARRAY_ACCESS_TOKEN,
+]
+tag_kinds = {tag: kind for kind, tag in enumerate(kind_tags)}
+
 '''
 ========================= BASIC_PArL ========================= 
 '''
@@ -183,6 +331,9 @@ pad_height = ['__height']                                   # Pad height
 pad_read = ['__read']                                       # Pad read
 pad_randi = ['__randi']                                     # Pad randi
 
+PAD_WIDTH = 36                                              # Pad width in pixels (__width), for every engine
+PAD_HEIGHT = 36                                             # Pad height in pixels (__height), for every engine
+
 multiplicative_ops = ['*', '/', 'and']                      # Multiplicative operators
 additive_ops = ['+', '-', 'or']                             # Additive operators
 relational_ops = ['<', '>', '<=', '>=', '==', '!=']         # Relational operators
@@ -214,15 +365,66 @@ write = ['__write']                                         # Write
 write_box = ['__write_box']                                 # Write_Box
 
 WHITESPACE = ' '                                            # WHITESPACE
+whitespace = list(string.whitespace)                        # Whitespace characters separating tokens
+
+'''
+========================= TERMINAL_TABLE ========================= 
+'''
+terminal_symbols = [
+    (types, TYPE_TOKEN),                                    # Types
+    (boolean_literals, BOOLEAN_LITERAL_TOKEN),              # Boolean literals
+    (pad_width, PAD_WIDTH_TOKEN),                           # Pad width
+    (pad_height, PAD_HEIGHT_TOKEN),                         # Pad height
+    (pad_read, PAD_READ_TOKEN),                             # Pad read
+    (pad_randi, PAD_RANDI_TOKEN),                           # Pad randi
+    (multiplicative_ops, MULTIPLICATIVE_OP_TOKEN),          # Multiplicative operators
+    (additive_ops, ADDITIVE_OP_TOKEN),                      # Additive operators ('-' is additive before unary)
+    (relational_ops, RELATIONAL_OP_TOKEN),                  # Relational operators
+    (unary_ops, UNARY_OPERATION_TOKEN),                     # Unary operators
+    (lparen, LPAREN_TOKEN),                                 # Left parenthesis
+    (rparen, RPAREN_TOKEN),                                 # Right parenthesis
+    (lbrace, LBRACE_TOKEN),                                 # Left brace
+    (rbrace, RBRACE_TOKEN),                                 # Right brace
+    (equals, EQUALS_TOKEN),                                 # Equals
+    (comma, COMMA_TOKEN),                                   # Comma
+    (period, PERIOD_TOKEN),                                 # Period
+    (semicolon, SEMICOLON_TOKEN),                           # Semicolon
+    (colon, COLON_TOKEN),                                   # Colon
+    (hash_, HASH_TOKEN),                                    # Hash
+    (rarrow, RARROW_TOKEN),                                 # Right arrow
+    (return_, RETURN_TOKEN),                                # Return
+    (if_, IF_TOKEN),                                        # If
+    (else_, ELSE_TOKEN),                                    # Else
+    (for_, FOR_TOKEN),                                      # For
+    (while_, WHILE_TOKEN),                                  # While
+    (fun, FUN_TOKEN),                                       # Fun
+    (let, LET_TOKEN),                                       # Let
+    (print_, PRINT_TOKEN),                                  # Print
+    (delay, DELAY_TOKEN),                                   # Delay
+    (write, WRITE_TOKEN),                                   # Write
+    (write_box, WRITE_BOX_TOKEN),                           # Write_Box
+]
+
+# Lexeme -> token kind for every terminal symbol (the first group listing a symbol wins)
+terminal_table = {symbol: tag_kinds[t_type] for symbols, t_type in reversed(terminal_symbols) for symbol in symbols}
 
 '''
 ========================= TOKEN() [TASK-1: LEXER] ========================= 
 '''
 class Token:
-    def __init__(self, t_type, value):
-        # Initialize the token type and value
-        self.t_type = t_type
+    __slots__ = ('kind', 'value', 'line', 'column')  # No per-token __dict__ (tokens are created in bulk)
+
+    def __init__(self, kind, value, line=0, column=0):
+        # Initialize the token kind (see KINDS), value (lexeme) and position in the source (line, column)
+        self.kind = kind
         self.value = value
+        self.line = line
+        self.column = column
+
+    @property
+    def t_type(self):
+        # Tag of the token kind (e.g. '<identifier>')
+        return kind_tags[self.kind]
 
     def __str__(self):
         # Convert the token to a string representation
@@ -236,34 +438,134 @@ class Token:
     def __repr__(self):
         # Use the string representation for the repr function
         return self.__str__()
-    
+
+EOF = Token(EOF_KIND, None)                                # Token returned when reading past the end of a stream
+
+'''
+========================= TOKEN_STREAM() [TASK-2: PARSER] ========================= 
+'''
+class TokenStream:
+    def __init__(self, tokens, position=0, source=None):
+        # Share the underlying token list and keep a cursor (position) into it. Any other iterable of
+        # tokens (e.g. Lexer.iter_tokens) is pulled into the shared list only as the parser needs it.
+        if not isinstance(tokens, list):
+            source = iter(tokens)
+            tokens = []
+        self.tokens = tokens
+        self.position = position
+        self.source = source
+
+    def fill(self, count):
+        # Pull tokens from the source until the shared list holds at least 'count' tokens (or it runs out)
+        while len(self.tokens) < count:
+            token = next(self.source, None)
+            if token is None:
+                self.source = None
+                return
+            self.tokens.append(token)
+
+    def rest(self, offset):
+        # Return a cursor 'offset' tokens further on without copying the token list
+        return TokenStream(self.tokens, self.position + offset, self.source)
+
+    def available(self, count):
+        # Check if at least 'count' tokens remain from the cursor onwards
+        if self.source is not None:
+            self.fill(self.position + count)
+        return self.position + count <= len(self.tokens)
+
+    def __len__(self):
+        # Number of tokens remaining from the cursor onwards (drains the source)
+        if self.source is not None:
+            self.tokens.extend(self.source)
+            self.source = None
+        return len(self.tokens) - self.position
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Slices are bounded copies relative to the cursor (e.g. for error messages)
+            start = self.position + (index.start or 0)
+            if index.stop is None:
+                len(self)
+                stop = len(self.tokens)
+            else:
+                stop = self.position + index.stop
+                if self.source is not None:
+                    self.fill(stop)
+            return self.tokens[start:stop]
+
+        # Reading past the end of the stream yields the EOF token
+        if self.source is not None:
+            self.fill(self.position + index + 1)
+        if self.position + index < len(self.tokens):
+            return self.tokens[self.position + index]
+        return EOF
+
 '''
 ========================= AST_Node() [TASK-2/3: PARSER & Semantic Analysis] ========================= 
 '''
 class AST_Node:
-    def __init__(self, t_type, parameters, children=[], token_count=0, indent =0):
-        # Initialize the AST node type, parameters, children, and token count
-        self.t_type = t_type
+    __slots__ = ('kind', 'parameters', 'children', 'token_count', 'position', 'binding')  # No per-node __dict__
+
+    def __init__(self, kind, parameters, children=(), token_count=0, position=0):
+        # Initialize the AST node kind (see KINDS), parameters, children (kept as a tuple), token count
+        # and position (index of its first token, so the node spans tokens[position:position + token_count])
+        self.kind = kind
         self.parameters = parameters
-        self.children = children
+        self.children = tuple(children)
         self.token_count = token_count
+        self.position = position
+        # Set by the Resolver: (depth, index) of a variable identifier's frame slot, the declaration node of a
+        # called function's identifier, or (depth, size) of the frame opened by a program/block/if/for/while/function
+        self.binding = None
+
+    @property
+    def t_type(self):
+        # Tag of the node kind (e.g. '<variable_declaration>')
+        return kind_tags[self.kind]
+
+    def unwrap(self):
+        # Skip the single-child nodes that only record the grammar rule that produced them
+        node = self
+        while node.kind in wrapper_kinds:
+            node = node.children[0]
+        return node
 
     def __repr__(self):
         # Convert the AST node to a string representation
         open_tag = self.t_type
         close_tag = self.t_type[0] + '/' + self.t_type[1:]
         # Include the children nodes in the representation
-        return '{} {} {}\n'.format(open_tag, self.children, close_tag)
-        
-    def __eq__(self, other: object) -> bool:
-        # Check if two AST nodes are equal
-        if isinstance(other, AST_Node):
-            return (
-                self.t_type == other.t_type and 
-                self.parameters == other.parameters and 
-                self.children == other.children
-            )
-        
+        return '{} {} {}\n'.format(open_tag, list(self.children), close_tag)
+
+def same_tree(a, b):
+    # Structural equality of two trees (kinds, parameters and children), e.g. for comparing parser output in tests
+    if not isinstance(a, AST_Node) or not isinstance(b, AST_Node):
+        return a is b
+    return (
+        a.kind == b.kind and
+        a.parameters == b.parameters and
+        len(a.children) == len(b.children) and
+        all(same_tree(x, y) for x, y in zip(a.children, b.children))
+    )
+
+# Single-child nodes wrapping a statement or expression (see AST_Node.unwrap)
+wrapper_kinds = {STATEMENT_KIND, EXPRESSION_KIND, SIMPLE_EXPRESSION_KIND, TERM_KIND, FACTOR_KIND, LITERAL_KIND, SUB_EXPRESSION_KIND}
+
+def unsupported_pad_operation(node):
+    # Error message for the pad operations that the grammar gives no operands: __read takes no pixel coordinates
+    # and __randi no bound when parsed as a literal or factor, and PArIR has no instruction reading the pad
+    if node.kind == PAD_READ_KIND:
+        return "'__read' is not supported: the grammar does not give it the x and y of the pixel to read"
+    return "'__randi' needs the upper bound of the random integer (e.g. '__randi 10')"
+
+def integer_division(left, right):
+    # Quotient of two ints rounded toward zero, as integer division in the PArIR reference (// rounds toward -inf)
+    quotient = left // right
+    if quotient < 0 and quotient * right != left:
+        quotient += 1
+    return quotient
+
 '''
 ========================= INSTRUCTION_SET [TASK-4: Code Generation] ========================= 
 '''
@@ -324,4 +626,138 @@ PAR_STA = 'sta'                                             # Pops a (memory lev
 PAR_PUSHA = 'pusha ['                                       # Pushes the values in an array size c (popped from OpS), and pushes to OpS values starting at index i of the frame at stack level l.
 PAR_PUSH_PLUS = 'push +'                                    # Pops offset o from OpS and pushes back to OpS the value x located at index i+o of the frame at stack level l.
 PAR_PRINTA = 'printa'                                       # Pops c (count) from OpS and prints to the logs section c popped values from the OpS.
-PAR_RETA = 'reta'                                           # Pops c (count) and c values from OpS and pushes them back in reverse order to OpS. Used to return an array.
\ No newline at end of file
+PAR_RETA = 'reta'                                           # Pops c (count) and c values from OpS and pushes them back in reverse order to OpS. Used to return an array.
+
+'''
+========================= OPCODES [TASK-4: Code Generation] ========================= 
+'''
+PUSH_OPCODE = 0                                             # push <value>
+PUSH_PC_OPCODE = 1                                          # push #PC<offset> (a label of the block until it is linked)
+PUSH_FUNCTION_OPCODE = 2                                    # push .<function>
+PUSH_FRAME_OPCODE = 3                                       # push [<index>:<level>]
+ST_OPCODE = 4
+NOP_OPCODE = 5
+DROP_OPCODE = 6
+DUP_OPCODE = 7
+ADD_OPCODE = 8
+SUB_OPCODE = 9
+MUL_OPCODE = 10
+DIV_OPCODE = 11
+MOD_OPCODE = 12
+INC_OPCODE = 13
+DEC_OPCODE = 14
+MAX_OPCODE = 15
+MIN_OPCODE = 16
+IRND_OPCODE = 17
+AND_OPCODE = 18
+OR_OPCODE = 19
+NOT_OPCODE = 20
+LT_OPCODE = 21
+LE_OPCODE = 22
+GT_OPCODE = 23
+GE_OPCODE = 24
+EQ_OPCODE = 25
+JMP_OPCODE = 26
+CJMP_OPCODE = 27
+CJMP_2_OPCODE = 28
+CALL_OPCODE = 29
+RET_OPCODE = 30
+HALT_OPCODE = 31
+OFRAME_OPCODE = 32
+CFRAME_OPCODE = 33
+ALLOC_OPCODE = 34
+DELAY_OPCODE = 35
+WRITE_OPCODE = 36
+WRITE_BOX_OPCODE = 37
+CLEAR_OPCODE = 38
+WIDTH_OPCODE = 39
+HEIGHT_OPCODE = 40
+PRINT_OPCODE = 41
+DUPA_OPCODE = 42
+STA_OPCODE = 43
+PUSHA_OPCODE = 44                                           # pusha [<index>:<level>]
+PUSH_PLUS_OPCODE = 45                                       # push +[<index>:<level>]
+PRINTA_OPCODE = 46
+RETA_OPCODE = 47
+
+# Opcode -> PArIR line of the instruction, formatted (printf-style) with its operand tuple
+opcode_formats = [line + '\n' for line in [
+    PAR_PUSH + ' %s',
+    PAR_PUSH_HASH + 'PC%+d',
+    PAR_PUSH_DOT + '%s',
+    PAR_PUSH_STACK + '%s:%s]',
+    PAR_ST,
+    PAR_NOP,
+    PAR_DROP,
+    PAR_DUP,
+    PAR_ADD,
+    PAR_SUB,
+    PAR_MUL,
+    PAR_DIV,
+    PAR_MOD,
+    PAR_INC,
+    PAR_DEC,
+    PAR_MAX,
+    PAR_MIN,
+    PAR_IRND,
+    PAR_AND,
+    PAR_OR,
+    PAR_NOT,
+    PAR_LT,
+    PAR_LE,
+    PAR_GT,
+    PAR_GE,
+    PAR_EQ,
+    PAR_JMP,
+    PAR_CJMP,
+    PAR_CJMP_2,
+    PAR_CALL,
+    PAR_RET,
+    PAR_HALT,
+    PAR_OFRAME,
+    PAR_CFRAME,
+    PAR_ALLOC,
+    PAR_DELAY,
+    PAR_WRITE,
+    PAR_WRITE_BOX,
+    PAR_CLEAR,
+    PAR_WIDTH,
+    PAR_HEIGHT,
+    PAR_PRINT,
+    PAR_DUPA,
+    PAR_STA,
+    PAR_PUSHA + '%s:%s]',
+    PAR_PUSH_PLUS + '[%s:%s]',
+    PAR_PRINTA,
+    PAR_RETA,
+]]
+
+'''
+========================= INSTRUCTIONS() [TASK-4: Code Generation] ========================= 
+'''
+class Instructions:
+    __slots__ = ('name', 'opcodes', 'operands')  # Generated in bulk, one per function
+
+    def __init__(self, name):
+        # Initialize the code of one function ('main' for the program): its opcodes (see OPCODES) in a byte
+        # array and a parallel list holding the operand tuple of each instruction (array is imported here so that
+        # 'from PArL import *' does not export it)
+        from array import array
+        self.name = name
+        self.opcodes = array('B')
+        self.operands = []
+
+    def append(self, opcode, *operands):
+        self.opcodes.append(opcode)
+        self.operands.append(operands)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __iter__(self):
+        # (opcode, operands) of each instruction
+        return zip(self.opcodes, self.operands)
+
+    def text(self):
+        # Serialize the function to PArIR text, its label followed by one instruction per line
+        return f".{self.name}\n" + ''.join([opcode_formats[opcode] % operands for opcode, operands in self])
@@ -0,0 +1,257 @@
+from array import array
+
+from PArL import *
+
+'''
+========================= Peephole Optimizer ========================= 
+'''
+class PeepholeOptimizer:
+    # Rewrites short windows of generated instructions until none of its patterns applies (a fixpoint), and reports
+    # the instructions each pattern removed. While rewriting, a label push refers to the instruction it jumps to,
+    # so removing instructions needs no offset bookkeeping; a window never spans a jump target after its first
+    # instruction, so no jump lands inside a rewritten window
+    def __init__(self):
+        # Patterns: name, the opcodes a window can start with, and the method matching it
+        self.patterns = [
+            ('push 0; eq; cjmp -> not; cjmp', (PUSH_OPCODE,), self.zero_test),
+            ('not; not; cjmp -> cjmp', (NOT_OPCODE,), self.double_not),
+            ('<comparison>; not -> <inverse comparison>', (LT_OPCODE, GT_OPCODE, LE_OPCODE, GE_OPCODE), self.inverse_comparison),
+            ('st; push [i:l] -> dup; st', (PUSH_OPCODE,), self.store_load),
+            ('push 0; oframe ... cframe -> (nothing)', (PUSH_OPCODE,), self.empty_frame),
+        ]
+        self.names = {pattern: name for name, _, pattern in self.patterns}
+
+        # Patterns tried in turn at an address, indexed by the opcode there
+        self.starts = {}
+        for name, opcodes, pattern in self.patterns:
+            for opcode in opcodes:
+                self.starts.setdefault(opcode, []).append((name, pattern))
+
+        # Comparisons and the comparison of their negation
+        self.inverses = {LT_OPCODE: GE_OPCODE, GE_OPCODE: LT_OPCODE, GT_OPCODE: LE_OPCODE, LE_OPCODE: GT_OPCODE}
+
+        # Opcodes whose (index, level) operands address a frame slot
+        self.frame_opcodes = {PUSH_FRAME_OPCODE, PUSHA_OPCODE, PUSH_PLUS_OPCODE}
+
+        self.applied = {name: 0 for name, _, _ in self.patterns}
+        self.removed = {name: 0 for name, _, _ in self.patterns}
+        self.before = 0
+        self.after = 0
+        self.passes = 0  # Passes needed by the block that took the most
+
+        self.targets = {}  # id() of a jump target -> label pushes jumping to it
+        self.dropped = {}  # id() of an instruction removed ahead of the rewrite -> pattern that removed it
+
+    '''
+    ========================= program() ========================= 
+    '''
+    def program(self, code_blocks):
+        self.before = sum(len(block) for block in code_blocks)
+        for block in code_blocks:
+            self.block(block)
+        self.after = sum(len(block) for block in code_blocks)
+
+        # Print success message and the instructions removed by each pattern
+        print("\033[1;32mPeephole Optimization successful!\033[0m")
+        self.report()
+
+    def report(self):
+        print(f"  {self.before} -> {self.after} instructions ({self.passes} passes)")
+        print(f"  {'pattern':<42} {'applied':>8} {'removed':>8}")
+        for name, _, _ in self.patterns:
+            print(f"  {name:<42} {self.applied[name]:>8} {self.removed[name]:>8}")
+
+    '''
+    ========================= block() ========================= 
+    '''
+    def block(self, block):
+        # Instructions become [opcode, operands] lists, and a label push holds the instruction it jumps to
+        code = [[opcode, operands] for opcode, operands in block]
+        self.targets = {}
+        for address, instruction in enumerate(code):
+            if instruction[0] == PUSH_PC_OPCODE:
+                instruction[1] = code[address + instruction[1][0]]
+                self.targets.setdefault(id(instruction[1]), []).append(instruction)
+
+        # Rewrite the whole block until a pass changes nothing
+        changed = True
+        passes = 0
+        while changed:
+            code, changed = self.rewrite(code)
+            passes += 1
+        self.passes = max(self.passes, passes)
+
+        # Write the instructions back, label pushes with the offset of their target's new address
+        addresses = {id(instruction): address for address, instruction in enumerate(code)}
+        block.opcodes = array('B', [instruction[0] for instruction in code])
+        block.operands = [
+            (addresses[id(operands)] - address,) if opcode == PUSH_PC_OPCODE else operands
+            for address, (opcode, operands) in enumerate(code)
+        ]
+
+    def rewrite(self, code):
+        # One pass over the block, applying the first pattern that matches at each address
+        kept = []
+        moved = []  # Removed jump targets, whose jumps move to the next instruction kept
+        self.dropped = {}
+        changed = False
+
+        address = 0
+        while address < len(code):
+            instruction = code[address]
+            if id(instruction) in self.dropped:
+                self.removed[self.dropped[id(instruction)]] += 1
+                moved.append(instruction)
+                address += 1
+                continue
+
+            for name, pattern in self.starts.get(instruction[0], ()):
+                match = pattern(code, address)
+                if match is not None:
+                    break
+            else:
+                self.keep(kept, moved, instruction)
+                address += 1
+                continue
+
+            length, replacement = match
+            self.applied[name] += 1
+            self.removed[name] += length - len(replacement)
+            moved.extend(code[address:address + length])
+            for instruction in replacement:
+                self.keep(kept, moved, instruction)
+            address += length
+            changed = True
+
+        return kept, changed
+
+    def keep(self, kept, moved, instruction):
+        # Keep an instruction, moving the jumps to the removed instructions before it onto it
+        for target in moved:
+            if target is not instruction:
+                jumps = self.targets.pop(id(target), None)
+                if jumps:
+                    for jump in jumps:
+                        jump[1] = instruction
+                    self.targets.setdefault(id(instruction), []).extend(jumps)
+        moved.clear()
+        kept.append(instruction)
+
+    def window(self, code, address, opcodes):
+        # The instructions at address if they have the given opcodes and no jump lands after the first one
+        end = address + len(opcodes)
+        if end > len(code) or code[address + 1][0] != opcodes[1]:
+            return None
+        window = code[address:end]
+        for offset, (instruction, opcode) in enumerate(zip(window, opcodes)):
+            if instruction[0] != opcode or id(instruction) in self.dropped:
+                return None
+            if offset and id(instruction) in self.targets:
+                return None
+        return window
+
+    '''
+    ========================= PATTERNS ========================= 
+    '''
+    # A pattern returns None, or the length of the window it matched at address and the instructions replacing it.
+
+    def zero_test(self, code, address):
+        # Comparing a condition with 0 before a conditional jump negates it: not does the same in one instruction
+        window = self.window(code, address, (PUSH_OPCODE, EQ_OPCODE, PUSH_PC_OPCODE, CJMP_OPCODE))
+        if window and window[0][1] == (0,):
+            return 2, [[NOT_OPCODE, ()]]
+
+    def double_not(self, code, address):
+        # A conditional jump only tests its condition, so negating it twice changes nothing
+        if self.window(code, address, (NOT_OPCODE, NOT_OPCODE, PUSH_PC_OPCODE, CJMP_OPCODE)):
+            return 2, []
+
+    def inverse_comparison(self, code, address):
+        # The negation of an ordering comparison is the opposite comparison
+        inverse = self.inverses.get(code[address][0])
+        if inverse is not None and self.window(code, address, (code[address][0], NOT_OPCODE)):
+            return 2, [[inverse, ()]]
+
+    def store_load(self, code, address):
+        # Reloading the slot just stored: duplicate the value before storing it instead, once per reload, so a run
+        # of reloads is rewritten in a single pass. No jump may land on the window, not even on the store's first
+        # instruction, which the dups are placed before
+        window = self.window(code, address, (PUSH_OPCODE, PUSH_OPCODE, ST_OPCODE, PUSH_FRAME_OPCODE))
+        if not window or window[3][1] != window[0][1] + window[1][1] or id(window[0]) in self.targets:
+            return None
+        end = address + 4
+        while (end < len(code) and code[end][0] == PUSH_FRAME_OPCODE and code[end][1] == window[3][1]
+               and id(code[end]) not in self.targets and id(code[end]) not in self.dropped):
+            end += 1
+        return end - address, [[DUP_OPCODE, ()] for _ in range(end - address - 3)] + window[:3]
+
+    def empty_frame(self, code, address):
+        # A frame without variables: drop its oframe and matching cframe, and lower by one the levels of the
+        # accesses inside it that reach past it
+        window = self.window(code, address, (PUSH_OPCODE, OFRAME_OPCODE))
+        if not window or window[0][1] != (0,):
+            return None
+
+        # Find the matching cframe (depth counts the frames opened inside the empty one), and the cframe closing it
+        # in the run of cframes before each ret
+        depth = 0
+        closes = []
+        end = address + 2
+        while end < len(code):
+            opcode = code[end][0]
+            if id(code[end]) in self.dropped:
+                end += 1
+                continue
+            if opcode == OFRAME_OPCODE:
+                depth += 1
+            elif opcode == CFRAME_OPCODE:
+                run = self.return_run(code, end)
+                if run:
+                    # A return closes the frames opened inside the empty one first, then the empty one
+                    if len(run) > depth:
+                        closes.append(code[run[depth]])
+                    end = run[-1] + 1
+                    continue
+                if depth == 0:
+                    break
+                depth -= 1
+            end += 1
+        else:
+            return None
+
+        depth = 0
+        index = address + 2
+        while index < end:
+            instruction = code[index]
+            if id(instruction) in self.dropped:
+                pass
+            elif instruction[0] == OFRAME_OPCODE:
+                depth += 1
+            elif instruction[0] == CFRAME_OPCODE:
+                run = self.return_run(code, index)
+                if run:
+                    # The frames a return closes stay open for the code after it
+                    index = run[-1] + 1
+                    continue
+                depth -= 1
+            elif instruction[0] in self.frame_opcodes and instruction[1][1] > depth:
+                instruction[1] = (instruction[1][0], instruction[1][1] - 1)
+            elif instruction[0] == PUSH_OPCODE and code[index + 1][0] == ST_OPCODE and instruction[1][0] > depth:
+                # The level pushed for a store
+                instruction[1] = (instruction[1][0] - 1,)
+            index += 1
+
+        for instruction in [code[end]] + closes:
+            self.dropped[id(instruction)] = self.names[self.empty_frame]
+        return 2, []
+
+    def return_run(self, code, address):
+        # Addresses of the cframes closing the open frames before a ret, if the cframe at address starts them
+        run = []
+        while address < len(code) and code[address][0] == CFRAME_OPCODE:
+            if id(code[address]) not in self.dropped:
+                run.append(address)
+            address += 1
+        if address < len(code) and code[address][0] == RET_OPCODE:
+            return run
+        return None
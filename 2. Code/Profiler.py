@@ -0,0 +1,146 @@
+import time
+
+from PArL import *
+from Virtual_Machine import VirtualMachine
+
+'''
+========================= Profiling Machine ========================= 
+'''
+class ProfilingMachine(VirtualMachine):
+    # Virtual machine counting the instructions executed at every address, and the instructions executed under
+    # every stack of .function blocks (the main program at the bottom). From these it reports the instructions per
+    # address, per opcode and per function (self: in the function's own block, inclusive: including its callees),
+    # and writes the stacks in the collapsed format read by flame graph tools ('main;f;g 1234' per line)
+    def __init__(self, width=PAD_WIDTH, height=PAD_HEIGHT, output=print, realtime=False, snapshot=None):
+        super().__init__(width, height, output, realtime, snapshot)
+        self.lines = []  # PArIR text of every instruction
+        self.functions = {}  # Address of a .function block -> its name
+        self.counts = []  # Executions of every address
+        self.stacks = {}  # Stack of function names -> instructions executed with it on top
+
+    '''
+    ========================= LOADING ========================= 
+    '''
+    def load_blocks(self, code_blocks):
+        # Keep the text of the instructions before their operands are decoded
+        self.lines = [opcode_formats[opcode].strip() % operands for block in code_blocks for opcode, operands in block]
+        super().load_blocks(code_blocks)
+        self.functions = {address: name for name, address in self.addresses.items()}
+
+    '''
+    ========================= run() ========================= 
+    '''
+    def run(self, entry='main'):
+        # The machine's loop, counting every address executed and the instructions run under every stack
+        self.stack = []
+        self.frames = []
+        self.calls = []
+        self.pc = self.addresses[entry]
+        self.running = True
+        self.clock = 0
+        self.delays = 0
+
+        handlers = self.handlers
+        opcodes = self.opcodes
+        operands = self.operands
+        functions = self.functions
+        end = len(opcodes)
+        counts = [0] * end
+        stacks = {}
+        names = (entry,)
+        steps = 0
+        mark = 0  # Steps when the current stack was entered
+
+        start = time.perf_counter()
+        while self.running and self.pc < end:
+            pc = self.pc
+            self.pc = pc + 1
+            counts[pc] += 1
+            opcode = opcodes[pc]
+            handlers[opcode](operands[pc])
+            steps += 1
+
+            # A call is counted in its caller and a ret in its callee
+            if opcode == CALL_OPCODE:
+                stacks[names] = stacks.get(names, 0) + steps - mark
+                mark = steps
+                names = names + (functions[self.pc],)
+            elif opcode == RET_OPCODE:
+                stacks[names] = stacks.get(names, 0) + steps - mark
+                mark = steps
+                names = names[:-1]
+        stacks[names] = stacks.get(names, 0) + steps - mark
+        self.elapsed = time.perf_counter() - start
+        self.steps = steps
+        self.counts = counts
+        self.stacks = stacks
+
+    '''
+    ========================= PROFILES ========================= 
+    '''
+    def per_opcode(self):
+        # Mnemonic -> instructions executed
+        profile = {}
+        for opcode, count in zip(self.opcodes, self.counts):
+            if count:
+                mnemonic = opcode_formats[opcode].split('%')[0].strip()
+                profile[mnemonic] = profile.get(mnemonic, 0) + count
+        return profile
+
+    def per_function(self):
+        # Function -> [self instructions, inclusive instructions, calls]. A recursive function's instructions are
+        # counted once in its inclusive total, however many times it is on the stack
+        profile = {}
+        for names, count in self.stacks.items():
+            profile.setdefault(names[-1], [0, 0, 0])[0] += count
+            for name in set(names):
+                profile.setdefault(name, [0, 0, 0])[1] += count
+        for opcode, operand, count in zip(self.opcodes, self.operands, self.counts):
+            if opcode == PUSH_FUNCTION_OPCODE and count:
+                profile.setdefault(self.functions[operand], [0, 0, 0])[2] += count
+        return profile
+
+    def function_at(self, address):
+        # Name of the .function block holding an address
+        return self.functions[max(start for start in self.functions if start <= address)]
+
+    def conditions(self):
+        # Executions of the 'push 0; eq; push #PC; cjmp' condition test that if, for and while statements emit
+        executions = 0
+        for pc in range(len(self.opcodes) - 3):
+            if (self.opcodes[pc] == PUSH_OPCODE and self.operands[pc] == 0 and self.opcodes[pc + 1] == EQ_OPCODE
+                    and self.opcodes[pc + 3] == CJMP_OPCODE):
+                executions += self.counts[pc]
+        return executions
+
+    '''
+    ========================= REPORTS ========================= 
+    '''
+    def report(self, limit=10):
+        super().report()
+        total = max(self.steps, 1)
+
+        print(f"  {'function':<20} {'self':>10} {'self %':>7} {'inclusive':>10} {'incl %':>7} {'calls':>8}")
+        for name, (self_, inclusive, calls) in sorted(self.per_function().items(), key=lambda item: -item[1][0]):
+            print(f"  .{name:<19} {self_:>10} {self_ / total:>7.1%} {inclusive:>10} {inclusive / total:>7.1%} {calls:>8}")
+
+        print(f"  {'opcode':<20} {'executed':>10} {'%':>7}")
+        for mnemonic, count in sorted(self.per_opcode().items(), key=lambda item: -item[1])[:limit]:
+            print(f"  {mnemonic:<20} {count:>10} {count / total:>7.1%}")
+
+        print(f"  {'address':<20} {'executed':>10} {'%':>7}  instruction")
+        hottest = sorted(range(len(self.counts)), key=lambda pc: -self.counts[pc])[:limit]
+        for pc in hottest:
+            if self.counts[pc]:
+                where = f'.{self.function_at(pc)}+{pc - self.addresses[self.function_at(pc)]}'
+                print(f"  {where:<20} {self.counts[pc]:>10} {self.counts[pc] / total:>7.1%}  {self.lines[pc]}")
+
+        conditions = self.conditions()
+        print(f"  'push 0; eq; push #PC; cjmp' conditions: {conditions} executed, {4 * conditions} instructions ({4 * conditions / total:.1%})")
+
+    def write_collapsed(self, path):
+        # One line per stack: the function names from the main program up, and the instructions run with it on top
+        with open(path, 'w', encoding='utf-8') as f:
+            for names, count in sorted(self.stacks.items()):
+                if count:
+                    f.write(f"{';'.join(names)} {count}\n")
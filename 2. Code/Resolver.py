@@ -0,0 +1,178 @@
+from PArL import *
+
+'''
+========================= Resolver =========================
+'''
+class Resolver:
+    # Binds every identifier to its declaration once, so that later passes index frames directly.
+    # Frames follow the generated code: the program, every function, if, for, while and block opens one.
+    def __init__(self):
+        # Names visible in each scope: (depth, index) for variables, the declaration node for functions
+        self.scopes = [{}]
+        # Frames being resolved: [next free slot, number of slots needed] for each depth
+        self.frames = []
+
+        # Statement resolvers indexed by node kind
+        self.statements = {
+            VARIABLE_DECLARATION_KIND: self.variable_decl,
+            ASSIGNMENT_KIND: self.assignment,
+            PRINT_STATEMENT_KIND: self.expressions,
+            DELAY_STATEMENT_KIND: self.expressions,
+            WRITE_KIND: self.expressions,
+            WRITE_BOX_KIND: self.expressions,
+            RETURN_STATEMENT_KIND: self.expressions,
+            IF_STATEMENT_KIND: self.if_statement,
+            FOR_STATEMENT_KIND: self.for_statement,
+            WHILE_STATEMENT_KIND: self.while_statement,
+            FUNCTION_DECLARATION_KIND: self.function_decl,
+            BLOCK_KIND: self.block,
+        }
+
+    '''
+    ========================= program() =========================
+    '''
+    def program(self, program_node):
+        # Check if the program node has children
+        if not hasattr(program_node, 'children'):
+            raise ValueError("program_node does not have 'children' attribute")
+
+        self.open_frame()
+        self.statement_list(program_node.children)
+        self.close_frame(program_node)
+
+        # Print success message
+        print("\033[1;32mName Resolution successful!\033[0m")
+
+    '''
+    ========================= FRAMES & SCOPES =========================
+    '''
+    def open_frame(self):
+        self.frames.append([0, 0])
+        self.scopes.append({})
+
+    def close_frame(self, node):
+        # Record the depth and size of the frame on the node that opens it
+        node.binding = (len(self.frames) - 1, self.frames.pop()[1])
+        self.scopes.pop()
+
+    def scoped(self, statements):
+        # Resolve statements in a new scope of the current frame; its slots are reused by the following siblings
+        frame = self.frames[-1]
+        slot = frame[0]
+        self.scopes.append({})
+        self.statement_list(statements)
+        self.scopes.pop()
+        frame[0] = slot
+
+    def declare(self, identifier):
+        # Bind a declared variable to the next free slot of the current frame
+        if identifier.parameters in self.scopes[-1]:
+            raise ValueError(f"'{identifier.parameters}' already declared in the current scope")
+        frame = self.frames[-1]
+        identifier.binding = (len(self.frames) - 1, frame[0])
+        frame[0] += 1
+        frame[1] = max(frame[1], frame[0])
+        self.scopes[-1][identifier.parameters] = identifier.binding
+
+    def lookup(self, identifier):
+        # Bind an identifier to the innermost declaration of its name
+        for scope in reversed(self.scopes):
+            if identifier.parameters in scope:
+                identifier.binding = scope[identifier.parameters]
+                return identifier.binding
+        raise ValueError(f"'{identifier.parameters}' does not exist")
+
+    def variable(self, identifier):
+        if isinstance(self.lookup(identifier), AST_Node):
+            raise ValueError(f"'{identifier.parameters}' is a function, not a variable")
+
+    '''
+    ========================= STATEMENTS =========================
+    '''
+    def statement_list(self, statements):
+        # Declare the functions of the statement list first, so that they can be called before their declaration
+        for statement in statements:
+            statement = statement.unwrap()
+            if statement.kind == FUNCTION_DECLARATION_KIND:
+                identifier = statement.children[0]
+                if identifier.parameters in self.scopes[-1]:
+                    raise ValueError(f"'{identifier.parameters}' already declared in the current scope")
+                self.scopes[-1][identifier.parameters] = statement
+
+        for statement in statements:
+            statement = statement.unwrap()
+            resolve = self.statements.get(statement.kind)
+            if resolve is None:
+                raise ValueError(f"Unexpected statement: {statement.t_type}")
+            resolve(statement)
+
+    def variable_decl(self, node):
+        # The initialiser is resolved before the variable comes into scope
+        self.expression(node.children[2])
+        self.declare(node.children[0])
+
+    def assignment(self, node):
+        self.expression(node.children[1])
+        self.variable(node.children[0])
+
+    def expressions(self, node):
+        # print, delay, write, write_box and return only use expressions
+        for child in node.children:
+            self.expression(child)
+
+    def if_statement(self, node):
+        # One frame holds the variables of both branches
+        self.open_frame()
+        self.expression(node.children[0])
+        for block in node.children[1:]:
+            self.scoped(block.children)
+        self.close_frame(node)
+
+    def for_statement(self, node):
+        self.open_frame()
+        variable_decl_, condition, assignment, block = node.children
+        if variable_decl_:
+            self.variable_decl(variable_decl_)
+        self.expression(condition)
+        self.scoped(block.children)
+        if assignment:
+            self.assignment(assignment)
+        self.close_frame(node)
+
+    def while_statement(self, node):
+        self.open_frame()
+        self.expression(node.children[0])
+        self.scoped(node.children[1].children)
+        self.close_frame(node)
+
+    def block(self, node):
+        self.open_frame()
+        self.statement_list(node.children)
+        self.close_frame(node)
+
+    def function_decl(self, node):
+        # The parameters take the first slots of the function's frame
+        self.open_frame()
+        if len(node.children) == 4:
+            for parameter in node.children[1].children:
+                self.declare(parameter.children[0])
+        self.statement_list(node.children[-1].children)
+        self.close_frame(node)
+
+    '''
+    ========================= expression() =========================
+    '''
+    def expression(self, node):
+        # Walk the expression with an explicit stack, so long operator chains do not recurse
+        pending = [node]
+        while pending:
+            node = pending.pop().unwrap()
+            if node.kind == IDENTIFIER_KIND:
+                self.variable(node)
+            elif node.kind == FUNCTION_CALL_KIND:
+                if not isinstance(self.lookup(node.children[0]), AST_Node):
+                    raise ValueError(f"'{node.children[0].parameters}' is a variable, not a function")
+                if len(node.children) == 2:
+                    pending.extend(node.children[1].children)
+            else:
+                pending.extend(child for child in node.children if child is not None)
@@ -1,31 +1,34 @@
 from PArL import *
 
-'''
-========================= FLATTEN (error-fix) ========================= 
-'''
-def flatten(lst):
-    # Flattens a nested list structure
-    for item in lst:
-        if isinstance(item, list):
-            yield from flatten(item)
-        else:
-            yield item
-
 '''
 ========================= Semantic Analysis ========================= 
 '''
 class SemanticAnalysis:
     def __init__(self):
-        # Initialize stack and default values
-        self.stack = [{}]
-        self.return_ = None
-        self.defaults = {
-            'int': 0,
-            'float': 0.0,
-            'boolean': False,
-            'color': '#000000'
+        # Types of the variables in each open frame, indexed by the (depth, index) bindings of the Resolver
+        self.frames = []
+        self.return_type = None  # Return type of the function being checked (None outside functions)
+
+        # Statement checkers indexed by node kind; each returns True if the statement always returns
+        self.statements = {
+            VARIABLE_DECLARATION_KIND: self.variable_decl,
+            ASSIGNMENT_KIND: self.assignment,
+            PRINT_STATEMENT_KIND: self.print_statement,
+            DELAY_STATEMENT_KIND: self.delay_statement,
+            WRITE_KIND: self.write_statement,
+            WRITE_BOX_KIND: self.write_box_statement,
+            IF_STATEMENT_KIND: self.if_statement,
+            FOR_STATEMENT_KIND: self.for_statement,
+            WHILE_STATEMENT_KIND: self.while_statement,
+            RETURN_STATEMENT_KIND: self.return_statement,
+            FUNCTION_DECLARATION_KIND: self.function_decl,
+            BLOCK_KIND: self.block,
         }
 
+        # Binary operation nodes (their children are the left and right operands)
+        self.binary_kinds = {RELATIONAL_OP_KIND, ADDITIVE_OP_KIND, MULTIPLICATIVE_OP_KIND}
+        self.numeric = {'int', 'float'}
+
     '''
     ========================= program() ========================= 
     '''
@@ -33,14 +36,13 @@ class SemanticAnalysis:
         # Check if the program node has children
         if not hasattr(program_node, 'children'):
             raise ValueError("program_node does not have 'children' attribute")
-        
-        # Flatten the children of the program node
-        program_node.children = list(flatten(program_node.children))
-        
-        # Analyze each child node
+
+        # Check each statement once, in order (nothing is evaluated); names were bound by the Resolver
+        self.enter_frame(program_node)
         for node in program_node.children:
             self.analyse(node)
-        
+        self.frames.pop()
+
         # Print success message
         print("\033[1;32mSemantic Analysis successful!\033[0m")
 
@@ -50,343 +52,271 @@ class SemanticAnalysis:
     def analyse(self, node):
         # Check if the node is an instance of AST_Node
         if isinstance(node, AST_Node):
-            tag = '<' + node.t_type + '>'
-            # Identify the node type and call the appropriate method
-            if tag == VARIABLE_DECLARATION_TOKEN:
-                self.variable_decl(node)
-            elif tag == ASSIGNMENT_TOKEN:
-                self.assignment(node)
-            elif tag == PRINT_STATEMENT_TOKEN:
-                self.print_statement(node)
-            elif tag == DELAY_STATEMENT_TOKEN:
-                self.delay_statement(node)
-            elif tag == IF_STATEMENT_TOKEN:
-                self.if_statement(node)
-            elif tag == FOR_STATEMENT_TOKEN:
-                self.for_statement(node)
-            elif tag == WHILE_STATEMENT_TOKEN:
-                self.while_statement(node)
-            elif tag == RETURN_STATEMENT_TOKEN:
-                self.return_statement(node)
-            elif tag == FUNCTION_DECLARATION_TOKEN:
-                self.function_decl(node)
-            else:
-                # Flatten and analyze each child node
-                node.children = list(flatten(node.children))
-                for child in node.children:
-                    self.analyse(child)
+            # Identify the statement kind and call the appropriate method
+            node = node.unwrap()
+            statement = self.statements.get(node.kind)
+            if statement is None:
+                raise ValueError(f"Unexpected statement: {node.t_type}")
+            return statement(node)
         else:
             raise ValueError(f"Expected AST_Node, got {type(node)}")
 
     '''
-    ========================= stack_get ========================= 
+    ========================= enter_frame ========================= 
     '''
-    def stack_get(self, node, current_scope_only=False):
-        # Look for the variable in the current scope
-        if node.parameters in self.stack[-1]:
-            return self.stack[-1][node.parameters]
-        
-        # Look for the variable in all scopes if not restricted to current scope
-        if not current_scope_only:
-            for frame in reversed(self.stack[:-1]):
-                if node.parameters in frame:
-                    return frame[node.parameters]
-        return False
+    def enter_frame(self, node):
+        # Open the frame whose (depth, size) the Resolver recorded on the node
+        self.frames.append([None] * node.binding[1])
 
     '''
-    ========================= stack_set ========================= 
+    ========================= expect ========================= 
     '''
-    def stack_set(self, node, value):
-        # Set the variable in the current scope
-        if isinstance(value, list):
-            self.stack[-1][node.parameters] = value
-        else:
-            type_ = type(value).__name__
-            self.stack[-1][node.parameters] = [type_, value]
+    def expect(self, actual, expected, context):
+        # Check that a value of type 'actual' can be used where 'expected' is required (int widens to float)
+        if actual != expected and not (expected == 'float' and actual == 'int'):
+            raise ValueError(f"Type mismatch in {context}: expected {expected}, got {actual}")
+
+    '''
+    ========================= variable_type ========================= 
+    '''
+    def variable_type(self, identifier):
+        # Look up the type of a declared variable in its frame slot
+        depth, index = identifier.binding
+        return self.frames[depth][index]
 
     '''
     ========================= variable_decl ========================= 
     '''
     def variable_decl(self, node):
-        identifier = node.children[0]
-        type_ = node.children[1]
-        expr = node.children[2]
-        val = self.evaluate(expr)
-
-        # Check for type mismatches
-        if type_.parameters == 'int' and type(val) != int:
-            raise ValueError(f"Type mismatch: expected int, got {type(val)}")
-        elif type_.parameters == 'float' and type(val) != float:
-            if type(val) == int:
-                val = float(val)
-            else:
-                raise ValueError(f"Type mismatch: expected float, got {type(val)}")
-        elif type_.parameters == 'boolean' and type(val) != bool:
-            raise ValueError(f"Type mismatch: expected boolean, got {type(val)}")
-        elif type_.parameters == 'color' and type(val) not in [str, int]:
-            raise ValueError(f"Type mismatch: expected color, got {type(val)}")
-
-        # Check for variable re-declaration in the current scope
-        if self.stack_get(identifier, current_scope_only=True):
-            raise ValueError(f"Variable '{identifier.parameters}' already declared in the current scope")
-        else:
-            self.stack[-1][identifier.parameters] = [type_.parameters, val]
+        identifier, type_, expr = node.children
+
+        # The initialiser is checked before the variable comes into scope
+        self.expect(self.expression_type(expr), type_.parameters, f"declaration of '{identifier.parameters}'")
+        depth, index = identifier.binding
+        self.frames[depth][index] = type_.parameters
+        return False
 
     '''
     ========================= assignment ========================= 
     '''
     def assignment(self, node):
-        identifier = node.children[0]
-        expr = node.children[1]
-
-        val = self.evaluate(expr)
-
-        # Check if the variable exists before assignment
-        if not self.stack_get(identifier):
-            raise ValueError(f"Variable '{identifier.parameters}' does not exist")
-        else:
-            type_ = self.stack_get(identifier)[0]
-            # Check for type mismatches
-            if type_ == 'int' and type(val) != int:
-                raise ValueError(f"Type mismatch: expected int, got {type(val)}")
-            elif type_ == 'float' and type(val) != float:
-                if type(val) == int:
-                    val = float(val)
-                else:
-                    raise ValueError(f"Type mismatch: expected float, got {type(val)}")
-            elif type_ == 'boolean' and type(val) != bool:
-                raise ValueError(f"Type mismatch: expected boolean, got {type(val)}")
-            elif type_ == 'color' and type(val) != str:
-                raise ValueError(f"Type mismatch: expected color, got {type(val)}")
-
-            self.stack_set(identifier, val)
+        identifier, expr = node.children
+        self.expect(self.expression_type(expr), self.variable_type(identifier), f"assignment to '{identifier.parameters}'")
+        return False
 
     '''
     ========================= print_statement ========================= 
     '''
     def print_statement(self, node):
-        expr = node.children[0]
-        val = self.evaluate(expr)
-        print(val)
+        # Any type can be printed
+        self.expression_type(node.children[0])
+        return False
 
     '''
     ========================= delay_statement ========================= 
     '''
     def delay_statement(self, node):
-        expr = node.children[0]
-        val = self.evaluate(expr)
+        self.expect(self.expression_type(node.children[0]), 'int', '__delay')
+        return False
+
+    '''
+    ========================= write_statement ========================= 
+    '''
+    def write_statement(self, node):
+        # __write x, y, colour
+        for expr, type_ in zip(node.children, ('int', 'int', 'color')):
+            self.expect(self.expression_type(expr), type_, '__write')
+        return False
+
+    '''
+    ========================= write_box_statement ========================= 
+    '''
+    def write_box_statement(self, node):
+        # __write_box x, y, width, height, colour
+        for expr, type_ in zip(node.children, ('int', 'int', 'int', 'int', 'color')):
+            self.expect(self.expression_type(expr), type_, '__write_box')
+        return False
 
     '''
     ========================= if_statement ========================= 
     '''
     def if_statement(self, node):
-        condition = node.children[0]
-        condition_val = self.evaluate(condition)
+        self.expect(self.expression_type(node.children[0]), 'bool', 'if condition')
 
-        # Analyze the appropriate block based on the condition value
-        if condition_val:
-            self.analyse(node.children[1])
+        # An if statement always returns only if both of its branches do (one frame holds both)
+        self.enter_frame(node)
+        returns = self.statements_return(node.children[1].children)
+        if len(node.children) == 3:
+            returns = self.statements_return(node.children[2].children) and returns
         else:
-            if len(node.children) == 3:
-                self.analyse(node.children[2])
+            returns = False
+        self.frames.pop()
+        return returns
 
     '''
     ========================= for_statement ========================= 
     '''
     def for_statement(self, node):
-        self.stack.append({})  # Enter a new scope
+        self.enter_frame(node)  # Enter a new frame
 
-        variable_decl_ = node.children[0]
+        variable_decl_, condition, assignment, block = node.children
         if variable_decl_:
             self.variable_decl(variable_decl_)
+        self.expect(self.expression_type(condition), 'bool', 'for condition')
+        if assignment:
+            self.assignment(assignment)
+        self.statements_return(block.children)
 
-        condition = node.children[1]
-        assignment = node.children[2]
-        block = node.children[3]
-
-        # Loop while the condition is true
-        while self.evaluate(condition):
-            for statement in block.children:
-                self.analyse(statement)
-
-            if assignment:
-                self.assignment(assignment)
-
-        self.stack.pop()  # Exit the scope
-        self.return_ = None
+        self.frames.pop()  # Exit the frame
+        return False
 
     '''
     ========================= while_statement ========================= 
     '''
     def while_statement(self, node):
-        self.stack.append({})  # Enter a new scope
-
-        condition = node.children[0]
-        block = node.children[1]
-
-        # Loop while the condition is true
-        while self.evaluate(condition):
-            for statement in block.children:
-                self.analyse(statement)
+        # The condition is checked, never evaluated, so the loop body is visited once
+        self.enter_frame(node)
+        self.expect(self.expression_type(node.children[0]), 'bool', 'while condition')
+        self.statements_return(node.children[1].children)
+        self.frames.pop()
+        return False
 
-        self.stack.pop()  # Exit the scope
-        self.return_ = None
+    '''
+    ========================= block ========================= 
+    '''
+    def block(self, node):
+        self.enter_frame(node)  # Enter a new frame
+        returns = self.statements_return(node.children)
+        self.frames.pop()  # Exit the frame
+        return returns
+
+    def statements_return(self, statements):
+        # Check the statements in order; True if any of them always returns
+        returns = False
+        for statement in statements:
+            if self.analyse(statement):
+                returns = True
+        return returns
 
     '''
     ========================= return_statement ========================= 
     '''
     def return_statement(self, node):
-        expr = node.children[0]
-        val = self.evaluate(expr)
-        self.stack.pop()  # Exit the current scope
-        self.return_ = val
+        if self.return_type is None:
+            raise ValueError("Return statement outside of a function")
+        self.expect(self.expression_type(node.children[0]), self.return_type, 'return value')
+        return True
 
     '''
     ========================= function_decl ========================= 
     '''
-    def function_decl(self, node):
+    def function_parts(self, node):
+        # Split a function declaration into identifier, formal parameters, return type and block
         if len(node.children) == 4:
-            identifier = node.children[0]
-            parameters = node.children[1]
-            type_ = node.children[2]
-            block = node.children[3]
-        else:
-            identifier = node.children[0]
-            parameters = []
-            type_ = node.children[1]
-            block = node.children[2]
-
-        # Check for function re-declaration
-        if self.stack_get(identifier):
-            raise ValueError(f"Function '{identifier.parameters}' already exists")
-        else:
-            self.stack_set(identifier, [type_.parameters, parameters, block])
+            identifier, parameters, type_, block = node.children
+            return identifier, parameters.children, type_, block
+        identifier, type_, block = node.children
+        return identifier, (), type_, block
 
-        self.stack.append({})  # Enter a new function scope
+    def function_decl(self, node):
+        identifier, parameters, type_, block = self.function_parts(node)
 
-        # Add parameters to the function scope
-        for parameter in parameters.children:
-            param_identifier = parameter.children[0]
-            if self.stack_get(param_identifier, current_scope_only=True):
-                raise ValueError(f"Variable '{param_identifier.parameters}' already exists")
-            param_type_ = parameter.children[1]
-            self.stack_set(param_identifier, [param_type_.parameters, self.defaults[param_type_.parameters]])
+        self.enter_frame(node)  # Enter the function frame shared by the parameters and the body
+        for parameter in parameters:
+            depth, index = parameter.children[0].binding
+            self.frames[depth][index] = parameter.children[1].parameters
 
-        self.analyse(block)
+        outer_return_type = self.return_type
+        self.return_type = type_.parameters
+        returns = self.statements_return(block.children)
+        self.return_type = outer_return_type
 
-        if self.return_ is None:
-            raise ValueError(f"Function '{identifier.parameters}' does not have a return statement")
-        elif type(self.return_).__name__ != type_.parameters:
-            raise ValueError(f"Function '{identifier.parameters}' does not return '{type_.parameters}'")
+        if not returns:
+            raise ValueError(f"Function '{identifier.parameters}' does not return a value on every path")
 
-        self.stack.pop()  # Exit the function scope
-        self.return_ = None
+        self.frames.pop()  # Exit the function frame
+        return False
 
     '''
     ========================= function_call ========================= 
     '''
     def function_call(self, node):
-        if len(node.children) == 2:
-            identifier = node.children[0]
-            arguments = node.children[1]
-        else:
-            identifier = node.children[0]
-            arguments = []
+        identifier = node.children[0]
+        arguments = node.children[1].children if len(node.children) == 2 else ()
 
-        function = self.stack_get(identifier)
-        if not function:
-            raise ValueError(f"Function '{identifier.parameters}' does not exist")
-        else:
-            func_params = function[1].children
-            if len(arguments.children) != len(func_params):
-                raise ValueError(f"Function '{identifier.parameters}' requires {len(func_params)} arguments")
-            else:
-                self.stack.append({})  # Enter a new scope for the function call
-                for i in range(len(arguments.children)):
-                    argument = arguments.children[i]
-                    argument_type = func_params[i].children[1].parameters
-                    argument_val = self.evaluate(argument)
-                    if type(argument_val).__name__ != argument_type:
-                        raise ValueError(f"Type mismatch: expected {argument_type}, got {type(argument_val).__name__}")
-                    self.stack_set(func_params[i].children[0], [argument_type, argument_val])
-
-                for statement in function[2].children:
-                    self.analyse(statement)
-
-                self.stack.pop()  # Exit the function call scope
-
-    '''
-    ========================= evaluate() ========================= 
-    '''
-    def evaluate(self, node):
-        if node.t_type == 'function_call':
-            self.function_call(node)
-            return self.return_
-        elif node.t_type == 'identifier':
-            var = self.stack_get(node)
-            if not var:
-                raise ValueError(f"Variable '{node.parameters}' does not exist")
-            else:
-                return var[1]
-        elif node.t_type == 'integer_literal':
-            return int(node.parameters)
-        elif node.t_type == 'float_literal':
-            return float(node.parameters)
-        elif node.t_type == 'boolean_literal':
-            return True if node.parameters == 'true' else False
-        elif node.t_type == 'color_literal':
-            return node.parameters
-        elif node.t_type == 'pad_randi':
-            return 0
-        elif node.t_type == 'pad_width':
-            return 0
-        elif node.t_type == 'pad_height':
-            return 0
-        elif node.t_type == 'additive_op':
-            left = self.evaluate(node.children[0])
-            right = self.evaluate(node.children[1])
-            if node.parameters['OP'] == '+':
-                return left + right
-            elif node.parameters['OP'] == '-':
-                return left - right
-            elif node.parameters['OP'] == 'or':
-                return left or right
-        elif node.t_type == 'multiplicative_op':
-            left = self.evaluate(node.children[0])
-            right = self.evaluate(node.children[1])
-            if node.parameters['OP'] == '*':
-                return left * right
-            elif node.parameters['OP'] == '/':
-                return left / right
-            elif node.parameters['OP'] == 'and':
-                return left and right
-        elif node.t_type == 'relational_op':
-            left = self.evaluate(node.children[0])
-            right = self.evaluate(node.children[1])
-            if node.parameters['OP'] == '<':
-                return left < right
-            elif node.parameters['OP'] == '>':
-                return left > right
-            elif node.parameters['OP'] == '==':
-                return left == right
-            elif node.parameters['OP'] == '!=':
-                return left != right
-            elif node.parameters['OP'] == '<=':
-                return left <= right
-            elif node.parameters['OP'] == '>=':
-                return left >= right
-        elif node.t_type == 'write':
-            if len(node.children) != 3:
-                raise ValueError("Write instruction requires 3 arguments")
-            arg1 = self.evaluate(node.children[0])
-            arg2 = self.evaluate(node.children[1])
-            arg3 = self.evaluate(node.children[2])
-            if not isinstance(arg1, int):
-                raise ValueError("First argument to write must be an int")
-            if not isinstance(arg2, int):
-                raise ValueError("Second argument to write must be an int")
-            if not isinstance(arg3, str):
-                raise ValueError("Third argument to write must be a color (string)")
-            return
+        # The Resolver bound the identifier to the function's declaration
+        _, parameters, return_type, _ = self.function_parts(identifier.binding)
+
+        # Check the arguments against the signature; the call has the function's return type
+        if len(arguments) != len(parameters):
+            raise ValueError(f"Function '{identifier.parameters}' requires {len(parameters)} arguments")
+        for argument, parameter in zip(arguments, parameters):
+            self.expect(self.expression_type(argument), parameter.children[1].parameters, f"call to '{identifier.parameters}'")
+        return return_type.parameters
+
+    '''
+    ========================= expression_type() ========================= 
+    '''
+    def expression_type(self, node):
+        node = node.unwrap()
+
+        # Walk down the left operands of a binary chain iteratively, so long chains do not recurse
+        chain = []
+        while node.kind in self.binary_kinds:
+            chain.append(node)
+            node = node.children[0].unwrap()
+
+        type_ = self.operand_type(node)
+        for operation in reversed(chain):
+            type_ = self.binary_type(operation, type_, self.expression_type(operation.children[1]))
+        return type_
+
+    def binary_type(self, node, left, right):
+        # Result type of a binary operation on operands of the given types
+        operator = node.parameters
+        if operator in ('and', 'or'):
+            if left == right == 'bool':
+                return 'bool'
+        elif operator in ('==', '!='):
+            if left == right or (left in self.numeric and right in self.numeric):
+                return 'bool'
+        elif node.kind == RELATIONAL_OP_KIND:
+            if left in self.numeric and right in self.numeric:
+                return 'bool'
+        elif left == right and left in ('int', 'float', 'color'):
+            return left
+        elif left in self.numeric and right in self.numeric:
+            return 'float'
+        raise ValueError(f"Operator '{operator}' cannot be applied to {left} and {right}")
+
+    def operand_type(self, node):
+        # Type of a single operand (anything but a binary operation)
+        if node.kind == IDENTIFIER_KIND:
+            return self.variable_type(node)
+        elif node.kind == INTEGER_LITERAL_KIND:
+            return 'int'
+        elif node.kind == FLOAT_LITERAL_KIND:
+            return 'float'
+        elif node.kind == BOOLEAN_LITERAL_KIND:
+            return 'bool'
+        elif node.kind == COLOR_LITERAL_KIND:
+            return 'color'
+        elif node.kind == FUNCTION_CALL_KIND:
+            return self.function_call(node)
+        elif node.kind == UNARY_OPERATION_KIND:
+            operand = self.expression_type(node.children[1])
+            if node.children[0].parameters == '-':
+                if operand not in self.numeric:
+                    raise ValueError(f"Operator '-' cannot be applied to {operand}")
+                return operand
+            self.expect(operand, 'bool', "'not'")
+            return 'bool'
+        elif node.kind == PAD_RANDI_KIND and node.children:
+            self.expect(self.expression_type(node.children[0]), 'int', '__randi')
+            return 'int'
+        elif node.kind in (PAD_WIDTH_KIND, PAD_HEIGHT_KIND):
+            return 'int'
+        elif node.kind in (PAD_RANDI_KIND, PAD_READ_KIND):
+            raise ValueError(unsupported_pad_operation(node))
         else:
-            raise ValueError(f"Unexpected t_type: {node.t_type}")
\ No newline at end of file
+            raise ValueError(f"Unexpected t_type: {node.t_type}")
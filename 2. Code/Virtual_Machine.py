@@ -0,0 +1,361 @@
+import time
+import random
+import operator
+
+from PArL import *
+from Framebuffer import framebuffer
+
+'''
+========================= Virtual Machine ========================= 
+'''
+class VirtualMachine:
+    # Executes PArIR on the host. Loading decodes the program once into a flat opcode list and a parallel operand
+    # list, with every .function block at a known address, so that jumps (#PC+n) and function pushes (.name) are
+    # absolute addresses before the first instruction runs. Booleans are 1 and 0, and colours integers (0xRRGGBB)
+    def __init__(self, width=PAD_WIDTH, height=PAD_HEIGHT, output=print, realtime=False, snapshot=None):
+        # Function called with the value of every print instruction
+        self.output = output
+
+        # delay advances a virtual clock (in milliseconds) and only sleeps in real time if asked. snapshot, if
+        # given, is called with the clock and the pad at every delay, before the clock advances: the frame shown
+        # for that delay
+        self.realtime = realtime
+        self.snapshot = snapshot
+        self.clock = 0
+        self.delays = 0
+
+        # Pad (display) used by width, height, write, write_box and clear: a NumPy array if NumPy is installed
+        self.width = width
+        self.height = height
+        self.display = framebuffer(width, height)
+
+        # Loaded program
+        self.opcodes = []
+        self.operands = []
+        self.addresses = {}  # .function name -> address of its first instruction
+
+        # Execution state: the operand stack, the stack of frames, and the return address saved by every call
+        self.stack = []
+        self.frames = []
+        self.calls = []
+        self.pc = 0
+        self.running = False
+
+        # Instructions executed and time taken by the last run
+        self.steps = 0
+        self.elapsed = 0.0
+
+        # Text of the instructions, longest first so that 'push #' is tried before 'push'
+        self.mnemonics = sorted(
+            ((opcode_formats[opcode].split('%')[0].strip(), opcode) for opcode in range(len(opcode_formats))),
+            key=lambda mnemonic: len(mnemonic[0]), reverse=True,
+        )
+
+        # Instruction handlers indexed by opcode
+        self.handlers = [None] * len(opcode_formats)
+        for opcode, handler in {
+            PUSH_OPCODE: self.push, PUSH_PC_OPCODE: self.push, PUSH_FUNCTION_OPCODE: self.push,
+            PUSH_FRAME_OPCODE: self.push_frame, ST_OPCODE: self.st,
+            NOP_OPCODE: self.nop, DROP_OPCODE: self.drop, DUP_OPCODE: self.dup,
+            ADD_OPCODE: self.binary(operator.add), SUB_OPCODE: self.binary(operator.sub),
+            MUL_OPCODE: self.binary(operator.mul), DIV_OPCODE: self.div, MOD_OPCODE: self.binary(operator.mod),
+            INC_OPCODE: self.inc, DEC_OPCODE: self.dec, MAX_OPCODE: self.binary(max), MIN_OPCODE: self.binary(min),
+            IRND_OPCODE: self.irnd, NOT_OPCODE: self.not_,
+            AND_OPCODE: self.binary(lambda a, b: 1 if a and b else 0), OR_OPCODE: self.binary(lambda a, b: 1 if a or b else 0),
+            LT_OPCODE: self.comparison(operator.lt), LE_OPCODE: self.comparison(operator.le),
+            GT_OPCODE: self.comparison(operator.gt), GE_OPCODE: self.comparison(operator.ge),
+            EQ_OPCODE: self.comparison(operator.eq),
+            JMP_OPCODE: self.jmp, CJMP_OPCODE: self.cjmp, CALL_OPCODE: self.call, RET_OPCODE: self.ret,
+            HALT_OPCODE: self.halt, OFRAME_OPCODE: self.oframe, CFRAME_OPCODE: self.cframe, ALLOC_OPCODE: self.alloc,
+            DELAY_OPCODE: self.delay, WRITE_OPCODE: self.write, WRITE_BOX_OPCODE: self.write_box,
+            CLEAR_OPCODE: self.clear, WIDTH_OPCODE: self.pad_width, HEIGHT_OPCODE: self.pad_height,
+            PRINT_OPCODE: self.print_,
+            DUPA_OPCODE: self.dupa, STA_OPCODE: self.sta, PUSHA_OPCODE: self.pusha, PUSH_PLUS_OPCODE: self.push_plus,
+            PRINTA_OPCODE: self.printa, RETA_OPCODE: self.reta,
+        }.items():
+            self.handlers[opcode] = handler
+
+    '''
+    ========================= LOADING ========================= 
+    '''
+    def load(self, text):
+        # Decode PArIR text (as written to output.txt) into code blocks, then load them
+        code_blocks = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('.'):
+                code_blocks.append(Instructions(line[1:]))
+                continue
+            for mnemonic, opcode in self.mnemonics:
+                if line.startswith(mnemonic):
+                    break
+            else:
+                raise ValueError(f"Unknown instruction: {line}")
+            code_blocks[-1].append(opcode, *self.decode_operands(opcode, line[len(mnemonic):].strip()))
+        self.load_blocks(code_blocks)
+
+    def decode_operands(self, opcode, text):
+        # Operand tuple of an instruction, as the code generator builds it
+        if opcode == PUSH_OPCODE:
+            if text.startswith('#') or text in ('True', 'False'):
+                return (text,)
+            try:
+                return (int(text),)
+            except ValueError:
+                return (float(text),)
+        elif opcode == PUSH_PC_OPCODE:
+            return (int(text),)  # '+4' of 'push #PC+4'
+        elif opcode == PUSH_FUNCTION_OPCODE:
+            return (text,)
+        elif opcode in (PUSH_FRAME_OPCODE, PUSHA_OPCODE, PUSH_PLUS_OPCODE):
+            return tuple(int(number) for number in text.strip('+[]').split(':'))
+        return ()
+
+    def load_blocks(self, code_blocks):
+        # Lay the blocks out one after the other, then resolve labels to absolute addresses
+        self.opcodes = []
+        self.operands = []
+        self.addresses = {}
+        for block in code_blocks:
+            if block.name in self.addresses:
+                raise ValueError(f"Duplicate function: .{block.name}")
+            self.addresses[block.name] = len(self.opcodes)
+            self.opcodes.extend(block.opcodes)
+            self.operands.extend(block.operands)
+
+        # Pre-decode every operand tuple into the single value its handler uses
+        for address, (opcode, operands) in enumerate(zip(self.opcodes, self.operands)):
+            if opcode == PUSH_PC_OPCODE:
+                operand = address + operands[0]
+            elif opcode == PUSH_FUNCTION_OPCODE:
+                if operands[0] not in self.addresses:
+                    raise ValueError(f"Unknown function: .{operands[0]}")
+                operand = self.addresses[operands[0]]
+            elif opcode == PUSH_OPCODE:
+                operand = self.value(operands[0])
+            elif opcode in (PUSH_FRAME_OPCODE, PUSHA_OPCODE, PUSH_PLUS_OPCODE):
+                operand = operands
+            else:
+                operand = None
+            self.operands[address] = operand
+
+    def value(self, operand):
+        # Value pushed by 'push': colours become integers, booleans 1 and 0
+        if isinstance(operand, str):
+            if operand.startswith('#'):
+                return int(operand[1:], 16)
+            return 1 if operand == 'True' else 0
+        return operand
+
+    '''
+    ========================= run() ========================= 
+    '''
+    def run(self, entry='main'):
+        # Execute from the entry block until halt (or the end of the program)
+        self.stack = []
+        self.frames = []
+        self.calls = []
+        self.pc = self.addresses[entry]
+        self.running = True
+        self.clock = 0
+        self.delays = 0
+
+        handlers = self.handlers
+        opcodes = self.opcodes
+        operands = self.operands
+        end = len(opcodes)
+        steps = 0
+
+        start = time.perf_counter()
+        while self.running and self.pc < end:
+            pc = self.pc
+            self.pc = pc + 1
+            handlers[opcodes[pc]](operands[pc])
+            steps += 1
+        self.elapsed = time.perf_counter() - start
+        self.steps = steps
+
+    def report(self):
+        print("\033[1;32mPArIR execution successful!\033[0m")
+        print(f"  {self.delays} delays, {self.clock / 1000:.3f} s of virtual time")
+        print(f"  {self.steps} instructions in {self.elapsed:.3f} s ({self.steps / max(self.elapsed, 1e-9):,.0f} instructions/s)")
+
+    '''
+    ========================= STACK & FRAMES ========================= 
+    '''
+    # A frame is addressed by its level: 0 is the current (innermost) frame, 1 the one below it, ...
+
+    def push(self, operand):
+        self.stack.append(operand)
+
+    def push_frame(self, operand):
+        index, level = operand
+        self.stack.append(self.frames[-1 - level][index])
+
+    def st(self, operand):
+        # Pops the level, the index and the value to store
+        stack = self.stack
+        level = stack.pop()
+        index = stack.pop()
+        self.frames[-1 - level][index] = stack.pop()
+
+    def nop(self, operand):
+        pass
+
+    def drop(self, operand):
+        self.stack.pop()
+
+    def dup(self, operand):
+        self.stack.append(self.stack[-1])
+
+    def oframe(self, operand):
+        self.frames.append([0] * self.stack.pop())
+
+    def cframe(self, operand):
+        self.frames.pop()
+
+    def alloc(self, operand):
+        # Grow the current frame by the popped number of slots
+        self.frames[-1].extend([0] * self.stack.pop())
+
+    '''
+    ========================= ARITHMETIC & LOGIC ========================= 
+    '''
+    # The code generator pushes the right operand first, so the left operand is on top of the stack
+
+    def binary(self, function):
+        def handler(operand):
+            stack = self.stack
+            left = stack.pop()
+            stack.append(function(left, stack.pop()))
+        return handler
+
+    def comparison(self, function):
+        def handler(operand):
+            stack = self.stack
+            left = stack.pop()
+            stack.append(1 if function(left, stack.pop()) else 0)
+        return handler
+
+    def div(self, operand):
+        # Integer operands use integer division, as in the interpreter
+        stack = self.stack
+        left = stack.pop()
+        right = stack.pop()
+        stack.append(integer_division(left, right) if type(left) == type(right) == int else left / right)
+
+    def inc(self, operand):
+        self.stack[-1] += 1
+
+    def dec(self, operand):
+        self.stack[-1] -= 1
+
+    def not_(self, operand):
+        self.stack[-1] = 1 if self.stack[-1] == 0 else 0
+
+    def irnd(self, operand):
+        self.stack.append(random.randrange(self.stack.pop()))
+
+    '''
+    ========================= CONTROL FLOW ========================= 
+    '''
+    def jmp(self, operand):
+        self.pc = self.stack.pop()
+
+    def cjmp(self, operand):
+        # Pops the target, then jumps to it if the condition below it is true
+        stack = self.stack
+        target = stack.pop()
+        if stack.pop():
+            self.pc = target
+
+    def call(self, operand):
+        # Pops the function and the argument count, and opens a frame holding the arguments (first on top)
+        stack = self.stack
+        function = stack.pop()
+        count = stack.pop()
+        frame = [stack.pop() for _ in range(count)]
+        self.calls.append(self.pc)
+        self.frames.append(frame)
+        self.pc = function
+
+    def ret(self, operand):
+        # Close the function's frame (the code closes the frames opened inside it); the return value stays on the stack
+        self.pc = self.calls.pop()
+        self.frames.pop()
+
+    def halt(self, operand):
+        self.running = False
+
+    '''
+    ========================= PAD & OUTPUT ========================= 
+    '''
+    def delay(self, operand):
+        # Advance the virtual clock by the popped number of milliseconds, sleeping only in real time
+        milliseconds = max(self.stack.pop(), 0)
+        if self.snapshot is not None:
+            self.snapshot(self.clock, self.display)
+        self.clock += milliseconds
+        self.delays += 1
+        if self.realtime:
+            time.sleep(milliseconds / 1000)
+
+    def write(self, operand):
+        stack = self.stack
+        self.display.write(stack.pop(), stack.pop(), stack.pop())
+
+    def write_box(self, operand):
+        stack = self.stack
+        self.display.write_box(stack.pop(), stack.pop(), stack.pop(), stack.pop(), stack.pop())
+
+    def clear(self, operand):
+        self.display.clear(self.stack.pop())
+
+    def pad_width(self, operand):
+        self.stack.append(self.width)
+
+    def pad_height(self, operand):
+        self.stack.append(self.height)
+
+    def print_(self, operand):
+        self.output(self.stack.pop())
+
+    '''
+    ========================= ARRAYS [TASK-5] ========================= 
+    '''
+    def dupa(self, operand):
+        # Pops the value and the count, and pushes the value count times
+        stack = self.stack
+        value = stack.pop()
+        stack.extend([value] * stack.pop())
+
+    def sta(self, operand):
+        # Pops the level, the index and the count, then stores that many popped values from the index on
+        stack = self.stack
+        level, index, count = stack.pop(), stack.pop(), stack.pop()
+        frame = self.frames[-1 - level]
+        for offset in range(count):
+            frame[index + offset] = stack.pop()
+
+    def pusha(self, operand):
+        # Pops the count and pushes that many values from the slot on, the first one on top
+        index, level = operand
+        count = self.stack.pop()
+        self.stack.extend(reversed(self.frames[-1 - level][index:index + count]))
+
+    def push_plus(self, operand):
+        index, level = operand
+        self.stack.append(self.frames[-1 - level][index + self.stack.pop()])
+
+    def printa(self, operand):
+        stack = self.stack
+        for _ in range(stack.pop()):
+            self.output(stack.pop())
+
+    def reta(self, operand):
+        # Pops the count and that many values, and pushes them back in reverse order
+        stack = self.stack
+        values = [stack.pop() for _ in range(stack.pop())]
+        stack.extend(values)
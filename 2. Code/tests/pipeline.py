@@ -0,0 +1,74 @@
+import io
+import contextlib
+
+from PArL import *
+from Lexer import Lexer
+from Parser import Parser
+from Resolver import Resolver
+from Semantic_Analysis import SemanticAnalysis
+from Constant_Folding import ConstantFolder
+from Dead_Code import DeadCodeEliminator
+from Code_Generation import CodeGenerator
+from Peephole import PeepholeOptimizer
+from Interpreter import Interpreter
+from Closure_Compilation import ClosureCompiler
+from Virtual_Machine import VirtualMachine
+
+# The compiler stages of Main.py, without their success messages
+
+def parse(source):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Parser().parse(TokenStream(Lexer().iter_tokens(io.StringIO(source))))
+
+def check(source):
+    # Parse, resolve and analyse a program, returning its AST
+    ast = parse(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        Resolver().program(ast)
+        SemanticAnalysis().program(ast)
+    return ast
+
+def interpret(source, engine=Interpreter):
+    # Printed values and pad of a program run by the interpreter (or the closure compiler)
+    values = []
+    interpreter = engine(output=values.append)
+    interpreter.run(check(source))
+    pixels = [interpreter.pixels[y * interpreter.width:(y + 1) * interpreter.width] for y in range(interpreter.height)]
+    return values, pixels
+
+def generate(source, fold=False, dce=False, optimize=False):
+    # PArIR of a program, as generated by Main.py with the given passes
+    ast = check(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if fold:
+            ConstantFolder().program(ast)
+        if dce:
+            DeadCodeEliminator().program(ast)
+        code_generator = CodeGenerator()
+        code_generator.program(ast)
+        if optimize:
+            PeepholeOptimizer().program(code_generator.code_blocks)
+            code_generator.serialize()
+    return code_generator.code
+
+def execute(source, fold=False, dce=False, optimize=False):
+    # Printed values and pad of a program run by the virtual machine
+    values = []
+    machine = VirtualMachine(output=values.append)
+    machine.load(generate(source, fold, dce, optimize))
+    machine.run()
+    return values, machine.display.rows()
+
+# Engines by option name: --run and --run-closures interpret the checked tree, the others run the generated
+# PArIR on the virtual machine after the passes given
+ENGINES = {
+    '--run': lambda source: interpret(source),
+    '--run-closures': lambda source: interpret(source, ClosureCompiler),
+    '--vm': lambda source: execute(source),
+    '--vm (folded)': lambda source: execute(source, fold=True),
+    '--vm -O --dce': lambda source: execute(source, fold=True, dce=True, optimize=True),
+}
+
+def run(source, engine):
+    # Printed values and pad of a program run by an engine of ENGINES
+    return ENGINES[engine](source)
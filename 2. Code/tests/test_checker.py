@@ -0,0 +1,58 @@
+import pytest
+
+from PArL import *
+from pipeline import check
+
+@pytest.mark.parametrize('source, message', [
+    ('__print x;', "'x' does not exist"),
+    ('let x:int = 1; let x:int = 2;', "'x' already declared in the current scope"),
+    ('fun f(a:int, a:int) -> int { return a; }', "'a' already declared in the current scope"),
+    ('fun f() -> int { return 1; } __print f + 1;', "'f' is a function, not a variable"),
+    ('let f:int = 1; __print f(2);', "'f' is a variable, not a function"),
+    ('{ let x:int = 1; } __print x;', "'x' does not exist"),
+])
+def test_name_resolution_errors(source, message):
+    with pytest.raises(ValueError, match=message):
+        check(source)
+
+def test_bindings():
+    # Identifiers are bound to the (depth, index) of their frame slot, and frames to their (depth, size)
+    ast = check('let a:int = 1; if (a > 0) { let b:int = a; let c:int = b; } else { let d:int = 2; } let e:int = a;')
+    a, if_, e = [statement.unwrap() for statement in ast.children]
+    assert ast.binding == (0, 2)
+    assert a.children[0].binding == (0, 0) and e.children[0].binding == (0, 1)
+    # The branches of the if statement share its frame, each reusing the slots of the other
+    assert if_.binding == (1, 2)
+    then, otherwise = if_.children[1], if_.children[2]
+    assert [statement.unwrap().children[0].binding for statement in then.children] == [(1, 0), (1, 1)]
+    assert otherwise.children[0].unwrap().children[0].binding == (1, 0)
+    assert then.children[0].unwrap().children[2].unwrap().binding is a.children[0].binding
+
+@pytest.mark.parametrize('source, message', [
+    ('let x:int = 1.5;', 'Type mismatch in .*: expected int, got float'),
+    ('let b:bool = 1 + True;', "Operator '\\+' cannot be applied to int and bool"),
+    ('if (1) { __print 1; }', 'Type mismatch in .*: expected bool, got int'),
+    ('fun f(a:int) -> int { return a; } __print f(1, 2);', "Function 'f' requires 1 arguments"),
+    ('fun f(a:int) -> int { if (a > 0) { return a; } }', "Function 'f' does not return a value on every path"),
+    ('fun f(a:float) -> int { return a; }', 'Type mismatch in .*: expected int, got float'),
+    ('return 1;', 'Return statement outside of a function'),
+])
+def test_type_errors(source, message):
+    with pytest.raises(ValueError, match=message):
+        check(source)
+
+@pytest.mark.parametrize('source, message', [
+    ('let c:color = __read;', "'__read' is not supported"),
+    ('let x:int = 1 + __randi;', "'__randi' needs the upper bound"),
+])
+def test_unsupported_pad_operations(source, message):
+    # Rejected by the checker rather than evaluated to 0 by --run
+    with pytest.raises(ValueError, match=message):
+        check(source)
+
+def test_int_widens_to_float():
+    check('fun avg(a:float, b:float) -> float { return (a + b) / 2; } let f:float = 3; f = avg(1, 2);')
+
+def test_loops_are_checked_once():
+    # The checker does not run the program, so an endless loop or a long delay is checked at once
+    check('while (True) { __delay 100000; }')
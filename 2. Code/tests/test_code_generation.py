@@ -0,0 +1,68 @@
+import re
+
+from PArL import *
+from Virtual_Machine import VirtualMachine
+from pipeline import generate
+
+SOURCE = 'let i:int = 0; while (i < 3) { if (i == 1) { __print i; } i = i + 1; }'
+
+def jumps(code):
+    # (instruction, target) of every 'push #PC+n' in a block of PArIR, counting the lines after its label
+    lines = code.splitlines()[1:]
+    return lines, [(lines[index + 1], index + int(match.group(1))) for index, line in enumerate(lines)
+                   for match in [re.fullmatch(r'push #PC([+-]\d+)', line)] if match]
+
+def test_labels_are_linked():
+    lines, targets = jumps(generate(SOURCE))
+    assert [instruction for instruction, _ in targets] == ['cjmp', 'cjmp', 'jmp']
+    # The loop exits to the cframe closing its frame, the if skips its body, and the loop jumps back to its condition
+    assert lines[targets[0][1]] == 'cframe' and lines[targets[0][1] + 1] == 'halt'
+    assert lines[targets[1][1] - 1] == 'print' and lines[targets[1][1]] == 'cframe'
+    assert lines[targets[2][1]:targets[2][1] + 3] == ['push 3', 'push [0:1]', 'lt']
+
+def test_instructions_are_formatted_once():
+    block = Instructions('f')
+    block.append(PUSH_OPCODE, 3)
+    block.append(PUSH_FRAME_OPCODE, 1, 2)
+    block.append(PUSH_PC_OPCODE, -4)
+    block.append(PUSH_FUNCTION_OPCODE, 'g')
+    block.append(RET_OPCODE)
+    assert block.text() == '.f\npush 3\npush [1:2]\npush #PC-4\npush .g\nret\n'
+
+def test_star_import_does_not_export_array():
+    namespace = {}
+    exec('from PArL import *', namespace)
+    assert 'array' not in namespace and 'Instructions' in namespace
+
+def test_text_decodes_to_the_same_instructions():
+    # The virtual machine decodes the serialized text back to the generated opcodes and operands
+    source = 'fun f(a:float) -> float { return a * 1.5; } let c:color = #00FF00; __print f(2); __print c;'
+    code = generate(source)
+    machine = VirtualMachine()
+    blocks = []
+    machine.load_blocks = blocks.extend
+    machine.load(code)
+    assert ''.join(block.text() for block in blocks) == code
+
+def test_functions_allocate_only_their_locals():
+    # call opens the frame with the arguments, so alloc adds the body's variables alone
+    code = generate('fun f(a:int, b:int) -> int { let c:int = a + b; return c; } fun g(a:int) -> int { return a; } __print f(1, g(2));')
+    assert code.startswith('.f\npush 1\nalloc\n')
+    assert '.g\npush [0:0]\nret\n' in code
+
+def test_returns_close_the_frames_opened_in_the_function():
+    code = generate('fun f(a:int) -> int { if (a > 0) { while (a > 0) { return a; } } return 0; } __print f(1);')
+    assert 'push [0:2]\ncframe\ncframe\nret\n' in code and 'push 0\nret\n' in code
+
+def test_function_blocks_have_unique_names():
+    code = generate('fun main() -> int { return 1; } fun Main() -> int { return 2; } { fun main() -> int { return 3; } } __print main();')
+    assert [line for line in code.splitlines() if line.startswith('.')] == ['.main_2', '.main_3', '.main_4', '.main']
+
+def test_outer_variables_are_hidden_parameters():
+    # g is passed after the parameter x, the local y follows it, and g's value is pushed after the return value
+    # for the caller to store back, at the level of the program frame seen from the caller's block
+    code = generate('let g:int = 5; fun bump(x:int) -> int { let y:int = x; g = g + y; return g; } { __print bump(1); }')
+    bump, main = code.split('.main\n')
+    assert 'push [0:0]\npush 2\npush 0\nst\n' in bump and 'push 1\npush 0\nst\n' in bump
+    assert bump.endswith('push [1:0]\npush [1:0]\nret\n')
+    assert 'push [0:1]\npush 1\npush 2\npush .bump\ncall\npush 0\npush 1\nst\nprint\n' in main
@@ -0,0 +1,154 @@
+import pytest
+
+from pipeline import ENGINES, run
+
+# Programs run by every engine, with the values they print
+PROGRAMS = {
+    'arithmetic': ('''
+        let a:int = 7;
+        let b:float = 2.5;
+        __print a / 2;
+        __print a * b - -1;
+        __print (a + 3) / 4 * 2;
+        __print (a >= 7) and not (b > 3.0);
+        __print (a != 7) or False;
+    ''', [3, 18.5, 4, 1, 0]),
+    # Integer division rounds toward zero, with constant and with variable operands
+    'negative division': ('''
+        let a:int = -7;
+        let b:int = 2;
+        __print a / b;
+        __print -7 / 2;
+        __print 7 / -b;
+        __print -7 / -2;
+        __print -8 / b;
+        __print a / 2.0;
+    ''', [-3, -3, -3, 3, -4, -3.5]),
+    'control flow': ('''
+        let total:int = 0;
+        for (let i:int = 0; i < 5; i = i + 1) {
+            if (i == 2) { total = total + 10; } else { total = total + i; }
+        }
+        let n:int = 3;
+        while (n > 0) { { let twice:int = n * 2; __print twice; } n = n - 1; }
+        __print total;
+    ''', [6, 4, 2, 18]),
+    'recursion': ('''
+        fun fib(n:int) -> int { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+        fun fact(n:int) -> int { if (n == 0) { return 1; } return n * fact(n - 1); }
+        __print fib(10);
+        __print fact(6);
+    ''', [55, 720]),
+    # Ints stored, passed or returned into float slots are widened, so / divides them as floats
+    'float parameters': ('''
+        fun avg(a:float, b:float) -> float { return (a + b) / 2; }
+        fun half(a:int) -> float { return a; }
+        __print avg(1, 2);
+        let f:float = 3;
+        __print f / 2;
+        f = 7;
+        __print f / 2;
+        __print half(5) / 2;
+        for (let k:float = 1; k < 2; k = k + 1) { __print k / 4; }
+    ''', [1.5, 1.5, 3.5, 2.5, 0.25]),
+    # Functions called with frames of the program, of blocks and of loops open below their own
+    'calls in nested frames': ('''
+        fun f(x:int) -> int { let y:int = x * 2; { let z:int = y + 1; return z; } }
+        fun count(n:int) -> int { let c:int = 0; while (n > 0) { c = c + f(n); n = n - 1; } return c; }
+        let g:int = 5;
+        if (g > 1) { let y:int = 3; { __print f(y + g); } }
+        for (let i:int = 0; i < 2; i = i + 1) { while (g > 4) { __print count(i + 2); g = g - 1; } }
+        __print g;
+    ''', [17, 8, 4]),
+    # Returns from inside if, while, for and block frames, which close those frames before ret
+    'returns from nested frames': ('''
+        fun find(n:int) -> int {
+            let i:int = 0;
+            while (i < 10) { if (i * i >= n) { { let r:int = i; return r; } } i = i + 1; }
+            for (let j:int = 0; j < 1; j = j + 1) { return -1; }
+            return -2;
+        }
+        let total:int = 0;
+        for (let k:int = 0; k < 50; k = k + 1) { { if (k > 0) { total = total + find(k); } } }
+        __print find(50);
+        __print find(200);
+        __print total;
+    ''', [8, -1, 252]),
+    # Functions of the same name in different blocks, names differing in case, and a function called main
+    'functions of the same name': ('''
+        { fun f() -> int { return 1; } __print f(); }
+        { fun f() -> int { return 2; } { fun f() -> int { return 3; } __print f(); } __print f(); }
+        fun F() -> int { return 4; }
+        fun f_2() -> int { return 5; }
+        fun main() -> int { return F() + f_2(); }
+        __print main();
+    ''', [1, 3, 2, 9]),
+    # Functions reading and assigning variables of the program, of blocks and of enclosing functions, directly or
+    # through the functions they call, from inside frames opened by their callers
+    'outer variables': ('''
+        let g:int = 5;
+        let fl:float = 1.5;
+        fun f(x:int) -> int { return g + x; }
+        fun bump() -> int { g = g + 1; return g; }
+        fun twice() -> int { let a:int = bump(); return a + bump(); }
+        fun addf() -> float { fl = fl + 1; return fl; }
+        if (g > 1) { let y:int = 3; { __print f(y); } }
+        { __print bump(); }
+        while (g < 7) { __print twice(); }
+        __print g;
+        __print addf() / 2;
+        {
+            let b:int = 10;
+            fun h(n:int) -> int { if (n == 0) { return b; } b = b + n; return h(n - 1); }
+            while (b < 20) { __print h(3); }
+            __print b;
+        }
+        fun outer(a:int) -> int {
+            fun inner(k:int) -> int { a = a + k; return a; }
+            let s:int = inner(1);
+            { s = s + inner(2); }
+            return s + a;
+        }
+        __print outer(10);
+    ''', [8, 6, 15, 8, 1.25, 16, 22, 22, 37]),
+    # Names bound by the Resolver: shadowed names, and sibling scopes reusing slots
+    'shadowing': ('''
+        let x:int = 1;
+        fun f(x:int) -> int { let y:int = x * 10; { let x:int = y + 1; return x; } }
+        { let x:float = 2.5; { __print x; } if (x > 2.0) { let x:int = 3; __print x; } else { let y:bool = True; } }
+        if (x == 1) { let a:int = 4; __print a; } else { let b:int = 5; __print b; }
+        if (x == 2) { let a:int = 4; __print a; } else { let b:int = 5; __print b; }
+        __print f(x + 1);
+        __print x;
+    ''', [2.5, 3, 4, 5, 21, 1]),
+    'pad': ('''
+        let c:color = #00FF00;
+        __write_box 1, 2, 3, 4, c;
+        __write __width - 1, __height - 1, #FF0000;
+        __write_box __width - 2, 0, 5, 2, #0000FF;
+        __write -1, 0, #000000;
+        __print c;
+        __print __width * __height;
+    ''', [0x00FF00, 36 * 36]),
+}
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('name', PROGRAMS)
+def test_engines_agree(name, engine):
+    source, expected = PROGRAMS[name]
+    values, pixels = run(source, engine)
+    assert values == expected
+    assert pixels == run(source, '--run')[1]
+
+@pytest.mark.parametrize('engine', ['--run', '--vm'])
+def test_pad_is_written(engine):
+    _, pixels = run(PROGRAMS['pad'][0], engine)
+    assert pixels[2][1] == pixels[5][3] == 0x00FF00
+    assert pixels[35][35] == 0xFF0000
+    assert pixels[0][34] == pixels[1][35] == 0x0000FF
+    assert sum(colour != 0xFFFFFF for row in pixels for colour in row) == 12 + 1 + 4
+
+@pytest.mark.parametrize('engine', ['--run', '--run-closures'])
+def test_long_chains_run_without_recursion(engine):
+    source = 'let a:int = 2; __print ' + ' + '.join(['a'] * 5000) + ' - (' + ' * '.join(['1'] * 3000) + ') < a * 5000;'
+    assert run(source, engine)[0] == [1]
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from PArL import *
+from Frame_Export import FrameExporter, read_frames
+from Virtual_Machine import VirtualMachine
+from pipeline import generate
+
+SOURCE = '''
+for (let i:int = 0; i < 3; i = i + 1) { __write_box i * 2, i, 2, 1, #FF0000; __delay 40; __delay 40; }
+__write 35, 35, #0000FF;
+'''
+
+def export(directory, stills=None):
+    # Run SOURCE with a frame exporter, returning it and the final pad
+    exporter = FrameExporter(str(directory), PAD_WIDTH, PAD_HEIGHT, stills)
+    machine = VirtualMachine(snapshot=exporter)
+    machine.load(generate(SOURCE))
+    machine.run()
+    exporter.close(machine.clock, machine.display)
+    return exporter, machine.display.rows()
+
+def test_frame_log_replays_the_run(tmp_path):
+    exporter, pad = export(tmp_path)
+    frames = list(read_frames(os.path.join(tmp_path, 'frames.log')))
+    # Repeated delays show an unchanged pad, so only the first of each pair is written, then the final pad
+    assert exporter.frames == 7 and exporter.written == len(frames) == 4
+    assert [clock for clock, _ in frames] == [0, 80, 160, 240]
+    assert frames[-1][1] == pad
+    assert frames[1][1][1][2:4] == [0xFF0000, 0xFF0000] and frames[0][1][1][2] == 0xFFFFFF
+    # Only the first frame (the cleared pad) is written whole
+    assert exporter.pixels == PAD_WIDTH * PAD_HEIGHT + 2 + 2 + 1
+
+def test_frame_log_is_little_endian(tmp_path):
+    export(tmp_path)
+    with open(os.path.join(tmp_path, 'frames.log'), 'rb') as f:
+        log = f.read()
+    # The header, the first frame's header, then its first pixel: the red box drawn at 0, 0
+    assert log[4:8] == PAD_WIDTH.to_bytes(2, 'little') + PAD_HEIGHT.to_bytes(2, 'little')
+    assert log[20:24] == (0xFF0000).to_bytes(4, 'little')
+
+@pytest.mark.parametrize('stills, signature', [('ppm', b'P6\n36 36\n255\n'), ('png', b'\x89PNG\r\n\x1a\n')])
+def test_stills(tmp_path, stills, signature):
+    export(tmp_path, stills)
+    with open(os.path.join(tmp_path, f'frame00001.{stills}'), 'rb') as f:
+        assert f.read(len(signature)) == signature
+    assert len(os.listdir(tmp_path)) == 1 + 4
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from Framebuffer import Framebuffer, NumpyFramebuffer
+from Frame_Export import FrameExporter, read_frames
+
+RED, BLUE, WHITE = 0xFF0000, 0x0000FF, 0xFFFFFF
+
+@pytest.fixture(params=['lists', 'numpy'])
+def backend(request):
+    # Every framebuffer class, NumPy's only where NumPy is installed
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        return NumpyFramebuffer
+    return Framebuffer
+
+def draw(display):
+    # A pixel, pixels off the pad and a box clipped at its bottom right corner
+    display.write(2, 3, RED)
+    display.write(-1, 0, RED)
+    display.write(8, 0, RED)
+    display.write_box(6, 4, 5, 5, BLUE)
+
+def test_pixels_and_boxes(backend):
+    display = backend(8, 6)
+    draw(display)
+    assert (display.pixel(2, 3), display.pixel(0, 0), display.pixel(7, 5), display.pixel(5, 4)) == (RED, 0, BLUE, 0)
+    assert display.region(4, 6, 6, 8) == [[BLUE, BLUE], [BLUE, BLUE]]
+    rows = display.rows()
+    assert sum(colour != 0 for row in rows for colour in row) == 1 + 4
+    assert all(type(colour) is int for row in rows for colour in row)
+    # The dirty rectangle covers both writes on the pad, and is empty once taken
+    assert display.take_dirty() == (3, 6, 2, 8)
+    assert display.take_dirty() is None
+
+def test_clear(backend):
+    display = backend(8, 6)
+    draw(display)
+    display.take_dirty()
+    display.clear(WHITE)
+    assert display.rows() == [[WHITE] * 8 for _ in range(6)]
+    assert display.take_dirty() == (0, 6, 0, 8)
+
+def test_export(backend, tmp_path):
+    display = backend(8, 6)
+    exporter = FrameExporter(str(tmp_path), 8, 6, 'ppm')
+    display.clear(WHITE)
+    exporter(0, display)
+    draw(display)
+    exporter.close(16, display)
+
+    frames = list(read_frames(os.path.join(tmp_path, 'frames.log')))
+    assert [clock for clock, _ in frames] == [0, 16]
+    assert frames[-1][1] == display.rows()
+    with open(os.path.join(tmp_path, 'frame00002.ppm'), 'rb') as f:
+        rgb = f.read()[len(b'P6\n8 6\n255\n'):]
+    assert rgb[(3 * 8 + 2) * 3:(3 * 8 + 3) * 3] == b'\xff\x00\x00'
+    assert rgb[(5 * 8 + 7) * 3:] == b'\x00\x00\xff'
@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from PArL import *
+from Lexer import Lexer
+
+SOURCE = '''// A comment
+let x:float = 1.5; /* a comment
+spanning lines */ __write_box 0, 0, __width, __height, #FF00AA;
+if (x >= 2) { __print not True; }
+'''
+
+def tokenize(source):
+    return Lexer().tokenize(source)
+
+def test_kinds_and_values():
+    tokens = tokenize('let x:int = 12 + 3.25;')
+    assert [token.t_type for token in tokens] == [
+        '<let>', '<identifier>', '<colon>', '<type>', '<equals>', '<integer_literal>', '<additive_op>',
+        '<float_literal>', '<semicolon>',
+    ]
+    assert [token.value for token in tokens] == ['let', 'x', ':', 'int', '=', '12', '+', '3.25', ';']
+
+def test_comments_are_skipped():
+    tokens = tokenize(SOURCE)
+    assert [token.value for token in tokens[:3]] == ['let', 'x', ':']
+    assert [token.value for token in tokens[6:8]] == [';', '__write_box']
+
+def test_positions():
+    tokens = tokenize(SOURCE)
+    assert (tokens[0].line, tokens[0].column) == (2, 1)
+    write_box = next(token for token in tokens if token.value == '__write_box')
+    assert (write_box.line, write_box.column) == (3, 19)
+    assert (tokens[-1].line, tokens[-1].column) == (4, 33)
+
+def test_tokens_have_no_dict():
+    token = tokenize('x')[0]
+    assert not hasattr(token, '__dict__')
+    assert (token.kind, token.value, token.line, token.column) == (IDENTIFIER_KIND, 'x', 1, 1)
+
+def test_keywords_and_identifiers():
+    # Whole words are looked up as terminals, so a keyword prefix does not end an identifier
+    tokens = tokenize('letter let True Truth __width and android int integer')
+    assert [token.t_type for token in tokens] == [
+        '<identifier>', '<let>', '<boolean_literal>', '<identifier>', '<pad_width>', '<multiplicative_op>',
+        '<identifier>', '<type>', '<identifier>',
+    ]
+    assert Lexer().match('while').kind == WHILE_KIND
+    assert Lexer().match('whilst') is None
+
+def test_colour_literal():
+    tokens = tokenize('#FF00AA')
+    assert [(token.kind, token.value) for token in tokens] == [(COLOR_LITERAL_KIND, '#FF00AA')]
+
+def test_two_character_operators():
+    tokens = tokenize('a<=b==c!=d>=e->f')
+    assert [token.value for token in tokens if token.kind != IDENTIFIER_KIND] == ['<=', '==', '!=', '>=', '->']
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 65536])
+def test_streamed_tokens_match_whole_source(chunk_size):
+    # A token or comment split across chunks is scanned once the rest of it is read
+    expected = [(token.kind, token.value, token.line, token.column) for token in tokenize(SOURCE)]
+    streamed = Lexer().iter_tokens(io.StringIO(SOURCE), chunk_size)
+    assert [(token.kind, token.value, token.line, token.column) for token in streamed] == expected
+
+def test_tokens_are_streamed_lazily():
+    # Tokens are yielded as chunks are read, before the rest of the source is scanned
+    source = io.StringIO('let x:int = 1;' + ' $' * 100)
+    tokens = Lexer().iter_tokens(source, 4)
+    assert next(tokens).value == 'let'
+    assert source.tell() < len(source.getvalue())
+
+@pytest.mark.parametrize('source, message', [
+    ('let x:int = 1 $ 2;', 'Invalid token: "$" at line 1, column 15'),
+    ('let x:int = 1;\n/* never closed', 'Unterminated comment "/*" at line 2, column 1'),
+    ('let c:color = #FF00;', 'Invalid token: "#FF00"'),
+])
+def test_invalid_sources(source, message):
+    with pytest.raises(Exception, match=message.replace('$', r'\$').replace('*', r'\*')):
+        tokenize(source)
@@ -0,0 +1,121 @@
+import io
+import contextlib
+
+from PArL import *
+from Constant_Folding import ConstantFolder
+from Dead_Code import DeadCodeEliminator
+from Code_Generation import CodeGenerator
+from Peephole import PeepholeOptimizer
+from pipeline import check, generate, execute
+
+def fold(source):
+    ast = check(source)
+    folder = ConstantFolder()
+    with contextlib.redirect_stdout(io.StringIO()):
+        folder.program(ast)
+    return ast, folder
+
+def eliminate(source):
+    ast = check(source)
+    eliminator = DeadCodeEliminator()
+    with contextlib.redirect_stdout(io.StringIO()):
+        eliminator.program(ast)
+    return ast, eliminator
+
+def printed(ast):
+    # The literal printed by each top-level __print statement
+    return [statement.unwrap().children[0].unwrap() for statement in ast.children if statement.unwrap().kind == PRINT_STATEMENT_KIND]
+
+def test_constant_expressions_are_folded():
+    ast, folder = fold('__print 2 * (3 + 4); __print 7 / 2; __print 7.0 / 2; __print (1 < 2) and not False;')
+    assert [(node.kind, node.parameters) for node in printed(ast)] == [
+        (INTEGER_LITERAL_KIND, '14'), (INTEGER_LITERAL_KIND, '3'), (FLOAT_LITERAL_KIND, '3.5'), (BOOLEAN_LITERAL_KIND, 'True'),
+    ]
+    assert folder.folded == 7
+
+def test_unassigned_variables_are_propagated():
+    ast, folder = fold('let a:int = 6; let b:int = a * 7; let c:int = 1; c = c + 1; __print b; __print c;')
+    b, c = printed(ast)
+    assert (b.kind, b.parameters) == (INTEGER_LITERAL_KIND, '42')
+    assert c.kind == IDENTIFIER_KIND
+    assert folder.propagated == 2
+
+def test_folding_keeps_output():
+    source = 'let size:int = 36; let cell:int = size / 6; for (let i:int = 0; i < size / cell; i = i + 1) { __print i * cell + 1; }'
+    assert execute(source, fold=True)[0] == execute(source)[0] == [1, 7, 13, 19, 25, 31]
+    assert len(generate(source, fold=True)) < len(generate(source))
+
+
+def test_peephole_keeps_output():
+    source = '''
+        let total:int = 0;
+        for (let i:int = 0; i < 6; i = i + 1) { if (not (i >= 3)) { total = total + i; __print total; } }
+        while (total > 0) { { total = total - 2; } }
+        __print total;
+    '''
+    plain = generate(source).splitlines()
+    optimized = generate(source, optimize=True).splitlines()
+    assert len(optimized) < len(plain)
+    assert 'dup' in optimized and 'eq' not in optimized
+    assert execute(source, optimize=True) == execute(source)
+
+def test_statements_after_return_are_removed():
+    ast, eliminator = eliminate('''
+        fun f(a:int) -> int { if (a > 0) { return 1; } else { return 2; } __print a; return 3; }
+        __print f(1);
+    ''')
+    block = ast.children[0].unwrap().children[-1]
+    assert len(block.children) == 1
+    assert eliminator.statements == 2
+
+def test_uncalled_functions_are_removed():
+    ast, eliminator = eliminate('''
+        fun used() -> int { return helper(); }
+        fun helper() -> int { return 1; }
+        fun unused() -> int { return orphan(); }
+        fun orphan() -> int { return 2; }
+        fun after() -> int { return 3; }
+        __print used();
+        { fun nested() -> int { return 4; } }
+    ''')
+    names = [statement.unwrap().children[0].parameters for statement in ast.children if statement.unwrap().kind == FUNCTION_DECLARATION_KIND]
+    assert names == ['used', 'helper']
+    assert (eliminator.declared, eliminator.reached) == (6, 2)
+
+def test_optimized_code_keeps_output():
+    source = '''
+        fun fib(n:int) -> int { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+        fun unused() -> int { return 0; }
+        let i:int = 0;
+        while (i < 8) { if (not (i >= 5)) { __print fib(i); } i = i + 1; }
+    '''
+    plain = generate(source)
+    optimized = generate(source, fold=True, dce=True, optimize=True)
+    assert '.unused' in plain and '.unused' not in optimized
+    assert len(optimized.splitlines()) < len(plain.splitlines())
+    assert execute(source, fold=True, dce=True, optimize=True)[0] == execute(source)[0] == [0, 1, 1, 2, 3]
+
+def test_runs_of_reloads_take_one_pass():
+    # A stored variable reloaded once per operand is rewritten to one dup per reload in a single pass
+    source = 'let a:int = 1; __print ' + ' + '.join(['a'] * 5000) + ';'
+    ast = check(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        code_generator = CodeGenerator()
+        code_generator.program(ast)
+        optimizer = PeepholeOptimizer()
+        optimizer.program(code_generator.code_blocks)
+    assert optimizer.passes == 2
+    assert optimizer.applied['st; push [i:l] -> dup; st'] == 1
+    assert execute(source, optimize=True)[0] == [5000]
+
+def test_jumps_onto_a_store_are_kept():
+    # A jump landing on the store (or on a reload) leaves the window as it is
+    block = Instructions('main')
+    for opcode, operands in [
+        (PUSH_OPCODE, (1,)), (PUSH_OPCODE, (1,)), (PUSH_PC_OPCODE, (2,)), (CJMP_OPCODE, ()),
+        (PUSH_OPCODE, (0,)), (PUSH_OPCODE, (0,)), (ST_OPCODE, ()), (PUSH_FRAME_OPCODE, (0, 0)), (PRINT_OPCODE, ()),
+    ]:
+        block.append(opcode, *operands)
+    with contextlib.redirect_stdout(io.StringIO()):
+        PeepholeOptimizer().program([block])
+    assert list(block.opcodes)[4:] == [PUSH_OPCODE, PUSH_OPCODE, ST_OPCODE, PUSH_FRAME_OPCODE, PRINT_OPCODE]
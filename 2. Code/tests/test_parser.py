@@ -0,0 +1,109 @@
+import io
+import os
+
+import pytest
+
+from PArL import *
+from Lexer import Lexer
+from Parser import Parser
+from pipeline import parse
+
+SOURCE = '''
+fun max(a:int, b:int) -> int { if (a > b) { return a; } else { return b; } }
+let colour:color = #FF0000;
+for (let i:int = 0; i < __width; i = i + 1) { __write i, max(i, 3) * 2 - 1, colour; }
+while (not False) { __delay 16; }
+{ let inner:float = -1.5 / 2.0; __print inner; }
+let r:int = __randi 10;
+__write_box 0, 0, r, __height, #00FF00;
+'''
+
+def parse_list(source):
+    # Parse the list of tokens of the whole source, as Parser.parse accepts
+    return Parser().parse(Lexer().tokenize(source))
+
+def test_cursor_shares_the_token_list():
+    tokens = Lexer().tokenize('let x:int = 1;')
+    cursor = TokenStream(tokens).rest(2)
+    assert cursor.tokens is tokens
+    assert (cursor[0].value, len(cursor)) == (':', 5)
+    assert cursor[10] is EOF
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 64])
+def test_chunk_size_does_not_change_tree(chunk_size):
+    streamed = Parser().parse(TokenStream(Lexer().iter_tokens(io.StringIO(SOURCE), chunk_size)))
+    assert same_tree(streamed, parse(SOURCE))
+
+def test_streamed_and_listed_tokens_give_same_tree():
+    assert same_tree(parse(SOURCE), parse_list(SOURCE))
+
+def test_statements_of_every_kind():
+    kinds = [statement.unwrap().kind for statement in parse(SOURCE).children]
+    assert kinds == [
+        FUNCTION_DECLARATION_KIND, VARIABLE_DECLARATION_KIND, FOR_STATEMENT_KIND, WHILE_STATEMENT_KIND, BLOCK_KIND,
+        VARIABLE_DECLARATION_KIND, WRITE_BOX_KIND,
+    ]
+
+def test_sample_program():
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'source.txt'), encoding='utf-8') as f:
+        program = parse(f.read())
+    assert [statement.unwrap().kind for statement in program.children] == [FUNCTION_DECLARATION_KIND] * 2
+
+@pytest.mark.parametrize('source', [
+    'let x:int = ;',
+    'let x:int = 1',
+    'if (x > 1) { __print x; ',
+    'fun f(a:int) { return a; }',
+    '__print 1; __print ;',
+])
+def test_syntax_errors(source):
+    with pytest.raises(Exception, match='Invalid syntax'):
+        parse(source)
+
+def test_nodes_have_integer_kinds_and_tuple_children():
+    program = parse(SOURCE)
+    declaration = program.children[1].unwrap()
+    assert declaration.kind == VARIABLE_DECLARATION_KIND and declaration.t_type == '<variable_declaration>'
+    assert isinstance(program.children, tuple)
+    assert not hasattr(program, '__dict__')
+    # Wrappers record the grammar rule of a statement and are skipped by unwrap
+    assert program.children[1].kind == STATEMENT_KIND
+
+def test_layout_and_comments_do_not_change_tree():
+    compact = ' '.join(line.strip() for line in SOURCE.splitlines())
+    commented = SOURCE.replace(';', '; // end of statement\n').replace('{', '{ /* block */')
+    assert same_tree(parse(compact), parse(SOURCE))
+    assert same_tree(parse(commented), parse(SOURCE))
+
+@pytest.mark.parametrize('changed', [
+    SOURCE.replace('max(i, 3) * 2', 'max(i, 3) * 3'),
+    SOURCE.replace('a > b', 'a >= b'),
+    SOURCE.replace('__delay 16;', '__delay 16; __print 1;'),
+    SOURCE.replace('(a:int, b:int)', '(a:int, b:float)'),
+])
+def test_different_programs_give_different_trees(changed):
+    assert not same_tree(parse(changed), parse(SOURCE))
+
+def expression(source):
+    # The expression of a single __print statement, without its wrapper nodes
+    return parse(source).children[0].unwrap().children[0].unwrap()
+
+def test_precedence():
+    # Multiplicative operators bind tighter than additive ones, and additive ones than relational ones
+    node = expression('__print 1 + 2 * 3 < 4;')
+    assert (node.kind, node.parameters) == (RELATIONAL_OP_KIND, '<')
+    addition = node.children[0].unwrap()
+    assert (addition.kind, addition.parameters) == (ADDITIVE_OP_KIND, '+')
+    assert addition.children[1].unwrap().kind == MULTIPLICATIVE_OP_KIND
+
+def test_operators_are_left_associative():
+    node = expression('__print 8 - 4 - 2;')
+    assert node.children[0].unwrap().kind == ADDITIVE_OP_KIND
+    assert node.children[1].unwrap().parameters == '2'
+
+def test_long_chains_parse_without_recursion():
+    node = expression('__print ' + ' + '.join(['1'] * 5000) + ';')
+    depth = 0
+    while node.kind == ADDITIVE_OP_KIND:
+        node, depth = node.children[0].unwrap(), depth + 1
+    assert depth == 4999
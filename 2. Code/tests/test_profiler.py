@@ -0,0 +1,44 @@
+from Profiler import ProfilingMachine
+from Virtual_Machine import VirtualMachine
+from pipeline import generate
+
+SOURCE = '''
+fun leaf(n:int) -> int { return n + 1; }
+fun fib(n:int) -> int { if (n < 2) { return leaf(n); } return fib(n - 1) + fib(n - 2); }
+__print fib(6);
+'''
+
+def profile(source):
+    machines = []
+    for machine in (VirtualMachine, ProfilingMachine):
+        values = []
+        machines.append(machine(output=values.append))
+        machines[-1].load(generate(source))
+        machines[-1].run()
+        machines[-1].values = values
+    return machines
+
+def test_profile_counts_every_instruction():
+    plain, profiled = profile(SOURCE)
+    assert profiled.values == plain.values
+    assert profiled.steps == plain.steps == sum(profiled.counts) == sum(profiled.stacks.values())
+    assert sum(profiled.per_opcode().values()) == profiled.steps
+
+def test_per_function():
+    _, profiled = profile(SOURCE)
+    functions = profiled.per_function()
+    # fib(6) makes 25 calls of fib, 13 of which reach leaf; main's inclusive count is the whole run
+    assert functions['fib'][2] == 25 and functions['leaf'][2] == 13
+    assert functions['main'][1] == profiled.steps
+    assert sum(self_ for self_, _, _ in functions.values()) == profiled.steps
+    assert functions['fib'][1] == profiled.steps - functions['main'][0]
+
+def test_collapsed_stacks(tmp_path):
+    _, profiled = profile(SOURCE)
+    path = tmp_path / 'profile.folded'
+    profiled.write_collapsed(str(path))
+    lines = path.read_text().splitlines()
+    stacks = {line.rsplit(' ', 1)[0]: int(line.rsplit(' ', 1)[1]) for line in lines}
+    # The shallowest leaf: fib(6), fib(4), fib(2), fib(0)
+    assert 'main;fib;fib;fib;fib;leaf' in stacks and 'main;fib;fib;fib;leaf' not in stacks
+    assert sum(stacks.values()) == profiled.steps
@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from Virtual_Machine import VirtualMachine
+from pipeline import generate
+
+def machine(source, **options):
+    # A virtual machine loaded with a program, printing to a list
+    values = []
+    machine = VirtualMachine(output=values.append, **options)
+    machine.load(generate(source))
+    return machine, values
+
+def test_delays_advance_a_virtual_clock():
+    # An hour of delays runs at once, and every delay shows the pad at the clock it starts
+    shown = []
+    vm, values = machine('for (let i:int = 0; i < 4; i = i + 1) { __write i, 0, #FF0000; __delay 900000; } __print 1;',
+                         snapshot=lambda clock, display: shown.append((clock, display.pixel(3, 0))))
+    start = time.perf_counter()
+    vm.run()
+    assert time.perf_counter() - start < 5
+    assert (vm.clock, vm.delays, values) == (3600000, 4, [1])
+    assert shown == [(0, 0xFFFFFF), (900000, 0xFFFFFF), (1800000, 0xFFFFFF), (2700000, 0xFF0000)]
+
+def test_duplicate_functions_are_rejected():
+    # A second block of the same name would silently replace the first
+    with pytest.raises(ValueError, match='Duplicate function: .f'):
+        VirtualMachine().load('.f\npush 1\nret\n.f\npush 2\nret\n.main\nhalt\n')